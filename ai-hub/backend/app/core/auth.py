@@ -1,6 +1,10 @@
 """
 JWT utilities for MVP auth.
 """
+import hashlib
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
 from typing import Optional, Tuple
 
@@ -41,6 +45,71 @@ def decode_token(token: str) -> dict:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
 
+class TokenCache:
+    """
+    Bounded LRU of verified tokens: sha256(token) -> (role, user_id, exp).
+
+    Clients resend the same long-lived token, so only the first request pays for signature
+    verification. Entries are bound to the secret they were verified with; a rotated
+    SECRET_KEY empties the cache on the next lookup.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[bytes, Tuple[Optional[str], Optional[int], Optional[int]]]" = OrderedDict()
+        self._secret = settings.SECRET_KEY
+        self._lock = threading.Lock()
+
+    def _check_secret(self) -> None:
+        if self._secret != settings.SECRET_KEY:
+            self._entries.clear()
+            self._secret = settings.SECRET_KEY
+
+    def get(self, digest: bytes, now: float) -> Optional[Tuple[Optional[str], Optional[int], Optional[int]]]:
+        with self._lock:
+            self._check_secret()
+            hit = self._entries.get(digest)
+            if hit is None:
+                return None
+            if hit[2] is not None and hit[2] <= now:
+                del self._entries[digest]
+                return None
+            self._entries.move_to_end(digest)
+            return hit
+
+    def put(self, digest: bytes, value: Tuple[Optional[str], Optional[int], Optional[int]], secret: str) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._check_secret()
+            if secret != self._secret:
+                # Verified with a key that has been rotated away meanwhile
+                return
+            self._entries[digest] = value
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._secret = settings.SECRET_KEY
+
+
+token_cache = TokenCache(settings.TOKEN_CACHE_SIZE)
+
+
+def _claims(payload: dict) -> Tuple[Optional[str], Optional[int], Optional[int]]:
+    role = str(payload.get("role") or "").lower() or None
+    sub = payload.get("sub")
+    try:
+        user_id = int(sub) if sub is not None else None
+    except ValueError:
+        user_id = None
+    exp = payload.get("exp")
+    return role, user_id, int(exp) if exp is not None else None
+
+
 async def get_role_from_auth(
     authorization: Optional[str] = Header(default=None)
 ) -> Tuple[Optional[str], Optional[int]]:
@@ -48,12 +117,11 @@ async def get_role_from_auth(
     token = _parse_bearer(authorization)
     if not token:
         return None, None
-    payload = decode_token(token)
-    role = str(payload.get("role") or "").lower() or None
-    sub = payload.get("sub")
-    try:
-        user_id = int(sub) if sub is not None else None
-    except ValueError:
-        user_id = None
-    return role, user_id
+    digest = hashlib.sha256(token.encode("utf-8")).digest()
+    hit = token_cache.get(digest, time.time())
+    if hit is None:
+        secret = settings.SECRET_KEY
+        hit = _claims(decode_token(token))
+        token_cache.put(digest, hit, secret)
+    return hit[0], hit[1]
 
@@ -111,6 +111,11 @@ class Settings(BaseSettings):
 
     # Security Configuration
     SECURITY_BCRYPT_ROUNDS: int = 12
+    TOKEN_CACHE_SIZE: int = 10000  # verified bearer tokens kept in memory (0 disables)
+
+    # Response compression (gzip); bodies below the minimum are sent as-is, level 0 disables
+    GZIP_MIN_SIZE: int = 1024
+    GZIP_LEVEL: int = 6
 
     # SLA Configuration
     SLA_ANALYST_DAYS: int = 5
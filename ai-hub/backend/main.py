@@ -9,6 +9,7 @@ import os
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import JSONResponse
 import structlog
 from sqlalchemy import text
@@ -74,6 +75,11 @@ if settings.BACKEND_CORS_ORIGINS:
     )
 
 
+# Compress JSON responses (streams too); skipped for small bodies and clients without gzip
+if settings.GZIP_LEVEL > 0:
+    app.add_middleware(GZipMiddleware, minimum_size=settings.GZIP_MIN_SIZE, compresslevel=settings.GZIP_LEVEL)
+
+
 # Include API routers
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
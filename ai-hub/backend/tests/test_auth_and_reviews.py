@@ -84,3 +84,31 @@ def test_auth_and_reviews_flow():
         r = client.get("/api/v1/dashboard/")
         assert r.status_code == 200
         assert "counts" in r.json()
+
+
+def test_token_cache_skips_verification_and_honors_rotation():
+    import asyncio
+    from unittest import mock
+
+    with make_client() as client:
+        token = issue_token(client, "cache@example.com", "analyst", name="Cache")
+        from app.core import auth
+        from app.core.config import settings
+
+        auth.token_cache.clear()
+        first = asyncio.run(auth.get_role_from_auth(f"Bearer {token}"))
+        assert first[0] == "analyst"
+        with mock.patch.object(auth.jwt, "decode", side_effect=AssertionError("re-verified")):
+            assert asyncio.run(auth.get_role_from_auth(f"Bearer {token}")) == first
+
+        original = settings.SECRET_KEY
+        settings.SECRET_KEY = original + "-rotated"
+        try:
+            try:
+                asyncio.run(auth.get_role_from_auth(f"Bearer {token}"))
+                assert False, "token signed with the old key must be rejected"
+            except auth.HTTPException as exc:
+                assert exc.status_code == 401
+        finally:
+            settings.SECRET_KEY = original
+            auth.token_cache.clear()
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
@@ -6,7 +6,9 @@ from ..db.session import get_db
 from ..crud import assignments as asg_crud
 from ..crud import emails as emails_crud
 from ..crud import ideas as ideas_crud
-from ..core.security import RoleChecker, get_current_user
+from ..core.etag import not_modified
+from ..core.projection import parse_fields, rows_response
+from ..core.security import RoleChecker, get_current_user, get_token_user
 from ..services.email import render_template
 from ..crud import events as events_crud
 
@@ -60,10 +62,25 @@ def respond(req: RespondRequest, db: Session = Depends(get_db), user = Depends(g
         raise HTTPException(status_code=404, detail=str(e))
 
 
+ASSIGNMENT_FIELDS = ("id", "idea_id", "developer_id", "status", "created_at")
+PENDING_FIELDS = ("id", "idea_id", "status", "developer_id")
+
+
 @router.get("/pending")
-def pending(db: Session = Depends(get_db), user = Depends(get_current_user)):
+def pending(
+    request: Request,
+    response: Response,
+    fields: str | None = Query(None, description="Comma-separated subset of: " + ", ".join(ASSIGNMENT_FIELDS)),
+    db: Session = Depends(get_db),
+    user = Depends(get_token_user),
+):
+    # Scope: admin/manager share one view, everyone else sees their own invites
+    not_mod = not_modified(request, response, db, ("assignments",), user.id, user.role)
+    if not_mod is not None:
+        return not_mod
+    names = parse_fields(fields, ASSIGNMENT_FIELDS, PENDING_FIELDS)
     if user.role in ("admin", "manager"):
-        rows = asg_crud.list_assignments(db, status="invited")
+        rows = asg_crud.list_assignments(db, status="invited", columns=names)
     else:
-        rows = asg_crud.list_assignments(db, for_user_id=user.id, status="invited")
-    return [{"id": r.id, "idea_id": r.idea_id, "status": r.status, "developer_id": r.developer_id} for r in rows]
+        rows = asg_crud.list_assignments(db, for_user_id=user.id, status="invited", columns=names)
+    return rows_response(names, rows, response)
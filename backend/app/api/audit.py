@@ -1,39 +1,29 @@
-from typing import Optional, Any, List
-from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from types import SimpleNamespace
+from typing import Optional, Any, Iterator, List
+from fastapi import APIRouter, Depends, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import select, and_, desc, asc
+from sqlalchemy import select, and_, desc, asc, func, tuple_
 
+from ..db import session as db_session
 from ..db.session import get_db
 from ..db import models
+from ..core.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor, parse_dt
 from ..core.security import RoleChecker
+from ..crud import events as events_crud
+from ..services import audit_archive
 
 
 router = APIRouter()
 
 
-def _parse_dt(value: Optional[str]) -> Optional[datetime]:
-    if not value:
-        return None
-    try:
-        # Accept both with and without timezone
-        return datetime.fromisoformat(value)
-    except Exception:
-        raise HTTPException(status_code=400, detail=f"Invalid datetime format: {value}")
-
-
-@router.get("/", dependencies=[Depends(RoleChecker(["admin"]))])
-def list_events(
-    db: Session = Depends(get_db),
-    entity: Optional[str] = Query(None),
-    entity_id: Optional[int] = Query(None),
-    event: Optional[str] = Query(None),
-    date_from: Optional[str] = Query(None, description="ISO datetime inclusive"),
-    date_to: Optional[str] = Query(None, description="ISO datetime inclusive"),
-    limit: int = Query(50, ge=1, le=1000),
-    offset: int = Query(0, ge=0),
-    order: str = Query("desc", pattern="^(asc|desc)$"),
-):
+def _build_conditions(
+    entity: Optional[str],
+    entity_id: Optional[int],
+    event: Optional[str],
+    date_from: Optional[str],
+    date_to: Optional[str],
+) -> list:
     conditions = []
     if entity:
         conditions.append(models.EventAudit.entity == entity)
@@ -41,81 +31,206 @@ def list_events(
         conditions.append(models.EventAudit.entity_id == entity_id)
     if event:
         conditions.append(models.EventAudit.event == event)
-    dt_from = _parse_dt(date_from)
-    dt_to = _parse_dt(date_to)
+    dt_from = parse_dt(date_from)
+    dt_to = parse_dt(date_to)
     if dt_from:
         conditions.append(models.EventAudit.created_at >= dt_from)
     if dt_to:
         conditions.append(models.EventAudit.created_at <= dt_to)
+    return conditions
 
-    stmt = select(models.EventAudit)
-    if conditions:
-        stmt = stmt.where(and_(*conditions))
-    stmt = stmt.order_by(desc(models.EventAudit.created_at) if order == "desc" else asc(models.EventAudit.created_at))
-    stmt = stmt.offset(offset).limit(limit)
-
-    rows = list(db.execute(stmt).scalars())
-    return [
-        {
-            "id": r.id,
-            "entity": r.entity,
-            "entity_id": r.entity_id,
-            "event": r.event,
-            "payload": r.payload,
-            "created_at": r.created_at.isoformat(),
-        }
-        for r in rows
-    ]
 
+def _order_by(order: str) -> list:
+    E = models.EventAudit
+    if order == "desc":
+        return [desc(E.created_at), desc(E.id)]
+    return [asc(E.created_at), asc(E.id)]
 
-@router.get("/export", dependencies=[Depends(RoleChecker(["admin"]))])
-def export_events(
+
+@router.get("/", dependencies=[Depends(RoleChecker(["admin"]))])
+def list_events(
+    response: Response,
     db: Session = Depends(get_db),
     entity: Optional[str] = Query(None),
     entity_id: Optional[int] = Query(None),
     event: Optional[str] = Query(None),
-    date_from: Optional[str] = Query(None),
-    date_to: Optional[str] = Query(None),
+    date_from: Optional[str] = Query(None, description="ISO datetime inclusive"),
+    date_to: Optional[str] = Query(None, description="ISO datetime inclusive"),
+    limit: int = Query(50, ge=1, le=1000),
+    offset: int = Query(0, ge=0, description="Deprecated: prefer cursor"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
     order: str = Query("desc", pattern="^(asc|desc)$"),
 ):
-    # Reuse filtering without pagination; cap maximum rows implicitly by time window
-    conditions = []
-    if entity:
-        conditions.append(models.EventAudit.entity == entity)
-    if entity_id is not None:
-        conditions.append(models.EventAudit.entity_id == entity_id)
-    if event:
-        conditions.append(models.EventAudit.event == event)
-    dt_from = _parse_dt(date_from)
-    dt_to = _parse_dt(date_to)
-    if dt_from:
-        conditions.append(models.EventAudit.created_at >= dt_from)
-    if dt_to:
-        conditions.append(models.EventAudit.created_at <= dt_to)
-
-    stmt = select(models.EventAudit)
-    if conditions:
-        stmt = stmt.where(and_(*conditions))
-    stmt = stmt.order_by(desc(models.EventAudit.created_at) if order == "desc" else asc(models.EventAudit.created_at))
-
-    rows = list(db.execute(stmt).scalars())
-
-    # Build CSV
+    events_crud.flush_pending()
+    conditions = _build_conditions(entity, entity_id, event, date_from, date_to)
+    E = models.EventAudit
+    after = decode_cursor(cursor) if cursor else None
+    if after:
+        # Keyset seek on (created_at, id): cost of page N equals page 1, stable under concurrent inserts
+        key = tuple_(E.created_at, E.id)
+        conditions.append(key < tuple_(*after) if order == "desc" else key > tuple_(*after))
+    skip = offset if not cursor else 0
+    arch = _archive_filter(entity, entity_id, event, date_from, date_to, order, after)
+    use_archive = audit_archive.may_contain(arch)
+
+    def hot_rows(skip: int, limit: int) -> tuple[list[dict], int]:
+        stmt = select(E)
+        if conditions:
+            stmt = stmt.where(and_(*conditions))
+        stmt = stmt.order_by(*_order_by(order)).offset(skip or None).limit(limit)
+        rows = [_row_dict(r) for r in db.execute(stmt).scalars()]
+        if rows or not skip or not use_archive:
+            return rows, 0
+        # Page starts past the hot rows: work out how much of the offset is left for the archive
+        count_stmt = select(func.count()).select_from(E)
+        if conditions:
+            count_stmt = count_stmt.where(and_(*conditions))
+        total = db.execute(count_stmt).scalar()
+        return rows, max(0, skip - total)
+
+    def archived_rows(skip: int, limit: int) -> tuple[list[dict], int]:
+        rows = []
+        for r in audit_archive.scan(arch):
+            if skip:
+                skip -= 1
+                continue
+            rows.append(r)
+            if len(rows) >= limit:
+                break
+        return rows, skip
+
+    # Archived events are all older than hot ones, so the two sources simply concatenate
+    sources = [hot_rows, archived_rows] if order == "desc" else [archived_rows, hot_rows]
+    if not use_archive:
+        sources = [hot_rows]
+    rows: list[dict] = []
+    for source in sources:
+        got, skip = source(skip, limit - len(rows))
+        rows.extend(got)
+        if len(rows) >= limit:
+            break
+
+    if len(rows) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+    return [{**r, "created_at": r["created_at"].isoformat()} for r in rows]
+
+
+def _row_dict(r) -> dict:
+    return {
+        "id": r.id,
+        "entity": r.entity,
+        "entity_id": r.entity_id,
+        "event": r.event,
+        "payload": r.payload,
+        "created_at": r.created_at,
+    }
+
+
+def _archive_filter(entity, entity_id, event, date_from, date_to, order, after=None) -> dict:
+    return {
+        "entity": entity,
+        "entity_id": entity_id,
+        "event": event,
+        "date_from": parse_dt(date_from),
+        "date_to": parse_dt(date_to),
+        "order": order,
+        "after": after,
+    }
+
+
+_EXPORT_COLUMNS = ["id", "entity", "entity_id", "event", "created_at", "payload"]
+_EXPORT_BATCH = 1000
+
+
+def _iter_export_csv(conditions: list, order: str, compress: bool, arch: dict | None = None) -> Iterator[bytes]:
     import csv
     import io
+    import zlib
 
+    # Own session: the request-scoped one may be closed before the body finishes streaming
+    db = db_session.SessionLocal()
+    gz = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
     buf = io.StringIO()
     writer = csv.writer(buf)
-    writer.writerow(["id", "entity", "entity_id", "event", "created_at", "payload"])
-    for r in rows:
-        writer.writerow([
-            r.id,
-            r.entity,
-            r.entity_id,
-            r.event,
-            r.created_at.isoformat(),
-            (str(r.payload) if r.payload is not None else ""),
-        ])
-    data = buf.getvalue()
-    return Response(content=data, media_type="text/csv", headers={"Content-Disposition": "attachment; filename=events.csv"})
 
+    def drain() -> bytes:
+        chunk = buf.getvalue().encode("utf-8")
+        buf.seek(0)
+        buf.truncate(0)
+        return gz.compress(chunk) if gz else chunk
+
+    try:
+        E = models.EventAudit
+        stmt = select(E.id, E.entity, E.entity_id, E.event, E.created_at, E.payload)
+        if conditions:
+            stmt = stmt.where(and_(*conditions))
+        stmt = stmt.order_by(*_order_by(order))
+
+        def hot_batches():
+            # Server-side cursor: rows arrive in fixed-size batches, memory stays flat
+            yield from db.execute(stmt.execution_options(yield_per=_EXPORT_BATCH)).partitions()
+
+        def archived_batches():
+            batch = []
+            for r in audit_archive.scan(arch):
+                batch.append(SimpleNamespace(**r))
+                if len(batch) >= _EXPORT_BATCH:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+
+        sources = [hot_batches]
+        if arch is not None:
+            sources = [hot_batches, archived_batches] if order == "desc" else [archived_batches, hot_batches]
+
+        writer.writerow(_EXPORT_COLUMNS)
+        for source in sources:
+            for batch in source():
+                for r in batch:
+                    writer.writerow([
+                        r.id,
+                        r.entity,
+                        r.entity_id,
+                        r.event,
+                        r.created_at.isoformat(),
+                        (str(r.payload) if r.payload is not None else ""),
+                    ])
+                chunk = drain()
+                if chunk:
+                    yield chunk
+        tail = drain()
+        if gz:
+            tail += gz.flush()
+        if tail:
+            yield tail
+    finally:
+        db.close()
+
+
+@router.get("/export", dependencies=[Depends(RoleChecker(["admin"]))])
+def export_events(
+    entity: Optional[str] = Query(None),
+    entity_id: Optional[int] = Query(None),
+    event: Optional[str] = Query(None),
+    date_from: Optional[str] = Query(None),
+    date_to: Optional[str] = Query(None),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    gzip: bool = Query(False, description="gzip-compress the CSV stream"),
+):
+    events_crud.flush_pending()
+    conditions = _build_conditions(entity, entity_id, event, date_from, date_to)
+    arch = _archive_filter(entity, entity_id, event, date_from, date_to, order)
+    filename = "events.csv.gz" if gzip else "events.csv"
+    return StreamingResponse(
+        _iter_export_csv(conditions, order, gzip, arch if audit_archive.may_contain(arch) else None),
+        media_type="application/gzip" if gzip else "text/csv",
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
+
+
+@router.post("/archive", dependencies=[Depends(RoleChecker(["admin"]))])
+def archive_events(before: str = Query(..., description="ISO date; whole months before it are archived")):
+    cutoff = parse_dt(before)
+    archived = audit_archive.archive_before(db_session.engine, cutoff.date())
+    return {"archived": archived, "directory": audit_archive.archive_dir()}
@@ -1,19 +1,24 @@
 from datetime import datetime, timedelta
 from typing import Optional
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 import os
 from jose import jwt
 from sqlalchemy.orm import Session
 from ..db.session import get_db
 from ..crud.users import get_user_by_email, create_user, count_users
-from ..core.passwords import hash_password, verify_password
-from ..core.security import get_current_user
+from ..core.passwords import HasherBusy, hasher, needs_rehash
+from ..core.security import get_current_user, get_token_user
 
 
 router = APIRouter()
 
 
+def _busy() -> HTTPException:
+    return HTTPException(status_code=503, detail="Authentication is busy, retry shortly", headers={"Retry-After": "1"})
+
+
 class LoginRequest(BaseModel):
     email: str
     password: str
@@ -29,20 +34,29 @@ class MeResponse(BaseModel):
     role: str
 
 
+# register/login are async: bcrypt runs on the hasher pool (core/passwords.py) and only the short
+# DB calls take a request threadpool slot, so login storms don't starve other routes.
 @router.post("/register", response_model=TokenResponse)
-def register(req: LoginRequest, db: Session = Depends(get_db)) -> TokenResponse:
+async def register(req: LoginRequest, db: Session = Depends(get_db)) -> TokenResponse:
     if not req.email or not req.password:
         raise HTTPException(status_code=400, detail="Invalid input")
     if len(req.password) < 8:
         raise HTTPException(status_code=400, detail="Password too short (min 8)")
-    existing = get_user_by_email(db, req.email)
+    existing = await run_in_threadpool(get_user_by_email, db, req.email)
     if existing:
         raise HTTPException(status_code=400, detail="User already exists")
 
-    ph = hash_password(req.password)
-    # First registered user becomes admin (bootstrap)
-    role = "admin" if count_users(db) == 0 else "user"
-    user = create_user(db, email=req.email, password_hash=ph, role=role)
+    try:
+        ph = await hasher.hash(req.password)
+    except HasherBusy:
+        raise _busy()
+
+    def _create():
+        # First registered user becomes admin (bootstrap)
+        role = "admin" if count_users(db) == 0 else "user"
+        return create_user(db, email=req.email, password_hash=ph, role=role)
+
+    user = await run_in_threadpool(_create)
 
     secret = os.getenv("SECRET_KEY", "please-change-in-prod")
     alg = os.getenv("JWT_ALGORITHM", "HS256")
@@ -50,6 +64,7 @@ def register(req: LoginRequest, db: Session = Depends(get_db)) -> TokenResponse:
 
     payload = {
         "sub": user.email,
+        "uid": user.id,
         "role": user.role,
         "exp": datetime.utcnow() + timedelta(minutes=minutes),
         "iat": datetime.utcnow(),
@@ -59,25 +74,44 @@ def register(req: LoginRequest, db: Session = Depends(get_db)) -> TokenResponse:
 
 
 @router.get("/me", response_model=MeResponse)
-def me(user = Depends(get_current_user)) -> MeResponse:
+def me(user = Depends(get_token_user)) -> MeResponse:
     return MeResponse(email=user.email, role=user.role)
 
 
 @router.post("/login", response_model=TokenResponse)
-def login(req: LoginRequest, db: Session = Depends(get_db)) -> TokenResponse:
+async def login(req: LoginRequest, db: Session = Depends(get_db)) -> TokenResponse:
     if not req.email or not req.password:
         raise HTTPException(status_code=400, detail="Invalid credentials")
-    user = get_user_by_email(db, req.email)
-    if not user or not user.password_hash or not verify_password(req.password, user.password_hash):
+    user = await run_in_threadpool(get_user_by_email, db, req.email)
+    if not user or not user.password_hash:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    try:
+        ok = await hasher.verify(req.password, user.password_hash)
+    except HasherBusy:
+        raise _busy()
+    if not ok:
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    # Read now: a rehash commit below would expire the instance
+    claims = {"sub": user.email, "uid": user.id, "role": user.role}
+    if needs_rehash(user.password_hash):
+        # Cost changed (BCRYPT_ROUNDS): upgrade the stored hash while we have the plaintext
+        try:
+            new_hash = await hasher.hash(req.password)
+
+            def _store():
+                user.password_hash = new_hash
+                db.commit()
+
+            await run_in_threadpool(_store)
+        except Exception:
+            pass
 
     secret = os.getenv("SECRET_KEY", "please-change-in-prod")
     alg = os.getenv("JWT_ALGORITHM", "HS256")
     minutes = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60"))
 
     payload = {
-        "sub": user.email,
-        "role": user.role,
+        **claims,
         "exp": datetime.utcnow() + timedelta(minutes=minutes),
         "iat": datetime.utcnow(),
     }
@@ -93,6 +127,7 @@ def refresh(user = Depends(get_current_user)) -> TokenResponse:
     minutes = int(_os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60"))
     payload = {
         "sub": user.email,
+        "uid": user.id,
         "role": user.role,
         "exp": datetime.utcnow() + timedelta(minutes=minutes),
         "iat": datetime.utcnow(),
@@ -0,0 +1,55 @@
+import os
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Path, Query, Request
+from fastapi.responses import StreamingResponse
+
+from ..core.compression import negotiate
+from ..core.pagination import parse_dt
+from ..core.projection import parse_fields
+from ..core.security import RoleChecker
+from ..services import export as export_service
+
+
+router = APIRouter()
+
+WATERMARK_HEADER = "X-Export-Watermark"
+
+
+def _gzip_level(request: Request, gzip: Optional[bool]) -> Optional[int]:
+    # The export only produces gzip itself: ask negotiate() as if brotli were unavailable, so q-values
+    # (gzip;q=0, identity-only) are honoured the same way as by CompressionMiddleware
+    wanted = gzip if gzip is not None else negotiate(request.headers.get("accept-encoding") or "", brotli_available=False) == "gzip"
+    if not wanted:
+        return None
+    # Fast levels by default: an export should be bound by the network, not by deflate
+    return max(1, min(9, int(os.getenv("EXPORT_GZIP_LEVEL", "1") or 1)))
+
+
+@router.get("/{entity}", dependencies=[Depends(RoleChecker(["finance", "manager", "admin"]))])
+def export(
+    request: Request,
+    entity: str = Path(..., pattern="^(ideas|reviews|assignments)$"),
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    fields: Optional[str] = Query(None, description="Comma-separated column subset (default: all)"),
+    since: Optional[str] = Query(None, description=f"Only rows inserted or updated after this ISO datetime ({WATERMARK_HEADER} of the previous export)"),
+    gzip: Optional[bool] = Query(None, description="Force gzip on/off (default: from Accept-Encoding)"),
+):
+    all_columns = export_service.columns(entity)
+    names = parse_fields(fields, all_columns, all_columns)
+    since_dt = parse_dt(since)
+    # Cut at the newest row now, so rows landing mid-export go to the next incremental pull
+    until = export_service.watermark(entity, since_dt)
+    level = _gzip_level(request, gzip)
+    headers = {
+        "Content-Disposition": f'attachment; filename="{entity}-{datetime.utcnow():%Y%m%dT%H%M%S}.{format}"',
+        "Cache-Control": "no-store",
+        "Vary": "Accept-Encoding",
+    }
+    if until is not None:
+        headers[WATERMARK_HEADER] = until.isoformat()
+    if level is not None:
+        headers["Content-Encoding"] = "gzip"
+    body = export_service.iter_export(entity, names, format, since=since_dt, until=until, gzip_level=level)
+    return StreamingResponse(body, media_type=export_service.MEDIA_TYPES[format], headers=headers)
@@ -1,14 +1,20 @@
+import os
 from datetime import datetime
 from typing import List, Optional
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
 from pydantic import BaseModel, field_validator
 from sqlalchemy.orm import Session
 from ..db.session import get_db
 from ..crud import ideas as ideas_crud
 from ..crud import embeddings as emb_crud
 from ..services.embeddings import generate_embedding
-from ..core.security import get_current_user
+from ..core.security import RoleChecker, get_current_user, get_token_user
 from ..crud import events as events_crud
+from ..core.etag import not_modified
+from ..core.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor, parse_dt
+from ..core.projection import parse_fields, rows_response
+from ..core.streaming import stream_format, streaming_response
+from ..services import idea_import
 
 router = APIRouter()
 
@@ -44,10 +50,48 @@ class Idea(BaseModel):
     created_at: Optional[datetime] = None
 
 
+# Hard cap on page size regardless of what the client asks for
+MAX_PAGE_SIZE = int(os.getenv("IDEAS_MAX_PAGE_SIZE", "200") or 200)
+
+# Columns selectable with ?fields=; list endpoints return all of them by default
+IDEA_FIELDS = ("id", "title", "description", "author_email", "status", "created_at")
+FIELDS_QUERY = Query(None, description="Comma-separated subset of: " + ", ".join(IDEA_FIELDS))
+
+
 @router.get("/", response_model=List[Idea])
-def list_ideas(db: Session = Depends(get_db)) -> List[Idea]:
-    rows = ideas_crud.list_ideas(db)
-    return [Idea(id=r.id, title=r.title, description=r.description, author_email=r.author_email, status=getattr(r, 'status', None), created_at=getattr(r, 'created_at', None)) for r in rows]
+def list_ideas(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    status: Optional[str] = Query(None),
+    author: Optional[str] = Query(None, description="author_email"),
+    date_from: Optional[str] = Query(None, description="ISO datetime inclusive"),
+    date_to: Optional[str] = Query(None, description="ISO datetime inclusive"),
+    limit: int = Query(50, ge=1),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    fields: Optional[str] = FIELDS_QUERY,
+) -> List[Idea]:
+    not_mod = not_modified(request, response, db, ("ideas",))
+    if not_mod is not None:
+        return not_mod
+    names = parse_fields(fields, IDEA_FIELDS, IDEA_FIELDS)
+    limit = min(limit, MAX_PAGE_SIZE)
+    rows = ideas_crud.list_ideas_page(
+        db,
+        status=status,
+        author_email=author,
+        date_from=parse_dt(date_from),
+        date_to=parse_dt(date_to),
+        after=decode_cursor(cursor) if cursor else None,
+        order=order,
+        limit=limit,
+        columns=names,
+    )
+    if len(rows) == limit:
+        # Rows end with the (created_at, id) cursor key
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1][-2], rows[-1][-1])
+    return rows_response(names, rows, response)
 
 
 class DuplicateCandidate(BaseModel):
@@ -108,7 +152,32 @@ def create_idea(payload: IdeaCreate, db: Session = Depends(get_db), user = Depen
     )
 
 
+@router.post("/import", dependencies=[Depends(RoleChecker(["manager", "admin"]))])
+async def import_ideas(
+    request: Request,
+    user = Depends(get_current_user),
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$", description="Overrides Content-Type"),
+):
+    """Bulk import from a streamed CSV (header row with title, description[, author_email, created_at]) or NDJSON body."""
+    fmt = format or idea_import.detect_format(request.headers.get("content-type"))
+    if not fmt:
+        raise HTTPException(status_code=415, detail="Send text/csv or application/x-ndjson")
+    out = stream_format(request.headers.get("accept"), default="ndjson")
+    frames = idea_import.run_import(request.stream(), fmt, out, user_id=user.id, user_email=user.email)
+    return streaming_response(frames, out, reads_body=True)
+
+
 @router.get("/mine", response_model=List[Idea])
-def list_my_ideas(user = Depends(get_current_user), db: Session = Depends(get_db)) -> List[Idea]:
-    rows = ideas_crud.list_ideas_for_user(db, user_id=user.id)
-    return [Idea(id=r.id, title=r.title, description=r.description, author_email=r.author_email, status=getattr(r, 'status', None), created_at=getattr(r, 'created_at', None)) for r in rows]
+def list_my_ideas(
+    request: Request,
+    response: Response,
+    user = Depends(get_token_user),
+    db: Session = Depends(get_db),
+    fields: Optional[str] = FIELDS_QUERY,
+) -> List[Idea]:
+    not_mod = not_modified(request, response, db, ("ideas",), user.id)
+    if not_mod is not None:
+        return not_mod
+    names = parse_fields(fields, IDEA_FIELDS, IDEA_FIELDS)
+    rows = ideas_crud.list_ideas_for_user(db, user_id=user.id, columns=names)
+    return rows_response(names, rows, response)
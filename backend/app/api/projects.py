@@ -1,17 +1,18 @@
 from datetime import datetime
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 from pydantic import BaseModel
-from sqlalchemy import func, select
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from ..core.security import get_current_user
+from ..core.etag import not_modified
+from ..core.security import get_token_user
+from ..crud import idea_counts
 from ..crud import ideas as ideas_crud
-from ..crud import assignments as assignments_crud
-from ..crud import reviews as reviews_crud
 from ..db import models
 from ..db.session import get_db
+from ..services import data_version
 
 router = APIRouter()
 
@@ -61,17 +62,6 @@ class OverviewResponse(BaseModel):
     invites: List[AssignmentCard] = []
 
 
-def _resolve_user_emails(db: Session, user_ids: List[int]) -> dict[int, str]:
-    if not user_ids:
-        return {}
-    rows = (
-        db.execute(select(models.User).where(models.User.id.in_(set(user_ids))))
-        .scalars()
-        .all()
-    )
-    return {row.id: row.email for row in rows}
-
-
 def _idea_to_card(idea: models.Idea, owner_email: Optional[str]) -> ProjectCard:
     return ProjectCard(
         id=idea.id,
@@ -82,103 +72,113 @@ def _idea_to_card(idea: models.Idea, owner_email: Optional[str]) -> ProjectCard:
     )
 
 
-@router.get("/overview", response_model=OverviewResponse)
-def projects_overview(user = Depends(get_current_user), db: Session = Depends(get_db)) -> OverviewResponse:
-    my_ideas_rows = ideas_crud.list_ideas_for_user(db, user_id=user.id)
-    owner_lookup = _resolve_user_emails(db, [user.id])
-    my_projects = [_idea_to_card(row, owner_lookup.get(row.created_by_id)) for row in my_ideas_rows]
-
-    company_rows = (
-        db.execute(select(models.Idea).order_by(models.Idea.created_at.desc()).limit(20))
-        .scalars()
-        .all()
-    )
-    creator_ids = [row.created_by_id for row in company_rows if row.created_by_id]
-    creator_lookup = _resolve_user_emails(db, creator_ids)
-    company_projects = [_idea_to_card(row, creator_lookup.get(row.created_by_id)) for row in company_rows]
+# Warm overviews come from memory: keyed by role/user, valid for the data_versions rows the ETag was
+# built from, so a write on any worker invalidates them at once (services/data_version.py)
+overview_cache = data_version.VersionedCache("OVERVIEW", max_size=1000, ttl=30)
+OVERVIEW_TABLES = ("ideas", "reviews", "assignments")
 
-    status_counts_rows = db.execute(
-        select(models.Idea.status, func.count(models.Idea.id)).group_by(models.Idea.status)
-    ).all()
-    status_counts = [StatusCount(status=row[0] or "unknown", count=row[1]) for row in status_counts_rows]
 
-    analyst_queue: List[ReviewCard] = []
-    finance_queue: List[ReviewCard] = []
-    developer_assignments: List[AssignmentCard] = []
-    invites: List[AssignmentCard] = []
-
-    if user.role in ("analyst", "admin"):
-        pending = reviews_crud.list_pending_for_stage(db, stage="analyst", reviewer_id=None if user.role == "admin" else user.id)
-        idea_ids = [rev.idea_id for rev in pending]
-        idea_lookup = {idea.id: idea for idea in db.execute(select(models.Idea).where(models.Idea.id.in_(idea_ids))).scalars().all()}
-        reviewer_lookup = _resolve_user_emails(db, [rev.reviewer_id for rev in pending if rev.reviewer_id])
-        for rev in pending:
-            idea = idea_lookup.get(rev.idea_id)
-            if not idea:
-                continue
-            analyst_queue.append(
-                ReviewCard(
-                    id=rev.id,
-                    idea_id=rev.idea_id,
-                    idea_title=idea.title,
-                    stage=rev.stage,
-                    decision=rev.decision,
-                    reviewer_id=rev.reviewer_id,
-                    reviewer_email=reviewer_lookup.get(rev.reviewer_id),
-                    created_at=rev.created_at,
-                )
+def _company_section(db: Session, version: tuple) -> tuple[List[ProjectCard], List[StatusCount]]:
+    # Same for every caller; cached separately so a cold per-user entry only runs the per-user queries
+    cached = overview_cache.get(("company",), version)
+    if cached is not None:
+        return cached
+    rows = db.execute(
+        select(models.Idea, models.User.email)
+        .outerjoin(models.User, models.User.id == models.Idea.created_by_id)
+        .order_by(models.Idea.created_at.desc())
+        .limit(20)
+    ).all()
+    company_projects = [_idea_to_card(idea, email) for idea, email in rows]
+    # Maintained counters (crud/idea_counts.py): one tiny read instead of a GROUP BY over ideas
+    status_counts = [StatusCount(status=status or "unknown", count=n) for status, n in idea_counts.status_counts(db)]
+    section = (company_projects, status_counts)
+    overview_cache.put(("company",), version, section)
+    return section
+
+
+def _review_queues(db: Session, stages: List[str], reviewer_id: Optional[int]) -> dict[str, List[ReviewCard]]:
+    queues: dict[str, List[ReviewCard]] = {stage: [] for stage in stages}
+    if not stages:
+        return queues
+    R = models.Review
+    stmt = (
+        select(R, models.Idea.title, models.User.email)
+        .join(models.Idea, models.Idea.id == R.idea_id)
+        .outerjoin(models.User, models.User.id == R.reviewer_id)
+        .where(R.stage.in_(stages), R.decision.is_(None))
+    )
+    if reviewer_id is not None:
+        stmt = stmt.where(R.reviewer_id == reviewer_id)
+    for rev, idea_title, reviewer_email in db.execute(stmt.order_by(R.created_at.asc())).all():
+        queues[rev.stage].append(
+            ReviewCard(
+                id=rev.id,
+                idea_id=rev.idea_id,
+                idea_title=idea_title,
+                stage=rev.stage,
+                decision=rev.decision,
+                reviewer_id=rev.reviewer_id,
+                reviewer_email=reviewer_email,
+                created_at=rev.created_at,
             )
+        )
+    return queues
+
+
+def _assignment_cards(db: Session, developer_id: Optional[int]) -> List[AssignmentCard]:
+    A = models.Assignment
+    stmt = select(A, models.Idea.title, models.Idea.status).join(models.Idea, models.Idea.id == A.idea_id)
+    if developer_id is not None:
+        stmt = stmt.where(A.developer_id == developer_id)
+    return [
+        AssignmentCard(
+            id=assignment.id,
+            idea_id=assignment.idea_id,
+            idea_title=idea_title,
+            assignment_status=assignment.status,
+            idea_status=idea_status,
+            developer_id=assignment.developer_id,
+            created_at=assignment.created_at,
+        )
+        for assignment, idea_title, idea_status in db.execute(stmt.order_by(A.created_at.asc())).all()
+    ]
 
-    if user.role in ("finance", "admin"):
-        pending = reviews_crud.list_pending_for_stage(db, stage="finance", reviewer_id=None if user.role == "admin" else user.id)
-        idea_ids = [rev.idea_id for rev in pending]
-        idea_lookup = {idea.id: idea for idea in db.execute(select(models.Idea).where(models.Idea.id.in_(idea_ids))).scalars().all()}
-        reviewer_lookup = _resolve_user_emails(db, [rev.reviewer_id for rev in pending if rev.reviewer_id])
-        for rev in pending:
-            idea = idea_lookup.get(rev.idea_id)
-            if not idea:
-                continue
-            finance_queue.append(
-                ReviewCard(
-                    id=rev.id,
-                    idea_id=rev.idea_id,
-                    idea_title=idea.title,
-                    stage=rev.stage,
-                    decision=rev.decision,
-                    reviewer_id=rev.reviewer_id,
-                    reviewer_email=reviewer_lookup.get(rev.reviewer_id),
-                    created_at=rev.created_at,
-                )
-            )
 
+@router.get("/overview", response_model=OverviewResponse)
+def projects_overview(request: Request, response: Response, user = Depends(get_token_user), db: Session = Depends(get_db)) -> OverviewResponse:
+    # Read the versions before querying: a write landing meanwhile makes this entry stale, never wrong
+    versions = data_version.read(db, OVERVIEW_TABLES)
+    not_mod = not_modified(request, response, db, OVERVIEW_TABLES, user.id, user.role, versions=versions)
+    if not_mod is not None:
+        return not_mod
+    version = tuple(sorted(versions.items()))
+    key = ("user", user.role, user.id)
+    cached = overview_cache.get(key, version)
+    if cached is not None:
+        return cached
+
+    my_projects = [_idea_to_card(row, user.email) for row in ideas_crud.list_ideas_for_user(db, user_id=user.id)]
+    company_projects, status_counts = _company_section(db, version)
+
+    stages = [stage for stage, roles in (("analyst", ("analyst", "admin")), ("finance", ("finance", "admin"))) if user.role in roles]
+    queues = _review_queues(db, stages, None if user.role == "admin" else user.id)
+
+    developer_assignments: List[AssignmentCard] = []
+    invites: List[AssignmentCard] = []
     if user.role in ("developer", "admin"):
-        assignments = assignments_crud.list_assignments(db, for_user_id=user.id if user.role != "admin" else None)
-        idea_ids = [assignment.idea_id for assignment in assignments]
-        idea_lookup = {idea.id: idea for idea in db.execute(select(models.Idea).where(models.Idea.id.in_(idea_ids))).scalars().all()}
-        for assignment in assignments:
-            idea = idea_lookup.get(assignment.idea_id)
-            if not idea:
-                continue
-            card = AssignmentCard(
-                id=assignment.id,
-                idea_id=assignment.idea_id,
-                idea_title=idea.title,
-                assignment_status=assignment.status,
-                idea_status=getattr(idea, "status", None),
-                developer_id=assignment.developer_id,
-                created_at=assignment.created_at,
-            )
-            developer_assignments.append(card)
-            if assignment.status == "invited" and (user.role == "developer" or user.role == "admin"):
-                invites.append(card)
+        developer_assignments = _assignment_cards(db, user.id if user.role != "admin" else None)
+        invites = [card for card in developer_assignments if card.assignment_status == "invited"]
 
-    return OverviewResponse(
+    overview = OverviewResponse(
         role=user.role,
         my_projects=my_projects,
         company_projects=company_projects,
         status_counts=status_counts,
-        analyst_queue=analyst_queue,
-        finance_queue=finance_queue,
+        analyst_queue=queues.get("analyst", []),
+        finance_queue=queues.get("finance", []),
         developer_assignments=developer_assignments,
         invites=invites,
     )
+    overview_cache.put(key, version, overview)
+    return overview
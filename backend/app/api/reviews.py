@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
@@ -10,6 +10,8 @@ from ..crud import ideas as ideas_crud
 from ..services.email import render_template
 from ..crud import events as events_crud
 from ..core.security import RoleChecker, get_current_user
+from ..core.etag import not_modified
+from ..core.projection import parse_fields, rows_response
 
 
 router = APIRouter()
@@ -80,7 +82,21 @@ def finance_decision(payload: DecisionRequest, db: Session = Depends(get_db), us
     return {"id": row.id, "stage": row.stage, "decision": row.decision}
 
 
+REVIEW_FIELDS = ("id", "idea_id", "stage", "reviewer_id", "decision", "notes", "created_at")
+PENDING_FIELDS = ("id", "idea_id", "stage", "created_at")
+
+
 @router.get("/pending")
-def pending(stage: str = Query(..., pattern="^(analyst|finance)$"), db: Session = Depends(get_db)):
-    rows = reviews_crud.list_pending(db, stage=stage)
-    return [{"id": r.id, "idea_id": r.idea_id, "stage": r.stage, "created_at": r.created_at.isoformat()} for r in rows]
+def pending(
+    request: Request,
+    response: Response,
+    stage: str = Query(..., pattern="^(analyst|finance)$"),
+    fields: str | None = Query(None, description="Comma-separated subset of: " + ", ".join(REVIEW_FIELDS)),
+    db: Session = Depends(get_db),
+):
+    not_mod = not_modified(request, response, db, ("reviews",))
+    if not_mod is not None:
+        return not_mod
+    names = parse_fields(fields, REVIEW_FIELDS, PENDING_FIELDS)
+    rows = reviews_crud.list_pending(db, stage=stage, columns=names)
+    return rows_response(names, rows, response)
@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, Header
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Header, Query, Response
 from pydantic import BaseModel
 from typing import Optional, List
 import os
 from sqlalchemy.orm import Session
 
+from ..db import session as db_session
 from ..db.session import get_db
 from ..crud.users import get_user_by_email, create_user
 from ..crud import ideas as ideas_crud
@@ -11,67 +13,33 @@ from ..crud import embeddings as emb_crud
 from ..services.embeddings import generate_embedding
 from ..crud import events as events_crud
 from ..db import models
+from ..services import audit_sink, voice_quota
+from ..services.voice_identity import identity_cache, normalize_email, normalize_phone
+from ..services.voice_sessions import ROUTING_HEADER, routing_key, store as session_store
+from ..crud import voice_usage as usage_crud
+from ..core.security import RoleChecker
+from ..core.streaming import frame, stream_format, streaming_response
 
 
 router = APIRouter()
 
 
-def _normalize_email(email: Optional[str]) -> Optional[str]:
-    if not email:
-        return None
-    try:
-        from email_validator import validate_email, EmailNotValidError
-        v = validate_email(email, check_deliverability=False)
-        return v.normalized
-    except Exception:
-        return email.strip().lower()
+def _record_usage_and_check_quota(api_key: str):
+    # Quota from in-memory/shared counters; the usage row is written later in a batch
+    retry = voice_quota.check_quota(api_key)
+    if retry:
+        raise HTTPException(status_code=429, detail="Voice API quota exceeded", headers={"Retry-After": str(max(1, int(retry + 0.999)))})
+    voice_quota.record_usage(api_key)
 
 
-def _normalize_phone(phone: Optional[str]) -> Optional[str]:
-    if not phone:
-        return None
-    try:
-        import phonenumbers
-        num = phonenumbers.parse(phone, None)
-        if phonenumbers.is_valid_number(num):
-            return phonenumbers.format_number(num, phonenumbers.PhoneNumberFormat.E164)
-    except Exception:
-        pass
-    # Fallback: digits only prefixed
-    digits = ''.join(ch for ch in phone if ch.isdigit())
-    if not digits:
-        return None
-    if not digits.startswith('+' ):
-        digits = '+' + digits
-    return digits
-
-
-def _record_usage_and_check_quota(db: Session, api_key: str):
-    # record usage
-    row = models.VoiceUsage(api_key=api_key)
-    db.add(row)
-    db.commit()
-    # quotas
-    from datetime import datetime, timedelta
-    qpm = int(os.getenv('VOICE_QUOTA_PER_MINUTE', '60') or 60)
-    qpd = int(os.getenv('VOICE_QUOTA_PER_DAY', '5000') or 5000)
-    now = datetime.utcnow()
-    min_cut = now - timedelta(minutes=1)
-    day_cut = now - timedelta(days=1)
-    per_min = db.query(models.VoiceUsage).filter(models.VoiceUsage.api_key==api_key, models.VoiceUsage.created_at >= min_cut).count()
-    per_day = db.query(models.VoiceUsage).filter(models.VoiceUsage.api_key==api_key, models.VoiceUsage.created_at >= day_cut).count()
-    if per_min > qpm or per_day > qpd:
-        raise HTTPException(status_code=429, detail="Voice API quota exceeded")
-
-
-def require_voice_key(x_voice_api_key: Optional[str] = Header(None), db: Session = Depends(get_db)):
+def require_voice_key(x_voice_api_key: Optional[str] = Header(None)):
     key = os.getenv("VOICE_API_KEY")
     if not key:
         raise HTTPException(status_code=500, detail="Voice API key not configured")
     if x_voice_api_key != key:
         raise HTTPException(status_code=401, detail="Invalid voice API key")
     # quota accounting
-    _record_usage_and_check_quota(db, x_voice_api_key)
+    _record_usage_and_check_quota(x_voice_api_key)
 
 
 class IdentifyRequest(BaseModel):
@@ -90,36 +58,39 @@ class IdentifyResponse(BaseModel):
 
 
 @router.post("/identify", response_model=IdentifyResponse, dependencies=[Depends(require_voice_key)])
-def identify(req: IdentifyRequest, db: Session = Depends(get_db)):
+def identify(req: IdentifyRequest, response: Response, db: Session = Depends(get_db)):
     if not req.email and not req.phone and not req.external_id:
         raise HTTPException(status_code=400, detail="Provide at least one of email/phone/external_id")
-    # For MVP we use email as primary; if missing, synthesize pseudo-email from external_id/phone
-    email = _normalize_email(req.email)
-    phone = _normalize_phone(req.phone)
-    if not email:
-        email = (f"{req.external_id}@voice.local" if req.external_id else None) or (f"{(phone or '').replace('+','') }@voice.local" if phone else None)
-    if not email:
-        raise HTTPException(status_code=400, detail="Cannot resolve user identity")
-    user = get_user_by_email(db, email)
-    if not user:
-        user = create_user(db, email=email, password_hash="", full_name=req.full_name or None)
+    # Repeat callers: neither the parsers nor the users query run on a cache hit
+    key = (req.external_id or None, req.phone or None, req.email or None)
+    ident = identity_cache.get(key)
+    if ident is None:
+        # For MVP we use email as primary; if missing, synthesize pseudo-email from external_id/phone
+        email = normalize_email(req.email)
+        phone = normalize_phone(req.phone)
+        if not email:
+            email = (f"{req.external_id}@voice.local" if req.external_id else None) or (f"{(phone or '').replace('+','') }@voice.local" if phone else None)
+        if not email:
+            raise HTTPException(status_code=400, detail="Cannot resolve user identity")
+        user = get_user_by_email(db, email)
+        if not user:
+            user = create_user(db, email=email, password_hash="", full_name=req.full_name or None)
+        ident = identity_cache.put(key, user)
     # ensure session
     session_id = req.session_id or None
     if session_id:
-        sess = db.get(models.VoiceSession, session_id)
+        sess = session_store.get(db, session_id)
         if not sess:
             session_id = None
     if not session_id:
-        sess = models.VoiceSession(api_key=os.getenv('VOICE_API_KEY',''), user_email=user.email, context={})
-        db.add(sess)
-        db.commit()
-        db.refresh(sess)
+        sess = session_store.create(db, api_key=os.getenv('VOICE_API_KEY',''), user_email=ident.email)
         session_id = sess.id
+    response.headers[ROUTING_HEADER] = routing_key(session_id)
     try:
-        events_crud.record_event(db, entity="voice_session", entity_id=session_id, event="identify", payload={"email": user.email})
+        events_crud.record_event(db, entity="voice_session", entity_id=session_id, event="identify", payload={"email": ident.email})
     except Exception:
         pass
-    return IdentifyResponse(email=user.email, full_name=user.full_name, role=user.role, session_id=session_id)
+    return IdentifyResponse(email=ident.email, full_name=ident.full_name, role=ident.role, session_id=session_id)
 
 
 class VoiceIdeaRequest(BaseModel):
@@ -143,22 +114,7 @@ class VoiceIdeaResponse(BaseModel):
     session_id: Optional[int] = None
 
 
-@router.post("/create-idea", response_model=VoiceIdeaResponse, dependencies=[Depends(require_voice_key)])
-def voice_create_idea(req: VoiceIdeaRequest, db: Session = Depends(get_db)):
-    # resolve user
-    user = get_user_by_email(db, req.email)
-    if not user:
-        user = create_user(db, email=req.email, password_hash="")
-    # session
-    sess = None
-    if req.session_id:
-        sess = db.get(models.VoiceSession, req.session_id)
-    if not sess:
-        sess = models.VoiceSession(api_key=os.getenv('VOICE_API_KEY',''), user_email=req.email, context={})
-        db.add(sess)
-        db.commit()
-        db.refresh(sess)
-
+def _parse_idea_fields(req: VoiceIdeaRequest) -> tuple[Optional[str], Optional[str], list[str]]:
     title = req.title
     desc = req.description
     if (not title or not desc) and req.raw:
@@ -173,56 +129,116 @@ def voice_create_idea(req: VoiceIdeaRequest, db: Session = Depends(get_db)):
         need.append('title')
     if not desc:
         need.append('description')
+    return title, desc, need
+
+
+def _write_idea(db: Session, req: VoiceIdeaRequest, title, desc, need: list[str], vec):
+    """One unit of work: user, session, idea, embedding and audit event, committed once."""
+    user = get_user_by_email(db, req.email)
+    if not user:
+        user = create_user(db, email=req.email, password_hash="", commit=False)
+    sess = None
+    if req.session_id:
+        sess = session_store.get(db, req.session_id)
+    if not sess:
+        sess = session_store.create(db, api_key=os.getenv('VOICE_API_KEY',''), user_email=req.email, commit=False)
+
     if need:
         # store pending fields in session context
         sess.context = {**(sess.context or {}), 'pending': {'title': title, 'description': desc}}
         sess.last_response = f"Need: {', '.join(need)}"
-        db.add(sess)
+        events_crud.record_event(db, entity="voice_session", entity_id=sess.id, event="clarify", payload={'need': need}, commit=False)
         db.commit()
-        try:
-            events_crud.record_event(db, entity="voice_session", entity_id=sess.id, event="clarify", payload={'need': need})
-        except Exception:
-            pass
-        return VoiceIdeaResponse(response=sess.last_response, idea_id=0, possible_duplicates=[], need=need, session_id=sess.id)
-
-    vec = generate_embedding(f"{title}\n{desc}")
-    try:
-        dupes_raw = emb_crud.find_similar(db, vector=vec, limit=5, min_score=0.9)
-    except Exception:
-        dupes_raw = []
+        session_store.save(sess)
+        return sess, 0, None
 
-    row = ideas_crud.create_idea(db, title=title, description=desc, author_email=req.email, created_by_id=user.id)
+    row = ideas_crud.create_idea(db, title=title, description=desc, author_email=req.email, created_by_id=user.id, commit=False)
     try:
-        emb_crud.add_embedding(db, idea_id=row.id, vector=vec)
-    except Exception:
-        pass
-    try:
-        events_crud.record_event(db, entity="idea", entity_id=row.id, event="created_voice", payload={"user": req.email})
+        # Savepoint: a failed embedding insert must not take the idea down with it
+        with db.begin_nested():
+            emb_crud.add_embedding(db, idea_id=row.id, vector=vec, commit=False)
     except Exception:
         pass
+    events_crud.record_event(db, entity="idea", entity_id=row.id, event="created_voice", payload={"user": req.email}, commit=False)
+    # Read before commit: expire_on_commit would otherwise cost a refresh SELECT
+    idea_id, status = row.id, getattr(row, 'status', None) or 'submitted'
+    db.commit()
+    return sess, idea_id, status
+
 
+def _finish_idea(sess, idea_id: int, status: str, dupes_raw: list[dict]) -> VoiceIdeaResponse:
     dupes_sentence = ""
     if dupes_raw:
         parts = [f"#{d['idea_id']} ({d['score']:.2f})" for d in dupes_raw]
         dupes_sentence = " Possible duplicates: " + ", ".join(parts)
-    response_text = f"Idea #{row.id} created. Current status: {getattr(row,'status', 'submitted')}." + dupes_sentence
-    # update session
-    try:
-        sess.last_response = response_text
-        sess.context = {**(sess.context or {}), 'last_idea_id': row.id}
-        db.add(sess)
-        db.commit()
-    except Exception:
-        pass
+    response_text = f"Idea #{idea_id} created. Current status: {status}." + dupes_sentence
+    # Session update goes through the write-behind cache, after the commit
+    sess.last_response = response_text
+    sess.context = {**(sess.context or {}), 'last_idea_id': idea_id}
+    session_store.save(sess)
     return VoiceIdeaResponse(
         response=response_text,
-        idea_id=row.id,
+        idea_id=idea_id,
         possible_duplicates=[DuplicateCandidate(**d) for d in dupes_raw],
         need=[],
-        session_id=sess.id if sess else None,
+        session_id=sess.id,
     )
 
 
+def _iter_create_idea(req: VoiceIdeaRequest, fmt: str):
+    # Own session: the request-scoped one may be closed before the body finishes streaming
+    yield frame(fmt, "ack", {"response": "Got it, saving your idea."})
+    db = db_session.SessionLocal()
+    try:
+        title, desc, need = _parse_idea_fields(req)
+        vec = generate_embedding(f"{title}\n{desc}") if not need else None
+        sess, idea_id, status = _write_idea(db, req, title, desc, need, vec)
+        if need:
+            body = VoiceIdeaResponse(response=sess.last_response, idea_id=0, possible_duplicates=[], need=need, session_id=sess.id)
+            yield frame(fmt, "done", body.model_dump())
+            return
+        yield frame(fmt, "idea", {"idea_id": idea_id, "status": status, "session_id": sess.id})
+        # Dedup after the commit, so the idea id is spoken before the slow search runs
+        dupes_raw = []
+        try:
+            for d in emb_crud.iter_similar(db, vector=vec, limit=5, min_score=0.9, exclude_idea_id=idea_id):
+                dupes_raw.append(d)
+                yield frame(fmt, "duplicate", d)
+        except Exception:
+            db.rollback()
+        yield frame(fmt, "done", _finish_idea(sess, idea_id, status, dupes_raw).model_dump())
+    except Exception:
+        yield frame(fmt, "error", {"detail": "Failed to create idea"})
+    finally:
+        db.close()
+
+
+@router.post("/create-idea", response_model=VoiceIdeaResponse, dependencies=[Depends(require_voice_key)])
+def voice_create_idea(req: VoiceIdeaRequest, response: Response, db: Session = Depends(get_db), accept: Optional[str] = Header(None)):
+    fmt = stream_format(accept)
+    if fmt:
+        headers = {ROUTING_HEADER: routing_key(req.session_id)} if req.session_id else None
+        return streaming_response(_iter_create_idea(req, fmt), fmt, headers)
+
+    title, desc, need = _parse_idea_fields(req)
+    # Dedup search is the slow part; run it before the unit of work opens so no locks are held meanwhile
+    vec = None
+    dupes_raw = []
+    if not need:
+        vec = generate_embedding(f"{title}\n{desc}")
+        try:
+            dupes_raw = emb_crud.find_similar(db, vector=vec, limit=5, min_score=0.9)
+        except Exception:
+            db.rollback()
+            dupes_raw = []
+
+    sess, idea_id, status = _write_idea(db, req, title, desc, need, vec)
+    response.headers[ROUTING_HEADER] = routing_key(sess.id)
+    if need:
+        return VoiceIdeaResponse(response=sess.last_response, idea_id=0, possible_duplicates=[], need=need, session_id=sess.id)
+    return _finish_idea(sess, idea_id, status, dupes_raw)
+
+
 class VoiceStatusRequest(BaseModel):
     email: str
     idea_id: Optional[int] = None
@@ -236,11 +252,9 @@ class VoiceStatusResponse(BaseModel):
     session_id: Optional[int] = None
 
 
-@router.post("/get-status", response_model=VoiceStatusResponse, dependencies=[Depends(require_voice_key)])
-def voice_get_status(req: VoiceStatusRequest, db: Session = Depends(get_db)):
+def _lookup_status(db: Session, req: VoiceStatusRequest) -> VoiceStatusResponse:
     # fetch idea by id (and optionally verify ownership via email)
     from sqlalchemy import select
-    from ..db import models
 
     idea = None
     if req.idea_id is not None:
@@ -272,6 +286,32 @@ def voice_get_status(req: VoiceStatusRequest, db: Session = Depends(get_db)):
     return VoiceStatusResponse(response=f"Idea #{idea.id} status is {status}.", idea_id=idea.id, status=status, session_id=sid)
 
 
+def _iter_get_status(req: VoiceStatusRequest, fmt: str):
+    yield frame(fmt, "ack", {"response": "One moment, checking."})
+    db = db_session.SessionLocal()
+    try:
+        body = _lookup_status(db, req)
+        if body.idea_id is not None:
+            yield frame(fmt, "idea", {"idea_id": body.idea_id, "status": body.status})
+        yield frame(fmt, "done", body.model_dump())
+        if audit_sink.session_has_pending(db):
+            db.commit()
+    except HTTPException as exc:
+        yield frame(fmt, "error", {"status_code": exc.status_code, "detail": exc.detail})
+    except Exception:
+        yield frame(fmt, "error", {"detail": "Failed to get status"})
+    finally:
+        db.close()
+
+
+@router.post("/get-status", response_model=VoiceStatusResponse, dependencies=[Depends(require_voice_key)])
+def voice_get_status(req: VoiceStatusRequest, db: Session = Depends(get_db), accept: Optional[str] = Header(None)):
+    fmt = stream_format(accept)
+    if fmt:
+        return streaming_response(_iter_get_status(req, fmt), fmt)
+    return _lookup_status(db, req)
+
+
 class VoiceRepeatRequest(BaseModel):
     session_id: int
 
@@ -282,13 +322,47 @@ class VoiceRepeatResponse(BaseModel):
 
 
 @router.post("/repeat", response_model=VoiceRepeatResponse, dependencies=[Depends(require_voice_key)])
-def voice_repeat(req: VoiceRepeatRequest, db: Session = Depends(get_db)):
-    sess = db.get(models.VoiceSession, req.session_id)
+def voice_repeat(req: VoiceRepeatRequest, response: Response, db: Session = Depends(get_db)):
+    sess = session_store.get(db, req.session_id)
     if not sess:
         raise HTTPException(status_code=404, detail="Session not found")
     resp = sess.last_response or "No previous response."
+    response.headers[ROUTING_HEADER] = routing_key(sess.id)
     try:
         events_crud.record_event(db, entity="voice_session", entity_id=sess.id, event="repeat", payload={})
     except Exception:
         pass
     return VoiceRepeatResponse(response=resp, session_id=sess.id)
+
+
+class UsageBucket(BaseModel):
+    key_id: str
+    granularity: str
+    bucket_start: datetime
+    count: int
+
+
+class UsageReportResponse(BaseModel):
+    buckets: List[UsageBucket]
+    current_minute: Optional[int] = None
+    last_24h: Optional[int] = None
+
+
+@router.get("/usage-report", response_model=UsageReportResponse, dependencies=[Depends(RoleChecker(["admin"]))])
+def usage_report(
+    granularity: str = Query("day", pattern="^(minute|day)$"),
+    api_key: Optional[str] = Query(None, description="Filter by API key; hashed here, buckets carry only its key_id"),
+    date_from: Optional[datetime] = Query(None),
+    date_to: Optional[datetime] = Query(None),
+    limit: int = Query(500, ge=1, le=5000),
+    db: Session = Depends(get_db),
+):
+    voice_quota.usage_writer.flush()
+    key_id = voice_quota.key_id(api_key) if api_key else None
+    rows = usage_crud.usage_report(db, granularity=granularity, key_id=key_id, date_from=date_from, date_to=date_to, limit=limit)
+    out = UsageReportResponse(
+        buckets=[UsageBucket(key_id=r.key_id, granularity=r.granularity, bucket_start=r.bucket_start, count=r.count) for r in rows]
+    )
+    if key_id:
+        out.current_minute, out.last_24h = usage_crud.recent_counts(db, key_id=key_id)
+    return out
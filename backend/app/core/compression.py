@@ -0,0 +1,186 @@
+import zlib
+from typing import Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+# Response compression, negotiated from Accept-Encoding (br when the brotli module is installed,
+# else gzip). Bodies sent in one message are compressed whole and only above `min_size`;
+# streamed bodies (StreamingResponse) are compressed chunk by chunk with a flush after each, so
+# every NDJSON line/batch still reaches the client as soon as it is yielded. Responses that
+# already carry a Content-Encoding (GET /export with gzip) and SSE streams pass through untouched.
+
+COMPRESSIBLE = ("application/json", "application/x-ndjson", "application/problem+json", "application/javascript", "text/", "image/svg+xml")
+SKIP_TYPES = ("text/event-stream",)
+
+
+def negotiate(accept_encoding: str, brotli_available: bool = brotli is not None) -> Optional[str]:
+    """'br' / 'gzip' / None from an Accept-Encoding header, honouring q-values (q=0 refuses)."""
+    best, best_q = None, 0.0
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip()
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if coding == "*":
+            candidates = ("br", "gzip") if brotli_available else ("gzip",)
+        elif coding in ("br", "gzip"):
+            candidates = (coding,)
+        else:
+            continue
+        for c in candidates:
+            if c == "br" and not brotli_available:
+                continue
+            # Ties go to br (smaller for the same CPU at moderate quality)
+            if q > best_q or (q == best_q and q > 0 and c == "br"):
+                best, best_q = c, q
+    return best if best_q > 0 else None
+
+
+class _Compressor:
+    def __init__(self, coding: str, level: int):
+        self.coding = coding
+        if coding == "br":
+            self._c = brotli.Compressor(quality=level)
+        else:
+            self._c = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, flush: bool) -> bytes:
+        if self.coding == "br":
+            out = self._c.process(data)
+            return out + self._c.flush() if flush else out
+        out = self._c.compress(data)
+        return out + self._c.flush(zlib.Z_SYNC_FLUSH) if flush else out
+
+    def finish(self) -> bytes:
+        return self._c.finish() if self.coding == "br" else self._c.flush()
+
+
+class CompressionMiddleware:
+    """Pure ASGI gzip/brotli with a size threshold, streaming support and per-route levels.
+
+    Levels are per first path segment (same keys as the rate limiter); level 0 turns compression
+    off for that route.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        min_size: int = 1024,
+        gzip_level: int = 6,
+        br_quality: int = 4,
+        gzip_routes: dict[str, int] | None = None,
+        br_routes: dict[str, int] | None = None,
+    ):
+        self.app = app
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.br_quality = br_quality
+        self.gzip_routes = gzip_routes or {}
+        self.br_routes = br_routes or {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope.get("method") == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        accept = ""
+        for name, value in scope.get("headers") or ():
+            if name == b"accept-encoding":
+                accept = value.decode("latin-1")
+                break
+        coding = negotiate(accept) if accept else None
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+        path = scope.get("path") or ""
+        segment = path.split("/", 2)[1] if path.startswith("/") else "root"
+        if coding == "br":
+            level = self.br_routes.get(segment, self.br_quality)
+        else:
+            level = self.gzip_routes.get(segment, self.gzip_level)
+        if level <= 0:
+            await self.app(scope, receive, send)
+            return
+        await _Responder(self.app, coding, level, self.min_size)(scope, receive, send)
+
+
+class _Responder:
+    def __init__(self, app: ASGIApp, coding: str, level: int, min_size: int):
+        self.app = app
+        self.coding = coding
+        self.level = level
+        self.min_size = min_size
+        self.start: Optional[Message] = None
+        self.active = False
+        self.passthrough = False
+        self.compressor: Optional[_Compressor] = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    def _eligible(self, headers: MutableHeaders, status: int) -> bool:
+        if status < 200 or status in (204, 206, 304) or "content-encoding" in headers or "content-range" in headers:
+            return False
+        ctype = headers.get("content-type", "").lower()
+        if not ctype or ctype.startswith(SKIP_TYPES):
+            return False
+        return ctype.startswith(COMPRESSIBLE)
+
+    async def send_compressed(self, message: Message):
+        kind = message["type"]
+        if kind == "http.response.start":
+            message.setdefault("headers", [])
+            headers = MutableHeaders(scope=message)
+            if not self._eligible(headers, message["status"]):
+                self.passthrough = True
+                await self.send(message)
+                return
+            # Wait for the first body chunk: whole-body vs streamed decides the headers
+            self.start = message
+            return
+        if kind != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more = message.get("more_body", False)
+        if not self.active:
+            start, self.start = self.start, None
+            headers = MutableHeaders(scope=start)
+            if not more and len(body) < self.min_size:
+                self.passthrough = True
+                await self.send(start)
+                await self.send(message)
+                return
+            self.active = True
+            self.compressor = _Compressor(self.coding, self.level)
+            headers["Content-Encoding"] = self.coding
+            headers.add_vary_header("Accept-Encoding")
+            if not more:
+                data = self.compressor.compress(body, False) + self.compressor.finish()
+                headers["Content-Length"] = str(len(data))
+                await self.send(start)
+                await self.send({"type": "http.response.body", "body": data, "more_body": False})
+                return
+            if "content-length" in headers:
+                del headers["Content-Length"]
+            await self.send(start)
+
+        if more:
+            data = self.compressor.compress(body, True)
+            if data:
+                await self.send({"type": "http.response.body", "body": data, "more_body": True})
+        else:
+            data = self.compressor.compress(body, False) + self.compressor.finish()
+            await self.send({"type": "http.response.body", "body": data, "more_body": False})
@@ -0,0 +1,51 @@
+import hashlib
+from typing import Iterable, Optional
+
+from fastapi import Request, Response
+from sqlalchemy.orm import Session
+
+from ..services import data_version
+
+# Conditional GET for polled list endpoints. The ETag is derived from data_versions rows (one
+# primary-key read) plus whatever scopes the representation (user, role, query string), so an
+# unchanged poll is answered 304 before the main query runs or anything is serialized.
+
+CACHE_CONTROL = "private, no-cache"
+
+
+def weak_etag(*parts) -> str:
+    digest = hashlib.blake2b("|".join(str(p) for p in parts).encode("utf-8"), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison: ignore W/ on both sides
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def not_modified(
+    request: Request, response: Response, db: Session, tables: Iterable[str], *scope, versions: Optional[dict[str, int]] = None
+) -> Optional[Response]:
+    """Return a 304 response if the client's copy is current, else set ETag on `response` and return None.
+
+    Pass `versions` (data_version.read) when the handler keys its own cache on the same read.
+    """
+    if versions is None:
+        versions = data_version.read(db, tuple(tables))
+    etag = weak_etag(request.url.path, request.url.query, *sorted(versions.items()), *scope)
+    if matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    return None
@@ -0,0 +1,295 @@
+"""Pluggable GCRA limiter backends shared by the HTTP rate limiter and quota checks.
+
+Every backend exposes ``hit(key, limit, cost=1, window=60.0) -> float``: 0 when the request is
+allowed, otherwise the number of seconds until it would be. State per key is a single number,
+the theoretical arrival time (TAT).
+
+- ``memory``: per-process OrderedDict (LRU/TTL bounded); limits multiply by the worker count
+- ``shm``: fixed-size table in a memory-mapped file guarded by flock; shared by all workers on a host
+- ``redis``: GCRA as a Lua script, one EVALSHA round trip per check; shared by the whole fleet
+
+Select with RATE_LIMIT_BACKEND=memory|shm|redis (RATE_LIMIT_SHM_PATH, RATE_LIMIT_SHM_SLOTS,
+RATE_LIMIT_REDIS_URL). A backend that cannot be initialised falls back to ``memory``.
+"""
+import hashlib
+import os
+import socket
+import struct
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+
+class GCRALimiter:
+    """In-process backend: one float (TAT) per key in an LRU capped at `max_keys`.
+
+    Keys whose TAT is in the past carry no state worth keeping and are dropped opportunistically.
+    """
+
+    def __init__(self, window: float = 60.0, max_keys: int = 100_000):
+        self.window = window
+        self.max_keys = max_keys
+        self.store: OrderedDict[str, float] = OrderedDict()
+
+    def hit(self, key: str, limit: int, cost: int = 1, window: float | None = None, now: float | None = None) -> float:
+        window = self.window if window is None else window
+        now = time.monotonic() if now is None else now
+        interval = window / limit
+        store = self.store
+        tat = store.get(key, now)
+        if tat < now:
+            tat = now
+        new_tat = tat + interval * cost
+        if new_tat - now > window:
+            return new_tat - window - now
+        store[key] = new_tat
+        store.move_to_end(key)
+        if len(store) > self.max_keys:
+            store.popitem(last=False)
+        else:
+            # TTL: expire the least recently used key once its window has fully drained
+            oldest = next(iter(store))
+            if store[oldest] <= now:
+                del store[oldest]
+        return 0.0
+
+
+class SharedMemoryLimiter:
+    """Single-host backend: open-addressed table of (key hash, TAT) slots in an mmap'd file.
+
+    All uvicorn workers map the same file; a check takes an exclusive flock for a few
+    microseconds. When every probed slot is live the one with the oldest TAT is evicted.
+    """
+
+    _SLOT = struct.Struct("<Qd")
+    _PROBES = 8
+
+    def __init__(self, path: str | None = None, slots: int = 65536, window: float = 60.0):
+        import fcntl
+        import mmap
+
+        self._fcntl = fcntl
+        self.window = window
+        self.slots = slots
+        self.path = path or os.path.join("/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(), "fchr_rate_limit")
+        size = slots * self._SLOT.size
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if os.fstat(fd).st_size != size:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                try:
+                    if os.fstat(fd).st_size != size:
+                        os.ftruncate(fd, size)
+                finally:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+            self._fd = fd
+            self._mm = mmap.mmap(fd, size)
+        except Exception:
+            os.close(fd)
+            raise
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        h = int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+        return h or 1
+
+    def hit(self, key: str, limit: int, cost: int = 1, window: float | None = None, now: float | None = None) -> float:
+        window = self.window if window is None else window
+        now = time.time() if now is None else now
+        interval = window / limit
+        h = self._hash(key)
+        slot_size = self._SLOT.size
+        mm = self._mm
+        with self._lock:
+            self._fcntl.flock(self._fd, self._fcntl.LOCK_EX)
+            try:
+                # The key may own a slot further along its chain than a free one, so look at every
+                # probe for it before reusing anything
+                target = None
+                free = None
+                victim, victim_tat = None, None
+                for i in range(self._PROBES):
+                    idx = (h + i) % self.slots
+                    k, slot_tat = self._SLOT.unpack_from(mm, idx * slot_size)
+                    if k == h:
+                        target, tat = idx, slot_tat
+                        break
+                    if k == 0 or slot_tat <= now:
+                        # Empty or fully drained: reusable
+                        if free is None:
+                            free = idx
+                    elif victim_tat is None or slot_tat < victim_tat:
+                        victim, victim_tat = idx, slot_tat
+                if target is None:
+                    target, tat = (free if free is not None else victim), now
+                if tat < now:
+                    tat = now
+                new_tat = tat + interval * cost
+                if new_tat - now > window:
+                    return new_tat - window - now
+                self._SLOT.pack_into(mm, target * slot_size, h, new_tat)
+                return 0.0
+            finally:
+                self._fcntl.flock(self._fd, self._fcntl.LOCK_UN)
+
+
+_GCRA_LUA = """
+local interval = tonumber(ARGV[1])
+local cost = tonumber(ARGV[2])
+local window = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then tat = now end
+local new_tat = tat + interval * cost
+if new_tat - now > window then
+  return tostring(new_tat - window - now)
+end
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil((new_tat - now) * 1000))
+return '0'
+"""
+
+
+class RedisLimiter:
+    """Fleet-wide backend speaking RESP directly (no client dependency); one EVALSHA per check.
+
+    Uses the Redis server clock so workers with skewed clocks agree. Fails open: if Redis is
+    unreachable the request is allowed rather than taking the API down with it. After a failed
+    check a circuit breaker skips Redis for `backoff` seconds (doubling up to `max_backoff`), then
+    lets a single caller probe it again, so an outage does not cost every request the timeout.
+
+    ``hit`` does blocking socket I/O (``blocking = True``); async callers run it in a worker
+    thread. Each thread keeps its own connection.
+    """
+
+    blocking = True
+
+    def __init__(
+        self,
+        url: str = "redis://localhost:6379/0",
+        window: float = 60.0,
+        timeout: float = 0.05,
+        prefix: str = "rl:",
+        backoff: float = 0.5,
+        max_backoff: float = 30.0,
+    ):
+        u = urlparse(url)
+        self.host = u.hostname or "localhost"
+        self.port = u.port or 6379
+        self.db = int((u.path or "/0").lstrip("/") or 0)
+        self.password = u.password
+        self.window = window
+        self.timeout = timeout
+        self.prefix = prefix
+        self._sha = hashlib.sha1(_GCRA_LUA.encode("utf-8")).hexdigest()
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._local = threading.local()
+        self._failures = 0
+        self._open_until = 0.0
+        self._probe = threading.Lock()
+
+    def _connect(self):
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._local.sock, self._local.rfile = sock, sock.makefile("rb")
+        if self.password:
+            self._call("AUTH", self.password)
+        if self.db:
+            self._call("SELECT", str(self.db))
+
+    def _close(self):
+        try:
+            if getattr(self._local, "sock", None) is not None:
+                self._local.sock.close()
+        finally:
+            self._local.sock = self._local.rfile = None
+
+    def _call(self, *args: str):
+        parts = [b"*%d\r\n" % len(args)]
+        for a in args:
+            b = a.encode("utf-8")
+            parts.append(b"$%d\r\n%s\r\n" % (len(b), b))
+        self._local.sock.sendall(b"".join(parts))
+        return self._read()
+
+    def _read(self):
+        line = self._local.rfile.readline()
+        if not line:
+            raise ConnectionError("Redis connection closed")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest.decode()
+        if kind == b"-":
+            raise RedisError(rest.decode())
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            n = int(rest)
+            if n < 0:
+                return None
+            data = self._local.rfile.read(n + 2)
+            return data[:-2].decode()
+        if kind == b"*":
+            n = int(rest)
+            return None if n < 0 else [self._read() for _ in range(n)]
+        raise RedisError(f"Unexpected reply: {line!r}")
+
+    def eval(self, key: str, *args: str):
+        try:
+            return self._call("EVALSHA", self._sha, "1", key, *args)
+        except RedisError as e:
+            if not str(e).startswith("NOSCRIPT"):
+                raise
+            return self._call("EVAL", _GCRA_LUA, "1", key, *args)
+
+    def hit(self, key: str, limit: int, cost: int = 1, window: float | None = None, now: float | None = None) -> float:
+        window = self.window if window is None else window
+        args = (repr(window / limit), str(cost), repr(float(window)))
+        probing = False
+        if self._failures:
+            # Breaker open: fail open at once; once it cools down only one caller probes Redis
+            if time.monotonic() < self._open_until or not self._probe.acquire(blocking=False):
+                return 0.0
+            probing = True
+        try:
+            for _ in range(2):
+                try:
+                    if getattr(self._local, "sock", None) is None:
+                        self._connect()
+                    retry = float(self.eval(self.prefix + key, *args))
+                    self._failures = 0
+                    return retry
+                except (OSError, ConnectionError):
+                    self._close()
+                except RedisError:
+                    return 0.0
+            self._failures += 1
+            self._open_until = time.monotonic() + min(self.max_backoff, self.backoff * 2 ** (self._failures - 1))
+            return 0.0
+        finally:
+            if probing:
+                self._probe.release()
+
+
+class RedisError(Exception):
+    pass
+
+
+def make_backend(kind: str | None = None, *, window: float = 60.0, max_keys: int = 100_000):
+    kind = (kind if kind is not None else os.getenv("RATE_LIMIT_BACKEND", "memory") or "memory").strip().lower()
+    try:
+        if kind == "shm":
+            return SharedMemoryLimiter(
+                path=os.getenv("RATE_LIMIT_SHM_PATH") or None,
+                slots=int(os.getenv("RATE_LIMIT_SHM_SLOTS", "65536") or 65536),
+                window=window,
+            )
+        if kind == "redis":
+            return RedisLimiter(os.getenv("RATE_LIMIT_REDIS_URL", "redis://localhost:6379/0"), window=window)
+    except Exception:
+        pass
+    return GCRALimiter(window=window, max_keys=max_keys)
@@ -0,0 +1,35 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional
+
+from fastapi import HTTPException
+
+# Opaque keyset cursors on (created_at, id), shared by the paginated list endpoints.
+# The next page's cursor travels in the X-Next-Cursor response header.
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def parse_dt(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        # Accept both with and without timezone
+        return datetime.fromisoformat(value)
+    except Exception:
+        raise HTTPException(status_code=400, detail=f"Invalid datetime format: {value}")
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), row_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        ts, row_id = json.loads(raw)
+        return datetime.fromisoformat(ts), int(row_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
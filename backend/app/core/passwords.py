@@ -1,4 +1,10 @@
+import asyncio
 import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import bcrypt
 
 _MAX_BCRYPT_LENGTH = 72
@@ -12,9 +18,13 @@ def _normalize_password(password: str) -> bytes:
     return data
 
 
-def hash_password(password: str) -> str:
+def configured_rounds() -> int:
+    return min(31, max(4, int(os.getenv("BCRYPT_ROUNDS", "12") or 12)))
+
+
+def hash_password(password: str, rounds: int | None = None) -> str:
     candidate = _normalize_password(password)
-    return bcrypt.hashpw(candidate, bcrypt.gensalt()).decode("utf-8")
+    return bcrypt.hashpw(candidate, bcrypt.gensalt(rounds or configured_rounds())).decode("utf-8")
 
 
 def verify_password(password: str, password_hash: str) -> bool:
@@ -23,3 +33,81 @@ def verify_password(password: str, password_hash: str) -> bool:
         return bcrypt.checkpw(candidate, password_hash.encode("utf-8"))
     except ValueError:
         return False
+
+
+def needs_rehash(password_hash: str, rounds: int | None = None) -> bool:
+    """True when the stored hash was made with a different cost than the configured one."""
+    try:
+        # $2b$12$<salt+hash>
+        return int(password_hash.split("$")[2]) != (rounds or configured_rounds())
+    except (IndexError, ValueError):
+        return False
+
+
+class HasherBusy(Exception):
+    """Raised when a hash job cannot start in time; callers answer 503 instead of queueing forever."""
+
+
+class PasswordHasher:
+    """Runs bcrypt on a dedicated, bounded pool so login bursts don't occupy the request threadpool.
+
+    PASSWORD_HASH_WORKERS caps concurrent hashes, PASSWORD_HASH_MAX_QUEUE caps jobs in flight
+    (rejected immediately beyond it) and PASSWORD_HASH_QUEUE_TIMEOUT_MS rejects jobs that waited
+    too long to start.
+    """
+
+    def __init__(self):
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.configure()
+
+    def configure(self):
+        self.workers = max(1, int(os.getenv("PASSWORD_HASH_WORKERS", "2") or 2))
+        self.max_queue = max(self.workers, int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "64") or 64))
+        self.queue_timeout = max(1, int(os.getenv("PASSWORD_HASH_QUEUE_TIMEOUT_MS", "2000") or 2000)) / 1000.0
+
+    def start(self):
+        self.configure()
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+
+    def stop(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _run(self, enqueued: float, fn, args):
+        try:
+            if time.monotonic() - enqueued > self.queue_timeout:
+                raise HasherBusy()
+            return fn(*args)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    async def _submit(self, fn, *args):
+        if self._executor is None:
+            self.start()
+        with self._lock:
+            if self._in_flight >= self.max_queue:
+                raise HasherBusy()
+            self._in_flight += 1
+        try:
+            fut = self._executor.submit(self._run, time.monotonic(), fn, args)
+        except Exception:
+            with self._lock:
+                self._in_flight -= 1
+            raise
+        return await asyncio.wrap_future(fut)
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(hash_password, password)
+
+    async def verify(self, password: str, password_hash: str) -> bool:
+        return await self._submit(verify_password, password, password_hash)
+
+
+hasher = PasswordHasher()
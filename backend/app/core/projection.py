@@ -0,0 +1,50 @@
+import json
+from datetime import date, datetime
+from typing import Iterable, Optional, Sequence
+
+from fastapi import HTTPException, Response
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib json is the fallback
+    orjson = None
+
+# Read path for list endpoints: select only the columns the client asked for (?fields=a,b,c) as
+# plain Core rows and serialize the tuples straight to JSON bytes, skipping ORM identity-map
+# objects and per-row pydantic models.
+
+
+def parse_fields(fields: Optional[str], allowed: Sequence[str], default: Sequence[str]) -> tuple[str, ...]:
+    if not fields:
+        return tuple(default)
+    names = tuple(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [n for n in names if n not in allowed]
+    if unknown or not names:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}; allowed: {', '.join(allowed)}")
+    return names
+
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def dumps(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, default=_default, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def rows_response(names: Sequence[str], rows: Iterable[Sequence], response: Optional[Response] = None) -> Response:
+    """JSON array of objects keyed by `names`; extra trailing columns in a row (e.g. cursor keys) are dropped.
+
+    Headers already set on the injected `response` (ETag, X-Next-Cursor) are carried over.
+    """
+    body = dumps([dict(zip(names, row)) for row in rows])
+    out = Response(content=body, media_type="application/json")
+    if response is not None:
+        for key, value in response.headers.items():
+            if key not in ("content-length", "content-type"):
+                out.headers[key] = value
+    return out
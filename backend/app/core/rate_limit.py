@@ -1,34 +1,75 @@
-import time
-from typing import Callable, Awaitable
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response, JSONResponse
+import anyio
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
 
+from .limiter import GCRALimiter, make_backend
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app, limit_per_minute: int = 120):
-        super().__init__(app)
+
+def parse_route_map(value: str | None) -> dict[str, int]:
+    """Parse "voice=60,auth=20" into {"voice": 60, "auth": 20} (keys are the first path segment)."""
+    out: dict[str, int] = {}
+    for part in (value or "").split(","):
+        name, _, num = part.partition("=")
+        name = name.strip().strip("/")
+        if not name or not num.strip():
+            continue
+        try:
+            out[name] = int(num)
+        except ValueError:
+            continue
+    return out
+
+
+class RateLimitMiddleware:
+    """Pure ASGI per IP + first path segment rate limiting with per-route limits and costs."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        limit_per_minute: int = 120,
+        route_limits: dict[str, int] | None = None,
+        route_costs: dict[str, int] | None = None,
+        max_keys: int = 100_000,
+        backend=None,
+    ):
+        self.app = app
         self.limit = limit_per_minute
         self.window = 60
-        self.store: dict[str, list[float]] = {}
-
-    async def dispatch(self, request: Request, call_next: Callable[[Request], Awaitable[Response]]):
-        key = self._key(request)
-        now = time.time()
-        hits = self.store.get(key, [])
-        # prune
-        cutoff = now - self.window
-        hits = [t for t in hits if t > cutoff]
-        if len(hits) >= self.limit:
-            retry_after = max(1, int(hits[0] + self.window - now))
-            return JSONResponse({"detail": "Too Many Requests"}, status_code=429, headers={"Retry-After": str(retry_after)})
-        hits.append(now)
-        self.store[key] = hits
-        return await call_next(request)
-
-    def _key(self, request: Request) -> str:
-        xff = request.headers.get("x-forwarded-for")
-        ip = xff.split(",")[0].strip() if xff else request.client.host
-        path = request.url.path.split("/")[1] if request.url.path else "root"
-        return f"{ip}:{path}"
+        self.route_limits = route_limits or {}
+        self.route_costs = route_costs or {}
+        # memory | shm | redis, see core/limiter.py; shared backends keep limits exact across workers
+        self.limiter = backend if backend is not None else make_backend(window=self.window, max_keys=max_keys)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        segment = self._segment(scope)
+        key = f"{self._ip(scope)}:{segment}"
+        limit = self.route_limits.get(segment, self.limit)
+        cost = self.route_costs.get(segment, 1)
+        if limit <= 0:
+            retry = 0.0
+        elif getattr(self.limiter, "blocking", False):
+            # Network backends (redis) must not stall the event loop on a round trip or timeout
+            retry = await anyio.to_thread.run_sync(self.limiter.hit, key, limit, cost)
+        else:
+            retry = self.limiter.hit(key, limit, cost)
+        if retry:
+            response = JSONResponse({"detail": "Too Many Requests"}, status_code=429, headers={"Retry-After": str(max(1, int(retry + 0.999)))})
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    def _ip(scope: Scope) -> str:
+        for name, value in scope.get("headers") or ():
+            if name == b"x-forwarded-for":
+                return value.split(b",", 1)[0].strip().decode("latin-1")
+        client = scope.get("client")
+        return client[0] if client else "unknown"
 
+    @staticmethod
+    def _segment(scope: Scope) -> str:
+        path = scope.get("path") or ""
+        return path.split("/", 2)[1] if path.startswith("/") else "root"
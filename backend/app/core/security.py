@@ -1,8 +1,12 @@
-from typing import List
-from fastapi import Depends, HTTPException
+import threading
+import time
+from collections import OrderedDict
+from typing import List, NamedTuple, Optional
+from fastapi import Depends, HTTPException, Request
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import jwt, JWTError
 import os
+from sqlalchemy import event as sa_event
 from sqlalchemy.orm import Session
 from ..db.session import get_db
 from ..db import models
@@ -20,33 +24,128 @@ ROLES = {
 
 bearer = HTTPBearer(auto_error=False)
 
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
 
-def get_current_user(db: Session = Depends(get_db), creds: HTTPAuthorizationCredentials = Depends(bearer)) -> models.User:
+
+class Principal(NamedTuple):
+    """Read-only view of the authenticated user; what route handlers get from get_current_user."""
+    id: int
+    email: str
+    role: str
+    full_name: Optional[str] = None
+    department: Optional[str] = None
+
+
+class PrincipalCache:
+    """TTL/LRU cache of resolved principals keyed by token subject, so hot clients skip the users query.
+
+    Entries are dropped by the User mapper events below (assign-role and any other write to the row);
+    AUTH_USER_CACHE_TTL bounds staleness from writes made by other workers.
+    """
+
+    def __init__(self):
+        self._entries: OrderedDict[str, tuple[Principal, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.configure()
+
+    def configure(self):
+        self.max_size = max(1, int(os.getenv("AUTH_USER_CACHE_SIZE", "10000") or 10000))
+        self.ttl = max(0, int(os.getenv("AUTH_USER_CACHE_TTL", "60") or 0))
+        self.trust_token_role = os.getenv("AUTH_TRUST_TOKEN_ROLE", "0").lower() in ("1", "true", "yes")
+        self.secret = os.getenv("SECRET_KEY", "please-change-in-prod")
+        self.algorithms = [os.getenv("JWT_ALGORITHM", "HS256")]
+
+    def get(self, sub: str) -> Optional[Principal]:
+        with self._lock:
+            hit = self._entries.get(sub)
+            if hit is None:
+                return None
+            if hit[1] < time.monotonic():
+                del self._entries[sub]
+                return None
+            self._entries.move_to_end(sub)
+            return hit[0]
+
+    def put(self, sub: str, principal: Principal):
+        if not self.ttl:
+            return
+        with self._lock:
+            self._entries[sub] = (principal, time.monotonic() + self.ttl)
+            self._entries.move_to_end(sub)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *, email: Optional[str] = None, user_id: Optional[int] = None):
+        with self._lock:
+            if email is not None:
+                self._entries.pop(email, None)
+            if user_id is not None:
+                # The email itself may have changed, so also drop by id
+                for sub in [k for k, (p, _) in self._entries.items() if p.id == user_id]:
+                    del self._entries[sub]
+
+    def clear(self):
+        self.configure()
+        with self._lock:
+            self._entries.clear()
+
+
+principals = PrincipalCache()
+
+
+@sa_event.listens_for(models.User, "after_update")
+@sa_event.listens_for(models.User, "after_delete")
+def _invalidate_principal(mapper, connection, target):
+    principals.invalidate(email=target.email, user_id=target.id)
+
+
+def _decode_token(creds: Optional[HTTPAuthorizationCredentials]) -> dict:
     if not creds:
         raise HTTPException(status_code=401, detail="Not authenticated")
-    token = creds.credentials
     try:
-        payload = jwt.decode(
-            token,
-            os.getenv("SECRET_KEY", "please-change-in-prod"),
-            algorithms=[os.getenv("JWT_ALGORITHM", "HS256")],
-        )
-        email = payload.get("sub")
-        if not email:
-            raise HTTPException(status_code=401, detail="Invalid token")
+        payload = jwt.decode(creds.credentials, principals.secret, algorithms=principals.algorithms)
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
+    if not payload.get("sub"):
+        raise HTTPException(status_code=401, detail="Invalid token")
+    return payload
+
 
+def _load_principal(db: Session, email: str) -> Principal:
+    principal = principals.get(email)
+    if principal is not None:
+        return principal
     user = db.query(models.User).filter(models.User.email == email).first()
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
-    return user
+    principal = Principal(user.id, user.email, user.role, user.full_name, user.department)
+    principals.put(email, principal)
+    return principal
+
+
+def get_current_user(db: Session = Depends(get_db), creds: HTTPAuthorizationCredentials = Depends(bearer)) -> Principal:
+    payload = _decode_token(creds)
+    return _load_principal(db, payload["sub"])
+
+
+def get_token_user(request: Request, db: Session = Depends(get_db), creds: HTTPAuthorizationCredentials = Depends(bearer)) -> Principal:
+    """get_current_user for read-only routes that need only id/email/role.
+
+    With AUTH_TRUST_TOKEN_ROLE=1, safe-method requests take uid/role from the token claims and do no
+    lookup at all; a role change then applies once the client refreshes its token.
+    """
+    payload = _decode_token(creds)
+    if principals.trust_token_role and request.method in SAFE_METHODS:
+        uid, role = payload.get("uid"), payload.get("role")
+        if isinstance(uid, int) and role in ROLES:
+            return Principal(uid, payload["sub"], role)
+    return _load_principal(db, payload["sub"])
 
 
 class RoleChecker:
     def __init__(self, allowed: List[str]):
         self.allowed = set(allowed)
 
-    def __call__(self, user: models.User = Depends(get_current_user)):
+    def __call__(self, user: Principal = Depends(get_current_user)):
         if user.role not in self.allowed:
             raise HTTPException(status_code=403, detail="Forbidden")
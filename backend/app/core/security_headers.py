@@ -1,20 +1,43 @@
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
-from starlette.requests import Request
-from starlette.responses import Response
-
-
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app: ASGIApp):
-        super().__init__(app)
-
-    async def dispatch(self, request: Request, call_next):
-        response: Response = await call_next(request)
-        response.headers.setdefault("X-Content-Type-Options", "nosniff")
-        response.headers.setdefault("X-Frame-Options", "DENY")
-        response.headers.setdefault("Referrer-Policy", "no-referrer")
-        # Basic CSP suitable for SPA + API; adjust as needed
-        csp = "default-src 'self'; connect-src 'self' http: https:; img-src 'self' data:; style-src 'self' 'unsafe-inline'; script-src 'self' 'unsafe-inline' 'unsafe-eval'"
-        response.headers.setdefault("Content-Security-Policy", csp)
-        return response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+# Basic CSP suitable for SPA + API; adjust as needed
+CSP = "default-src 'self'; connect-src 'self' http: https:; img-src 'self' data:; style-src 'self' 'unsafe-inline'; script-src 'self' 'unsafe-inline' 'unsafe-eval'"
+
+DEFAULT_HEADERS = (
+    ("X-Content-Type-Options", "nosniff"),
+    ("X-Frame-Options", "DENY"),
+    ("Referrer-Policy", "no-referrer"),
+    ("Content-Security-Policy", CSP),
+)
+
+
+class SecurityHeadersMiddleware:
+    """Pure ASGI: appends a pre-encoded header block to http.response.start.
+
+    Headers already set by the endpoint win (same semantics as headers.setdefault).
+    """
+
+    def __init__(self, app: ASGIApp, headers: tuple[tuple[str, str], ...] = DEFAULT_HEADERS):
+        self.app = app
+        self.raw_headers = [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in headers]
+        self.names = frozenset(k for k, _ in self.raw_headers)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        raw_headers = self.raw_headers
+        names = self.names
+
+        async def send_with_headers(message: Message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers") or ())
+                present = {k.lower() for k, _ in headers if k.lower() in names} if headers else ()
+                if present:
+                    headers.extend(h for h in raw_headers if h[0] not in present)
+                else:
+                    headers.extend(raw_headers)
+                message["headers"] = headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
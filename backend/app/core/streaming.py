@@ -0,0 +1,40 @@
+import json
+from typing import Optional
+
+import anyio
+from fastapi.responses import StreamingResponse
+
+# Progressive responses: one SSE event or NDJSON line per frame, flushed as soon as it is yielded.
+# Used by the voice endpoints (first words before the slow work) and bulk import (progress).
+
+
+def stream_format(accept: Optional[str], default: Optional[str] = None) -> Optional[str]:
+    """'sse' / 'ndjson' when the client asked for a progressive response, else `default`."""
+    accept = (accept or "").lower()
+    if "text/event-stream" in accept:
+        return "sse"
+    if "application/x-ndjson" in accept:
+        return "ndjson"
+    return default
+
+
+def frame(fmt: str, event: str, data: dict) -> bytes:
+    if fmt == "sse":
+        return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n".encode("utf-8")
+    return (json.dumps({"event": event, **data}, default=str) + "\n").encode("utf-8")
+
+
+class _DuplexStreamingResponse(StreamingResponse):
+    # The frames generator is still reading the request body: Starlette's disconnect listener would
+    # consume those receive() messages, so leave receive() to the body reader (which raises
+    # ClientDisconnect itself) and just wait to be cancelled when the stream ends.
+    async def listen_for_disconnect(self, receive) -> None:
+        await anyio.sleep_forever()
+
+
+def streaming_response(frames, fmt: str, headers: Optional[dict] = None, reads_body: bool = False) -> StreamingResponse:
+    media = "text/event-stream" if fmt == "sse" else "application/x-ndjson"
+    # No proxy buffering: every frame must reach the caller as soon as it is yielded
+    hdrs = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no", **(headers or {})}
+    cls = _DuplexStreamingResponse if reads_body else StreamingResponse
+    return cls(frames, media_type=media, headers=hdrs)
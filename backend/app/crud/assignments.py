@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List
+from typing import List, Sequence
 from sqlalchemy.orm import Session
 from sqlalchemy import select, and_
 from ..db import models
@@ -13,13 +13,16 @@ def invite(db: Session, *, idea_id: int, developer_id: int | None = None) -> mod
     return row
 
 
-def list_assignments(db: Session, *, for_user_id: int | None = None, status: str | None = None) -> list[models.Assignment]:
-    stmt = select(models.Assignment)
+def list_assignments(
+    db: Session, *, for_user_id: int | None = None, status: str | None = None, columns: Sequence[str] | None = None
+) -> list:
+    stmt = select(*(models.Assignment.__table__.c[n] for n in columns)) if columns else select(models.Assignment)
     if for_user_id is not None:
         stmt = stmt.where(models.Assignment.developer_id == for_user_id)
     if status is not None:
         stmt = stmt.where(models.Assignment.status == status)
-    return list(db.execute(stmt.order_by(models.Assignment.created_at.asc())).scalars())
+    result = db.execute(stmt.order_by(models.Assignment.created_at.asc()))
+    return list(result.all() if columns else result.scalars())
 
 
 def respond(db: Session, *, assignment_id: int, developer_id: int, response: str) -> models.Assignment:
@@ -1,31 +1,78 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import select, text
+from sqlalchemy import insert, select, text
 from ..db import models
 
 
-def add_embedding(db: Session, *, idea_id: int, vector: list[float]) -> models.Embedding:
+def add_embedding(db: Session, *, idea_id: int, vector: list[float], commit: bool = True) -> models.Embedding:
     emb = models.Embedding(idea_id=idea_id, vector=vector)  # type: ignore[arg-type]
     db.add(emb)
+    if not commit:
+        db.flush()
+        return emb
     db.commit()
     db.refresh(emb)
     return emb
 
 
+def add_embeddings(db: Session, rows: list[tuple[int, list[float]]]) -> None:
+    """Multi-row insert of (idea_id, vector) in the caller's transaction."""
+    if rows:
+        db.execute(insert(models.Embedding), [{"idea_id": idea_id, "vector": vec} for idea_id, vec in rows])
+
+
 def get_all_embeddings(db: Session) -> list[tuple[int, list[float]]]:
     rows = db.execute(select(models.Embedding.id, models.Embedding.idea_id, models.Embedding.vector)).all()
     return [(row.idea_id, row.vector) for row in rows]  # type: ignore[return-value]
 
 
-def find_similar(db: Session, *, vector: list[float], limit: int = 5, min_score: float = 0.85) -> list[dict]:
+def iter_similar(db: Session, *, vector: list[float], limit: int = 5, min_score: float = 0.85, exclude_idea_id: int | None = None):
+    """Yield {"idea_id", "score"} nearest first, as rows arrive; stops at the first one below min_score."""
     # Use cosine distance operator; similarity = 1 - distance
     sql = text(
         """
         SELECT idea_id, 1 - (vector <=> :vec) AS score
         FROM embeddings
+        WHERE idea_id != :exclude
         ORDER BY vector <=> :vec
         LIMIT :limit
         """
     )
-    rows = db.execute(sql, {"vec": vector, "limit": limit}).all()
-    results = [{"idea_id": r[0], "score": float(r[1])} for r in rows]
-    return [r for r in results if r["score"] >= min_score]
+    for r in db.execute(sql, {"vec": vector, "limit": limit, "exclude": exclude_idea_id or 0}):
+        score = float(r[1])
+        if score < min_score:
+            break
+        yield {"idea_id": r[0], "score": score}
+
+
+def find_similar(db: Session, *, vector: list[float], limit: int = 5, min_score: float = 0.85, exclude_idea_id: int | None = None) -> list[dict]:
+    return list(iter_similar(db, vector=vector, limit=limit, min_score=min_score, exclude_idea_id=exclude_idea_id))
+
+
+def nearest_batch(db: Session, *, vectors: list[list[float]], limit: int = 3, min_score: float = 0.9) -> dict[int, list[dict]]:
+    """Nearest existing ideas for many vectors in one round trip: {index in `vectors`: [{"idea_id", "score"}]}."""
+    if not vectors or db.get_bind().dialect.name != "postgresql":
+        return {}
+    sql = text(
+        """
+        SELECT q.ord, n.idea_id, n.score
+        FROM unnest(CAST(:ords AS int[]), CAST(:vecs AS text[])) AS q(ord, vec)
+        CROSS JOIN LATERAL (
+            SELECT idea_id, 1 - (vector <=> CAST(q.vec AS vector)) AS score
+            FROM embeddings
+            ORDER BY vector <=> CAST(q.vec AS vector)
+            LIMIT :limit
+        ) AS n
+        WHERE n.score >= :min_score
+        ORDER BY q.ord, n.score DESC
+        """
+    )
+    params = {
+        "ords": list(range(len(vectors))),
+        "vecs": ["[" + ",".join(repr(float(x)) for x in vec) + "]" for vec in vectors],
+        "limit": limit,
+        "min_score": min_score,
+    }
+    out: dict[int, list[dict]] = {}
+    for ord_, idea_id, score in db.execute(sql, params):
+        out.setdefault(ord_, []).append({"idea_id": idea_id, "score": float(score)})
+    return out
@@ -1,21 +1,58 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import select, and_
+from sqlalchemy import insert, select, and_
 from ..db import models
+from ..services import audit_archive, audit_sink
 
 
-def record_event(db: Session, *, entity: str, entity_id: int, event: str, payload: dict | None = None) -> models.EventAudit:
-    row = models.EventAudit(entity=entity, entity_id=entity_id, event=event, payload=payload)
-    db.add(row)
-    db.commit()
-    db.refresh(row)
-    return row
+def record_event(
+    db: Session, *, entity: str, entity_id: int, event: str, payload: dict | None = None, commit: bool = True
+) -> models.EventAudit:
+    """commit=False joins the caller's transaction in every mode: the event is written by its commit."""
+    mode = audit_sink.sink.mode
+    if not commit:
+        if mode == "sync":
+            row = models.EventAudit(entity=entity, entity_id=entity_id, event=event, payload=payload)
+            db.add(row)
+            return row
+        data = audit_sink.make_row(entity=entity, entity_id=entity_id, event=event, payload=payload)
+        audit_sink.add_to_session(db, data)
+        return models.EventAudit(**data)
+    if mode == "sync":
+        row = models.EventAudit(entity=entity, entity_id=entity_id, event=event, payload=payload)
+        db.add(row)
+        db.commit()
+        db.refresh(row)
+        return row
+    data = audit_sink.make_row(entity=entity, entity_id=entity_id, event=event, payload=payload)
+    if mode == "durable":
+        audit_sink.add_to_session(db, data)
+    else:
+        audit_sink.sink.enqueue(data)
+    # Not yet persisted: id stays None until the sink flushes
+    return models.EventAudit(**data)
+
+
+def flush_pending(db: Session | None = None) -> None:
+    """Make buffered events visible to readers (read-your-writes for audit queries).
+
+    Events riding on `db` (durable mode / commit=False) are inserted into its open transaction,
+    not committed: the caller's commit or rollback still decides their fate.
+    """
+    if db is not None:
+        rows = audit_sink.take_session_pending(db)
+        if rows:
+            db.execute(insert(models.EventAudit), rows)
+    audit_sink.sink.flush()
 
 
 def has_event(db: Session, *, entity: str, entity_id: int, event: str) -> bool:
+    flush_pending(db)
     existing = db.execute(
         select(models.EventAudit.id).where(
             and_(models.EventAudit.entity == entity, models.EventAudit.entity_id == entity_id, models.EventAudit.event == event)
         ).limit(1)
     ).first()
-    return existing is not None
-
+    if existing is not None:
+        return True
+    # Moved to cold storage by the archive pass: still counts (SLA escalations must not repeat)
+    return (entity, entity_id) in audit_archive.archived_keys(event)
@@ -0,0 +1,60 @@
+from collections import Counter
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.orm import Session
+from ..db import models
+from ..services import data_version
+
+
+def adjust(db: Session, deltas: dict[str, int]) -> None:
+    """Apply per-status deltas inside the caller's transaction, so counts commit or roll back with the idea write."""
+    C = models.IdeaStatusCount.__table__
+    values = [{"status": s, "count": n} for s, n in sorted(deltas.items()) if n]
+    if not values:
+        return
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        stmt = dialect_insert(C)
+        stmt = stmt.on_conflict_do_update(index_elements=[C.c.status], set_={"count": C.c.count + stmt.excluded["count"]})
+        db.execute(stmt, values)
+        return
+    for v in values:
+        res = db.execute(update(C).where(C.c.status == v["status"]).values(count=C.c.count + v["count"]))
+        if not res.rowcount:
+            db.execute(insert(C), [v])
+
+
+def status_counts(db: Session) -> list[tuple[str, int]]:
+    C = models.IdeaStatusCount
+    return [(row.status, row.count) for row in db.execute(select(C.status, C.count).where(C.count > 0).order_by(C.status))]
+
+
+def reconcile(conn) -> dict[str, int]:
+    """Recompute the counters from ideas and overwrite them; returns the drift that was corrected."""
+    C = models.IdeaStatusCount
+    if conn.dialect.name == "postgresql":
+        # Wait for in-flight increments and hold new ones back while the recount runs
+        conn.exec_driver_sql("LOCK TABLE idea_status_counts IN EXCLUSIVE MODE")
+    actual = Counter(dict(conn.execute(select(models.Idea.status, func.count(models.Idea.id)).group_by(models.Idea.status)).all()))
+    stored = Counter(dict(conn.execute(select(C.status, C.count)).all()))
+    drift = {s: actual[s] - stored[s] for s in set(actual) | set(stored) if actual[s] != stored[s]}
+    if drift:
+        conn.execute(delete(C))
+        if actual:
+            conn.execute(insert(C), [{"status": s, "count": n} for s, n in actual.items()])
+    return drift
+
+
+def reconcile_pass(engine) -> dict[str, int]:
+    """Maintenance entry point: reconcile and, on drift, bump the ideas data version in the same transaction."""
+    with engine.begin() as conn:
+        drift = reconcile(conn)
+        if drift:
+            # ETags and overview caches on every worker key on data_versions: they must see the corrected counts
+            data_version.bump_tables(conn, ["ideas"])
+    if drift:
+        data_version.bump()
+    return drift
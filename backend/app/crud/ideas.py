@@ -1,6 +1,10 @@
+from datetime import datetime
+from typing import Sequence
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy import bindparam, insert, select, tuple_, update
 from ..db import models
+from ..services import data_version
+from . import idea_counts
 
 
 def create_idea(
@@ -10,27 +14,140 @@ def create_idea(
     description: str,
     author_email: str | None = None,
     created_by_id: int | None = None,
+    commit: bool = True,
 ) -> models.Idea:
     idea = models.Idea(
         title=title,
+        title_key=title_key(title),
         description=description,
         author_email=author_email,
         created_by_id=created_by_id,
     )
     db.add(idea)
+    idea_counts.adjust(db, {idea.status or "submitted": 1})
+    if not commit:
+        db.flush()
+        return idea
     db.commit()
     db.refresh(idea)
     return idea
 
 
+def bulk_create_ideas(db: Session, rows: list[dict], *, created_by_id: int | None = None) -> list[int]:
+    """Multi-row insert in the caller's transaction; returns ids in input order.
+
+    Core insert, so status counters and data_versions are updated here rather than by ORM hooks.
+    """
+    if not rows:
+        return []
+    t = models.Idea.__table__
+    now = datetime.utcnow()
+    values = [
+        {
+            "title": r["title"],
+            "title_key": title_key(r["title"]),
+            "description": r["description"],
+            "author_email": r.get("author_email"),
+            "created_by_id": created_by_id,
+            "created_at": r.get("created_at") or now,
+            "status": "submitted",
+        }
+        for r in rows
+    ]
+    ids = list(db.execute(insert(t).returning(t.c.id, sort_by_parameter_order=True), values).scalars())
+    idea_counts.adjust(db, {"submitted": len(ids)})
+    data_version.mark_written(db, ["ideas"])
+    return ids
+
+
+def title_key(title: str) -> str:
+    """Lower-cased title with every whitespace run removed; stored in ideas.title_key on insert."""
+    return "".join(title.lower().split())
+
+
+def titles_in_use(db: Session, keys) -> list[tuple[str, str]]:
+    """(title, description) of existing ideas whose title_key is in `keys` (ix_ideas_title_key).
+
+    Coarser than any whitespace-collapsing comparison, so callers re-check the candidates with
+    their own normalisation (idea_import.dedup_key).
+    """
+    keys = list(keys)
+    if not keys:
+        return []
+    I = models.Idea
+    return [tuple(r) for r in db.execute(select(I.title, I.description).where(I.title_key.in_(keys))).all()]
+
+
+def backfill_title_keys(engine, batch: int = 1000) -> int:
+    """Fill title_key for rows written before migrations/011 (or by raw SQL); returns the number of rows filled.
+
+    The key is Python-only (Unicode whitespace and case), so it cannot be computed by the migration itself.
+    updated_at is left alone: the key is derived data, not an edit for GET /export.
+    """
+    t = models.Idea.__table__
+    stmt = update(t).where(t.c.id == bindparam("b_id")).values(title_key=bindparam("b_key"), updated_at=t.c.updated_at)
+    filled = 0
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(select(t.c.id, t.c.title).where(t.c.title_key.is_(None)).order_by(t.c.id).limit(batch)).all()
+            if not rows:
+                return filled
+            conn.execute(stmt, [{"b_id": i, "b_key": title_key(title)} for i, title in rows])
+        filled += len(rows)
+
+
+def _projection(columns: Sequence[str], *extra: str) -> list:
+    c = models.Idea.__table__.c
+    return [c[name] for name in columns] + [c[name].label(f"_{name}") for name in extra]
+
+
 def list_ideas(db: Session) -> list[models.Idea]:
     return list(db.execute(select(models.Idea)).scalars().all())
 
 
+def list_ideas_page(
+    db: Session,
+    *,
+    status: str | None = None,
+    author_email: str | None = None,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    after: tuple[datetime, int] | None = None,
+    order: str = "desc",
+    limit: int = 50,
+    columns: Sequence[str] | None = None,
+) -> list:
+    """One page in (created_at, id) order, seeking past `after`; served by the ix_ideas_* composite indexes.
+
+    With `columns`, returns Core rows of just those columns followed by (created_at, id) for the cursor.
+    """
+    I = models.Idea
+    stmt = select(*_projection(columns, "created_at", "id")) if columns else select(I)
+    if status:
+        stmt = stmt.where(I.status == status)
+    if author_email:
+        stmt = stmt.where(I.author_email == author_email)
+    if date_from:
+        stmt = stmt.where(I.created_at >= date_from)
+    if date_to:
+        stmt = stmt.where(I.created_at <= date_to)
+    if after:
+        key = tuple_(I.created_at, I.id)
+        stmt = stmt.where(key < tuple_(*after) if order == "desc" else key > tuple_(*after))
+    if order == "desc":
+        stmt = stmt.order_by(I.created_at.desc(), I.id.desc())
+    else:
+        stmt = stmt.order_by(I.created_at.asc(), I.id.asc())
+    result = db.execute(stmt.limit(limit))
+    return list(result.all() if columns else result.scalars())
+
+
 def set_idea_status(db: Session, *, idea_id: int, status: str) -> models.Idea:
     row = db.get(models.Idea, idea_id)
     if not row:
         raise ValueError("Idea not found")
+    if row.status != status:
+        idea_counts.adjust(db, {row.status or "submitted": -1, status: 1})
     row.status = status
     db.add(row)
     db.commit()
@@ -39,6 +156,8 @@ def set_idea_status(db: Session, *, idea_id: int, status: str) -> models.Idea:
 
 
 
-def list_ideas_for_user(db: Session, *, user_id: int) -> list[models.Idea]:
-    stmt = select(models.Idea).where(models.Idea.created_by_id == user_id).order_by(models.Idea.created_at.desc())
-    return list(db.execute(stmt).scalars().all())
+def list_ideas_for_user(db: Session, *, user_id: int, columns: Sequence[str] | None = None) -> list:
+    stmt = select(*_projection(columns)) if columns else select(models.Idea)
+    stmt = stmt.where(models.Idea.created_by_id == user_id).order_by(models.Idea.created_at.desc())
+    result = db.execute(stmt)
+    return list(result.all() if columns else result.scalars().all())
@@ -1,5 +1,5 @@
 from datetime import datetime, timedelta
-from typing import Optional, List
+from typing import Optional, List, Sequence
 from sqlalchemy.orm import Session
 from sqlalchemy import select, and_, func
 from ..db import models
@@ -19,12 +19,13 @@ def create_review(db: Session, *, idea_id: int, stage: str, reviewer_id: int | N
     return row
 
 
-def list_pending(db: Session, *, stage: str) -> list[models.Review]:
-    return list(
-        db.execute(
-            select(models.Review).where(and_(models.Review.stage == stage, models.Review.decision.is_(None))).order_by(models.Review.created_at.asc())
-        ).scalars()
+def list_pending(db: Session, *, stage: str, columns: Sequence[str] | None = None) -> list:
+    """Undecided reviews for a stage; with `columns`, Core rows of just those columns instead of entities."""
+    stmt = select(*(models.Review.__table__.c[n] for n in columns)) if columns else select(models.Review)
+    result = db.execute(
+        stmt.where(and_(models.Review.stage == stage, models.Review.decision.is_(None))).order_by(models.Review.created_at.asc())
     )
+    return list(result.all() if columns else result.scalars())
 
 
 def set_decision(db: Session, *, idea_id: int, stage: str, decision: str, notes: str | None = None, reviewer_id: int | None = None) -> models.Review:
@@ -7,9 +7,13 @@ def get_user_by_email(db: Session, email: str) -> models.User | None:
     return db.execute(select(models.User).where(models.User.email == email)).scalars().first()
 
 
-def create_user(db: Session, *, email: str, password_hash: str, full_name: str | None = None, role: str = "user", department: str | None = None) -> models.User:
+def create_user(db: Session, *, email: str, password_hash: str, full_name: str | None = None, role: str = "user", department: str | None = None, commit: bool = True) -> models.User:
     user = models.User(email=email, password_hash=password_hash, full_name=full_name, role=role, department=department)
     db.add(user)
+    if not commit:
+        # Caller owns the transaction; flush only to get the id
+        db.flush()
+        return user
     db.commit()
     db.refresh(user)
     return user
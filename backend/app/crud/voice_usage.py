@@ -0,0 +1,102 @@
+from collections import Counter
+from datetime import datetime, timedelta
+from sqlalchemy import and_, delete, insert, select, update
+from sqlalchemy.orm import Session
+from ..db import models
+
+GRANULARITIES = ("minute", "day")
+
+
+def _bucket(ts: datetime, granularity: str) -> datetime:
+    if granularity == "minute":
+        return ts.replace(second=0, microsecond=0)
+    return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def upsert_rollups(conn, rows: list[dict]) -> None:
+    """Add raw usage rows to their minute/day buckets (one upsert per touched bucket)."""
+    counts = Counter()
+    for r in rows:
+        for g in GRANULARITIES:
+            counts[(r["key_id"], g, _bucket(r["created_at"], g))] += 1
+    if not counts:
+        return
+    values = [{"key_id": k, "granularity": g, "bucket_start": b, "count": n} for (k, g, b), n in counts.items()]
+    R = models.VoiceUsageRollup
+    dialect = conn.dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        stmt = dialect_insert(R)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[R.key_id, R.granularity, R.bucket_start],
+            set_={"count": R.count + stmt.excluded["count"]},
+        )
+        conn.execute(stmt, values)
+        return
+    for v in values:
+        res = conn.execute(
+            update(R)
+            .where(and_(R.key_id == v["key_id"], R.granularity == v["granularity"], R.bucket_start == v["bucket_start"]))
+            .values(count=R.count + v["count"])
+        )
+        if not res.rowcount:
+            conn.execute(insert(R), [v])
+
+
+def compact(conn, *, raw_days: int = 2, minute_days: int = 7, now: datetime | None = None) -> dict:
+    """Delete raw rows (already counted in buckets at write time) and stale minute buckets."""
+    now = now or datetime.utcnow()
+    R = models.VoiceUsageRollup
+    raw = conn.execute(delete(models.VoiceUsage).where(models.VoiceUsage.created_at < now - timedelta(days=raw_days)))
+    minutes = conn.execute(delete(R).where(and_(R.granularity == "minute", R.bucket_start < now - timedelta(days=minute_days))))
+    return {"raw_deleted": raw.rowcount or 0, "minute_buckets_deleted": minutes.rowcount or 0}
+
+
+def usage_report(
+    db: Session,
+    *,
+    granularity: str = "day",
+    key_id: str | None = None,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    limit: int = 500,
+) -> list[models.VoiceUsageRollup]:
+    R = models.VoiceUsageRollup
+    stmt = select(R).where(R.granularity == granularity)
+    if key_id:
+        stmt = stmt.where(R.key_id == key_id)
+    if date_from:
+        stmt = stmt.where(R.bucket_start >= date_from)
+    if date_to:
+        stmt = stmt.where(R.bucket_start <= date_to)
+    return list(db.execute(stmt.order_by(R.bucket_start.desc(), R.key_id).limit(limit)).scalars())
+
+
+def recent_counts(db: Session, *, key_id: str, now: datetime | None = None) -> tuple[int, int]:
+    """(calls in the current minute, approx. calls in the last 24h) from three bucket rows.
+
+    The 24h figure is a sliding-window estimate: today's bucket plus yesterday's bucket weighted
+    by the part of yesterday still inside the window.
+    """
+    now = now or datetime.utcnow()
+    R = models.VoiceUsageRollup
+    today = _bucket(now, "day")
+    yesterday = today - timedelta(days=1)
+    minute = _bucket(now, "minute")
+    rows = db.execute(
+        select(R.granularity, R.bucket_start, R.count).where(
+            and_(
+                R.key_id == key_id,
+                ((R.granularity == "minute") & (R.bucket_start == minute))
+                | ((R.granularity == "day") & R.bucket_start.in_([today, yesterday])),
+            )
+        )
+    ).all()
+    per_min = sum(r.count for r in rows if r.granularity == "minute")
+    day_now = sum(r.count for r in rows if r.granularity == "day" and r.bucket_start == today)
+    day_prev = sum(r.count for r in rows if r.granularity == "day" and r.bucket_start == yesterday)
+    remaining = 1 - (now - today).total_seconds() / 86400
+    return per_min, day_now + int(day_prev * remaining)
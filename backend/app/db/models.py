@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Index, UniqueConstraint
 from sqlalchemy.orm import declarative_base
 from sqlalchemy import types
 import os
@@ -43,11 +43,40 @@ class Idea(Base):
     __tablename__ = "ideas"
     id = Column(Integer, primary_key=True)
     title = Column(String(255), nullable=False)
+    # crud.ideas.title_key(title), written with the row; existing-title lookups on import
+    title_key = Column(Text)
     description = Column(Text, nullable=False)
     author_email = Column(String(255))
     created_by_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     status = Column(String(50), nullable=False, default="submitted")  # submitted | analyst_pending | finance_pending | approved | rejected
+    # Set on every insert/update; GET /export watermark (services/export.py)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        # Keyset pagination for GET /ideas: (created_at, id), optionally behind a status or author filter
+        Index("ix_ideas_created_at_id", "created_at", "id"),
+        Index("ix_ideas_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_ideas_author_created_at_id", "author_email", "created_at", "id"),
+        # GET /export/ideas: ORDER BY (updated_at, id), incremental `since`
+        Index("ix_ideas_updated_at_id", "updated_at", "id"),
+        # POST /ideas/import: existing ideas with the same normalised title
+        Index("ix_ideas_title_key", "title_key"),
+    )
+
+
+class IdeaStatusCount(Base):
+    # Exact per-status idea counts, adjusted in the same transaction as the idea write (crud/idea_counts.py)
+    __tablename__ = "idea_status_counts"
+    status = Column(String(50), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class DataVersion(Base):
+    # Per-table write counters bumped in the writing transaction (services/data_version.py); ETag source
+    __tablename__ = "data_versions"
+    name = Column(String(50), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
 
 
 class Review(Base):
@@ -59,6 +88,14 @@ class Review(Base):
     decision = Column(String(50), nullable=True)  # approved | rejected | needs_more_info
     notes = Column(Text)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        # Oldest-first queue listings: ORDER BY (created_at, id)
+        Index("ix_reviews_created_at_id", "created_at", "id"),
+        # GET /export/reviews: ORDER BY (updated_at, id), incremental `since`
+        Index("ix_reviews_updated_at_id", "updated_at", "id"),
+    )
 
 
 class Assignment(Base):
@@ -68,6 +105,14 @@ class Assignment(Base):
     developer_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     status = Column(String(50), default="pending")  # invited | accepted | declined | escalated
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        # Oldest-first queue listings: ORDER BY (created_at, id)
+        Index("ix_assignments_created_at_id", "created_at", "id"),
+        # GET /export/assignments: ORDER BY (updated_at, id), incremental `since`
+        Index("ix_assignments_updated_at_id", "updated_at", "id"),
+    )
 
 
 class TaskMarketplace(Base):
@@ -87,6 +132,13 @@ class EventAudit(Base):
     payload = Column(types.JSON)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        # Keyset pagination order for GET /events: (created_at, id)
+        Index("ix_events_audit_created_at_id", "created_at", "id"),
+        # has_event / SLA dedup lookups
+        Index("ix_events_audit_entity_lookup", "entity", "entity_id", "event"),
+    )
+
 
 class EmailQueue(Base):
     __tablename__ = "email_queue"
@@ -112,10 +164,23 @@ class Embedding(Base):
 class VoiceUsage(Base):
     __tablename__ = "voice_usage"
     id = Column(Integer, primary_key=True)
-    api_key = Column(String(255), nullable=False, index=True)
+    key_id = Column(String(64), nullable=False, index=True)  # voice_quota.key_id(api key), never the key itself
     created_at = Column(DateTime, default=datetime.utcnow, index=True)
 
 
+class VoiceUsageRollup(Base):
+    __tablename__ = "voice_usage_rollups"
+    id = Column(Integer, primary_key=True)
+    key_id = Column(String(64), nullable=False)
+    granularity = Column(String(10), nullable=False)  # minute | day
+    bucket_start = Column(DateTime, nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint("key_id", "granularity", "bucket_start", name="uq_voice_usage_rollups_bucket"),
+    )
+
+
 class VoiceSession(Base):
     __tablename__ = "voice_sessions"
     id = Column(Integer, primary_key=True)
@@ -123,4 +188,6 @@ class VoiceSession(Base):
     user_email = Column(String(255), nullable=True)
     context = Column(types.JSON)
     last_response = Column(Text)
+    # Bumped by every write-behind flush; the flush is a compare-and-set on it (services/voice_sessions.py)
+    version = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -12,6 +12,9 @@ def get_db():
     db = SessionLocal()
     try:
         yield db
+        # Durable audit mode: events queued on the session are written at transaction end
+        if db.info.get("audit_pending"):
+            db.commit()
     finally:
         db.close()
 
@@ -1,5 +1,6 @@
 import os
 import importlib.util
+import logging
 from pathlib import Path
 
 if __spec__ is None:
@@ -7,27 +8,51 @@ if __spec__ is None:
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from .core.config import get_settings
-from .core.rate_limit import RateLimitMiddleware
+from .core.compression import CompressionMiddleware
+from .core.rate_limit import RateLimitMiddleware, parse_route_map
+from .core.passwords import hasher as password_hasher
+from .core.security import principals
 from .core.security_headers import SecurityHeadersMiddleware
-from .api import ideas, auth, users, emails, reviews, assignments, audit, voice, projects
+from .api import ideas, auth, users, emails, reviews, assignments, audit, voice, projects, export
 from .db.base import Base
 from .db.session import engine
 from .db.session import SessionLocal
 from .crud import emails as emails_crud
 from .crud import reviews as reviews_crud
 from .crud import events as events_crud
+from .crud import idea_counts
+from .crud import ideas as ideas_crud
 from .services.email import send_email_smtp
 from .services import sla as sla_services
+from .services.audit_sink import sink as audit_sink
+from .services import audit_partitions
+from .services import data_version
+from .services import audit_archive
+from .services import voice_identity, voice_quota
+from .services.voice_quota import usage_writer as voice_usage_writer
+from .services.voice_sessions import store as voice_session_store
 from sqlalchemy import text
 import threading
 import time
 from prometheus_fastapi_instrumentator import Instrumentator
 
+maintenance_log = logging.getLogger("app.maintenance")
+
 
 def create_app() -> FastAPI:
     settings = get_settings()
     app = FastAPI(title="AI Hub of Ideas & Tasks", version="0.1.0")
 
+    # Response compression (gzip, or brotli when installed); innermost, so it sees the endpoint's own headers
+    app.add_middleware(
+        CompressionMiddleware,
+        min_size=int(os.getenv("COMPRESS_MIN_SIZE", "1024") or 1024),
+        gzip_level=int(os.getenv("COMPRESS_GZIP_LEVEL", "6") or 6),
+        br_quality=int(os.getenv("COMPRESS_BR_QUALITY", "4") or 4),
+        gzip_routes=parse_route_map(os.getenv("COMPRESS_GZIP_ROUTES")),
+        br_routes=parse_route_map(os.getenv("COMPRESS_BR_ROUTES")),
+    )
+
     # CORS
     origins = [o.strip() for o in settings.CORS_ALLOWED_ORIGINS.split(",") if o.strip()] if settings.CORS_ALLOWED_ORIGINS else [
         "http://localhost:5173", "http://localhost:3000"
@@ -38,13 +63,20 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "X-Voice-Session", "X-Export-Watermark"],
     )
     app.add_middleware(SecurityHeadersMiddleware)
     # Simple rate limiting per IP+path
     try:
         import os as _os
         limit = int(_os.getenv("RATE_LIMIT_PER_MINUTE", "120") or 120)
-        app.add_middleware(RateLimitMiddleware, limit_per_minute=limit)
+        app.add_middleware(
+            RateLimitMiddleware,
+            limit_per_minute=limit,
+            route_limits=parse_route_map(_os.getenv("RATE_LIMIT_ROUTES")),
+            route_costs=parse_route_map(_os.getenv("RATE_LIMIT_COSTS")),
+            max_keys=int(_os.getenv("RATE_LIMIT_MAX_KEYS", "100000") or 100000),
+        )
     except Exception:
         pass
 
@@ -124,6 +156,57 @@ def create_app() -> FastAPI:
         s = threading.Thread(target=sla_worker, daemon=True)
         s.start()
 
+        # Hourly maintenance: audit partitions ahead/detach expired (Postgres with migrations/003),
+        # archive old audit months, compact voice_usage into rollups, reconcile idea status counters,
+        # fill ideas.title_key left NULL by migrations/011
+        def maintenance_worker():
+            while True:
+                try:
+                    audit_partitions.maintenance_pass(engine)
+                except Exception:
+                    maintenance_log.exception("audit partition maintenance failed")
+                try:
+                    audit_archive.archive_pass(engine)
+                except Exception:
+                    maintenance_log.exception("audit archive pass failed")
+                try:
+                    voice_quota.compaction_pass(engine)
+                except Exception:
+                    maintenance_log.exception("voice usage compaction failed")
+                try:
+                    idea_counts.reconcile_pass(engine)
+                except Exception:
+                    maintenance_log.exception("idea status counter reconcile failed")
+                try:
+                    ideas_crud.backfill_title_keys(engine)
+                except Exception:
+                    maintenance_log.exception("idea title_key backfill failed")
+                time.sleep(3600)
+
+        m = threading.Thread(target=maintenance_worker, daemon=True)
+        m.start()
+
+        # Buffered audit writer (AUDIT_WRITE_MODE=sync|buffered|durable)
+        audit_sink.start()
+        voice_usage_writer.start()
+        voice_session_store.start()
+        voice_identity.identity_cache.clear()
+        principals.clear()
+        try:
+            data_version.ensure_rows(engine)
+        except Exception:
+            pass
+        projects.overview_cache.clear()
+        password_hasher.start()
+        voice_identity.warm_parsers()
+
+    @app.on_event("shutdown")
+    def on_shutdown():
+        audit_sink.stop()
+        voice_usage_writer.stop()
+        voice_session_store.stop()
+        password_hasher.stop()
+
     @app.get("/healthz")
     def healthz():
         return {"status": "ok"}
@@ -137,6 +220,7 @@ def create_app() -> FastAPI:
     app.include_router(audit.router, prefix="/events", tags=["audit"]) 
     app.include_router(voice.router, prefix="/voice", tags=["voice"]) 
     app.include_router(projects.router, prefix="/projects", tags=["projects"])
+    app.include_router(export.router, prefix="/export", tags=["export"])
 
     return app
 
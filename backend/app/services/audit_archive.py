@@ -0,0 +1,406 @@
+import gzip
+import heapq
+import io
+import json
+import os
+import threading
+from datetime import date, datetime
+from typing import Iterator
+
+from sqlalchemy import and_, column, delete, func, select, table, text
+from sqlalchemy.engine import Engine
+
+from ..db import models
+from .audit_partitions import PARENT, _add_months, list_partitions
+
+# Cold storage for events_audit: one gzipped NDJSON file per month plus manifest.json.
+# The manifest keeps per-file stats (time/id range, distinct entities and events) so readers
+# skip whole files that cannot match a filter before opening them.
+
+MANIFEST = "manifest.json"
+CHUNK_ROWS = int(os.getenv("AUDIT_ARCHIVE_CHUNK_ROWS", "10000") or 10000)
+FETCH_ROWS = 5000
+_COLUMNS = ("id", "entity", "entity_id", "event", "payload", "created_at")
+
+_manifest_lock = threading.Lock()
+_manifest_cache: dict[str, tuple[float, dict]] = {}
+_keys_cache: dict[tuple[str, str], tuple[dict, frozenset]] = {}
+
+
+def archive_dir() -> str:
+    return os.getenv("AUDIT_ARCHIVE_DIR", "audit_archive")
+
+
+def _file_name(month: date) -> str:
+    return f"events_{month:%Y-%m}.ndjson.gz"
+
+
+def load_manifest(directory: str | None = None) -> dict:
+    directory = directory or archive_dir()
+    path = os.path.join(directory, MANIFEST)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return {"archived_before": None, "files": []}
+    with _manifest_lock:
+        cached = _manifest_cache.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        with open(path, "r", encoding="utf-8") as fh:
+            data = json.load(fh)
+        _manifest_cache[path] = (mtime, data)
+        return data
+
+
+def _save_manifest(directory: str, data: dict):
+    path = os.path.join(directory, MANIFEST)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(data, fh, indent=1, sort_keys=True)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp, path)
+
+
+def _iter_lines(fh) -> Iterator[dict]:
+    for line in fh:
+        if line.strip():
+            yield json.loads(line)
+
+
+def _iter_file(path: str) -> Iterator[dict]:
+    # Lazily: a month of events never has to fit in memory
+    with gzip.open(path, "rt", encoding="utf-8") as fh:
+        yield from _iter_lines(fh)
+
+
+def _read_chunk(path: str, chunk: dict) -> list[dict]:
+    # One gzip member of the file (see _ChunkedWriter); bounded by CHUNK_ROWS
+    with open(path, "rb") as fh:
+        fh.seek(chunk["offset"])
+        data = fh.read(chunk["length"])
+    with gzip.GzipFile(fileobj=io.BytesIO(data)) as gz:
+        return list(_iter_lines(io.TextIOWrapper(gz, encoding="utf-8")))
+
+
+class _ChunkedWriter:
+    """Writes sorted rows as a series of gzip members of CHUNK_ROWS rows each.
+
+    Concatenated members are still one valid .gz file; the per-member offsets and key ranges go to
+    the manifest so readers can seek to a member (keyset pages, newest-first scans) instead of
+    decompressing the month from the start. File stats are accumulated on the way.
+    """
+
+    def __init__(self, path: str):
+        self.tmp = path + ".tmp"
+        self.raw = open(self.tmp, "wb")
+        self.gz = None
+        self.chunks: list[dict] = []
+        self.rows = 0
+        self.first = self.last = None
+        self.min_id = self.max_id = None
+        self.entities: set[str] = set()
+        self.events: set[str] = set()
+
+    def write(self, row: dict):
+        if self.gz is None:
+            self.chunks.append({"offset": self.raw.tell(), "rows": 0, "min_created_at": row["created_at"], "min_id": row["id"]})
+            self.gz = gzip.GzipFile(fileobj=self.raw, mode="wb", compresslevel=9)
+        self.gz.write(json.dumps(row, separators=(",", ":"), default=str).encode("utf-8") + b"\n")
+        chunk = self.chunks[-1]
+        chunk["rows"] += 1
+        chunk["max_created_at"], chunk["max_id"] = row["created_at"], row["id"]
+        if self.first is None:
+            self.first = row
+        self.last = row
+        self.rows += 1
+        self.min_id = row["id"] if self.min_id is None else min(self.min_id, row["id"])
+        self.max_id = row["id"] if self.max_id is None else max(self.max_id, row["id"])
+        self.entities.add(row["entity"])
+        self.events.add(row["event"])
+        if chunk["rows"] >= CHUNK_ROWS:
+            self._end_chunk()
+
+    def _end_chunk(self):
+        if self.gz is not None:
+            self.gz.close()  # writes the member trailer; the raw file stays open
+            self.gz = None
+            self.chunks[-1]["length"] = self.raw.tell() - self.chunks[-1]["offset"]
+
+    def commit(self, path: str):
+        self._end_chunk()
+        self.raw.flush()
+        os.fsync(self.raw.fileno())
+        self.raw.close()
+        os.replace(self.tmp, path)
+
+    def abort(self):
+        self.raw.close()
+        try:
+            os.remove(self.tmp)
+        except OSError:
+            pass
+
+    def stats(self, month: date, name: str) -> dict:
+        return {
+            "month": f"{month:%Y-%m}",
+            "file": name,
+            "rows": self.rows,
+            "min_created_at": self.first["created_at"],
+            "max_created_at": self.last["created_at"],
+            "min_id": self.min_id,
+            "max_id": self.max_id,
+            "entities": sorted(self.entities),
+            "events": sorted(self.events),
+            "chunks": self.chunks,
+        }
+
+
+def _detached_source(engine: Engine, month: date) -> str | None:
+    # Partitions detached by the retention pass (audit_partitions.detach_expired) are archived, then dropped
+    if engine.dialect.name != "postgresql":
+        return None
+    name = f"{PARENT}_y{month:%Y}m{month:%m}"
+    with engine.connect() as conn:
+        exists = conn.execute(text("SELECT to_regclass(:t)"), {"t": name}).scalar()
+    if not exists or name in {n for n, _ in list_partitions(engine)}:
+        return None
+    return name
+
+
+def _iter_rows(engine: Engine, source, start: datetime, end: datetime) -> Iterator[dict]:
+    cols = [source.c[c] for c in _COLUMNS]
+    stmt = (
+        select(*cols)
+        .where(and_(source.c.created_at >= start, source.c.created_at < end))
+        .order_by(source.c.created_at, source.c.id)
+    )
+    # Server-side cursor: the month streams through in batches of FETCH_ROWS
+    with engine.connect() as conn:
+        for batch in conn.execute(stmt.execution_options(yield_per=FETCH_ROWS)).partitions():
+            for r in batch:
+                yield {
+                    "id": r.id,
+                    "entity": r.entity,
+                    "entity_id": r.entity_id,
+                    "event": r.event,
+                    "payload": r.payload,
+                    "created_at": r.created_at.isoformat(),
+                }
+
+
+def _sort_key(row: dict):
+    return row["created_at"], row["id"]
+
+
+def archive_month(engine: Engine, month: date, directory: str | None = None) -> int:
+    directory = directory or archive_dir()
+    os.makedirs(directory, exist_ok=True)
+    start = datetime(month.year, month.month, 1)
+    nxt = _add_months(month, 1)
+    end = datetime(nxt.year, nxt.month, 1)
+
+    hot = models.EventAudit.__table__
+    detached = _detached_source(engine, month)
+    name = _file_name(month)
+    path = os.path.join(directory, name)
+    # Every source is already in (created_at, id) order: merge them straight into the new file.
+    # A row archived by an earlier, interrupted run is in both the file and the table; keep one copy
+    sources = [_iter_rows(engine, hot, start, end)]
+    if detached:
+        sources.append(_iter_rows(engine, table(detached, *[column(c) for c in _COLUMNS]), start, end))
+    if os.path.exists(path):
+        sources.append(_iter_file(path))
+    writer = _ChunkedWriter(path)
+    try:
+        prev = None
+        for row in heapq.merge(*sources, key=_sort_key):
+            key = _sort_key(row)
+            if key != prev:
+                writer.write(row)
+                prev = key
+    except BaseException:
+        writer.abort()
+        raise
+    if not writer.rows:
+        writer.abort()
+        return 0
+    writer.commit(path)
+
+    manifest = dict(load_manifest(directory))
+    files = [f for f in manifest.get("files", []) if f["file"] != name]
+    files.append(writer.stats(month, name))
+    manifest["files"] = sorted(files, key=lambda f: f["month"])
+    boundary = end.isoformat()
+    if not manifest.get("archived_before") or manifest["archived_before"] < boundary:
+        manifest["archived_before"] = boundary
+    _save_manifest(directory, manifest)
+
+    # Only remove hot rows once the file and manifest are on disk
+    with engine.begin() as conn:
+        conn.execute(delete(hot).where(and_(hot.c.created_at >= start, hot.c.created_at < end)))
+        if detached:
+            conn.exec_driver_sql(f'DROP TABLE "{detached}"')
+    return writer.rows
+
+
+def archive_before(engine: Engine, cutoff: date, directory: str | None = None) -> dict:
+    """Move every event older than the month containing `cutoff` into the archive."""
+    from .audit_sink import sink
+
+    sink.flush()
+    cutoff = cutoff.replace(day=1)
+    E = models.EventAudit
+    with engine.connect() as conn:
+        oldest = conn.execute(select(func.min(E.created_at)).where(E.created_at < datetime(cutoff.year, cutoff.month, 1))).scalar()
+    months = []
+    if oldest is not None:
+        month = date(oldest.year, oldest.month, 1)
+        while month < cutoff:
+            months.append(month)
+            month = _add_months(month, 1)
+    # Detached partitions may hold months that are no longer visible through the parent
+    if engine.dialect.name == "postgresql":
+        with engine.connect() as conn:
+            names = conn.execute(
+                text("SELECT relname FROM pg_class WHERE relkind = 'r' AND relname LIKE :p"), {"p": f"{PARENT}_y%"}
+            ).scalars().all()
+        from .audit_partitions import month_of
+
+        months += [m for m in (month_of(n) for n in names) if m and m < cutoff and m not in months]
+    archived = {}
+    for month in sorted(months):
+        n = archive_month(engine, month, directory)
+        if n:
+            archived[f"{month:%Y-%m}"] = n
+    return archived
+
+
+def archive_pass(engine: Engine) -> dict:
+    months = int(os.getenv("AUDIT_ARCHIVE_AFTER_MONTHS", "0") or 0)
+    if months <= 0:
+        return {}
+    return archive_before(engine, _add_months(date.today().replace(day=1), -months))
+
+
+def _matches(row: dict, f: dict) -> bool:
+    if f.get("entity") and row["entity"] != f["entity"]:
+        return False
+    if f.get("entity_id") is not None and row["entity_id"] != f["entity_id"]:
+        return False
+    if f.get("event") and row["event"] != f["event"]:
+        return False
+    ts = row["created_at"]
+    if f.get("date_from") and ts < f["date_from"]:
+        return False
+    if f.get("date_to") and ts > f["date_to"]:
+        return False
+    after = f.get("after")
+    if after is not None:
+        key = (ts, row["id"])
+        if f.get("order") == "desc" and not key < after:
+            return False
+        if f.get("order") != "desc" and not key > after:
+            return False
+    return True
+
+
+def _range_may_match(lo: datetime, lo_id: int, hi: datetime, hi_id: int, f: dict) -> bool:
+    if f.get("date_from") and hi < f["date_from"]:
+        return False
+    if f.get("date_to") and lo > f["date_to"]:
+        return False
+    after = f.get("after")
+    if after is not None:
+        if f.get("order") == "desc" and (lo, lo_id) >= after:
+            return False
+        if f.get("order") != "desc" and (hi, hi_id) <= after:
+            return False
+    return True
+
+
+def _file_may_match(meta: dict, f: dict) -> bool:
+    if f.get("entity") and f["entity"] not in meta["entities"]:
+        return False
+    if f.get("event") and f["event"] not in meta["events"]:
+        return False
+    return _range_may_match(
+        datetime.fromisoformat(meta["min_created_at"]), meta["min_id"],
+        datetime.fromisoformat(meta["max_created_at"]), meta["max_id"], f,
+    )
+
+
+def _chunk_may_match(chunk: dict, f: dict) -> bool:
+    return _range_may_match(
+        datetime.fromisoformat(chunk["min_created_at"]), chunk["min_id"],
+        datetime.fromisoformat(chunk["max_created_at"]), chunk["max_id"], f,
+    )
+
+
+def may_contain(f: dict, directory: str | None = None) -> bool:
+    """Cheap manifest-only check so hot-only queries never touch the archive files."""
+    manifest = load_manifest(directory)
+    if not manifest.get("files"):
+        return False
+    if f.get("date_from") and manifest.get("archived_before"):
+        if f["date_from"] >= datetime.fromisoformat(manifest["archived_before"]):
+            return False
+    return any(_file_may_match(meta, f) for meta in manifest["files"])
+
+
+def archived_keys(event: str, directory: str | None = None) -> frozenset:
+    """(entity, entity_id) pairs that have `event` in the archive (has_event dedup, e.g. sla_escalated).
+
+    Built from the files whose manifest lists the event and cached until the manifest changes, so
+    per-row dedup checks never open archive files.
+    """
+    directory = directory or archive_dir()
+    manifest = load_manifest(directory)
+    cache_key = (os.path.join(directory, MANIFEST), event)
+    with _manifest_lock:
+        cached = _keys_cache.get(cache_key)
+    if cached and cached[0] is manifest:
+        return cached[1]
+    keys = set()
+    for meta in manifest.get("files", []):
+        if event not in meta["events"]:
+            continue
+        for row in _iter_file(os.path.join(directory, meta["file"])):
+            if row["event"] == event:
+                keys.add((row["entity"], row["entity_id"]))
+    keys = frozenset(keys)
+    with _manifest_lock:
+        _keys_cache[cache_key] = (manifest, keys)
+    return keys
+
+
+def _parse(rows) -> Iterator[dict]:
+    for raw in rows:
+        raw["created_at"] = datetime.fromisoformat(raw["created_at"])
+        yield raw
+
+
+def scan(f: dict, directory: str | None = None) -> Iterator[dict]:
+    """Yield archived events matching filter `f` in (created_at, id) order given by f["order"].
+
+    Filter keys: entity, entity_id, event, date_from, date_to (datetime), order ("asc"|"desc"),
+    after ((created_at, id) keyset position).
+    """
+    directory = directory or archive_dir()
+    files = [meta for meta in load_manifest(directory).get("files", []) if _file_may_match(meta, f)]
+    desc_order = f.get("order") == "desc"
+    if desc_order:
+        files.reverse()
+    for meta in files:
+        path = os.path.join(directory, meta["file"])
+        chunks = meta.get("chunks")
+        if chunks is None:
+            # Written before chunk offsets were recorded: stream it; newest-first has to buffer the matches
+            rows = (r for r in _parse(_iter_file(path)) if _matches(r, f))
+            yield from (reversed(list(rows)) if desc_order else rows)
+            continue
+        for chunk in (reversed(chunks) if desc_order else chunks):
+            if not _chunk_may_match(chunk, f):
+                continue
+            rows = [r for r in _parse(_read_chunk(path, chunk)) if _matches(r, f)]
+            yield from (reversed(rows) if desc_order else rows)
@@ -0,0 +1,85 @@
+import os
+import re
+from datetime import date
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+# Partition maintenance for the monthly-partitioned events_audit (migrations/003).
+# No-op on databases where events_audit is a plain table (sqlite, un-migrated Postgres).
+
+PARENT = "events_audit"
+_PART_RE = re.compile(r"^events_audit_y(\d{4})m(\d{2})$")
+
+
+def _add_months(d: date, months: int) -> date:
+    idx = d.year * 12 + (d.month - 1) + months
+    return date(idx // 12, idx % 12 + 1, 1)
+
+
+def month_of(name: str) -> date | None:
+    m = _PART_RE.match(name)
+    if not m:
+        return None
+    return date(int(m.group(1)), int(m.group(2)), 1)
+
+
+def is_partitioned(engine: Engine) -> bool:
+    if engine.dialect.name != "postgresql":
+        return False
+    with engine.connect() as conn:
+        kind = conn.execute(text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:t)"), {"t": PARENT}).scalar()
+    return kind == "p"
+
+
+def list_partitions(engine: Engine) -> list[tuple[str, date]]:
+    with engine.connect() as conn:
+        rows = conn.execute(
+            text(
+                "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = to_regclass(:t)"
+            ),
+            {"t": PARENT},
+        ).all()
+    parts = [(r[0], month_of(r[0])) for r in rows]
+    return sorted((p for p in parts if p[1] is not None), key=lambda p: p[1])
+
+
+def ensure_partitions(engine: Engine, *, months_ahead: int = 2, today: date | None = None) -> list[str]:
+    start = (today or date.today()).replace(day=1)
+    created = []
+    with engine.begin() as conn:
+        for i in range(months_ahead + 1):
+            month = _add_months(start, i)
+            created.append(conn.execute(text("SELECT events_audit_ensure_partition(:m)"), {"m": month}).scalar())
+    return created
+
+
+def detach_expired(engine: Engine, *, retention_months: int, today: date | None = None) -> list[str]:
+    if retention_months <= 0:
+        return []
+    cutoff = _add_months((today or date.today()).replace(day=1), -retention_months)
+    lock_timeout_ms = int(os.getenv("AUDIT_DETACH_LOCK_TIMEOUT_MS", "5000") or 5000)
+    detached = []
+    for name, month in list_partitions(engine):
+        if _add_months(month, 1) > cutoff:
+            continue
+        # Plain DETACH: CONCURRENTLY is refused while events_audit_default exists. The ACCESS EXCLUSIVE
+        # lock is held only for the catalog update; lock_timeout keeps it from queueing behind long
+        # readers (and stalling writers behind it), the next pass retries
+        with engine.begin() as conn:
+            conn.exec_driver_sql(f"SET LOCAL lock_timeout = '{lock_timeout_ms}ms'")
+            conn.exec_driver_sql(f'ALTER TABLE {PARENT} DETACH PARTITION "{name}"')
+        detached.append(name)
+    return detached
+
+
+def maintenance_pass(engine: Engine) -> dict:
+    if not is_partitioned(engine):
+        return {"created": [], "detached": []}
+    ahead = int(os.getenv("AUDIT_PARTITION_MONTHS_AHEAD", "2") or 2)
+    retention = int(os.getenv("AUDIT_RETENTION_MONTHS", "0") or 0)
+    return {
+        "created": ensure_partitions(engine, months_ahead=ahead),
+        "detached": detach_expired(engine, retention_months=retention),
+    }
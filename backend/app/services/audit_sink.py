@@ -0,0 +1,91 @@
+import json
+import os
+from datetime import datetime
+
+from sqlalchemy import event as sa_event, insert
+from sqlalchemy.orm import Session
+
+from ..db import models
+from .buffered_writer import BufferedWriter
+
+# Write modes for audit events:
+#   sync     - legacy behaviour: add + commit + refresh per event
+#   buffered - events are queued in memory and written in bulk every N events or M ms. Not
+#              durable: queued events are lost if the process dies before the next flush, and
+#              while the DB is unreachable the queue keeps only the newest AUDIT_MAX_PENDING
+#              (older ones are dropped, counted in sink.dropped and logged)
+#   durable  - events ride along with the caller's session and are written at commit time
+AUDIT_MODES = ("sync", "buffered", "durable")
+
+_SESSION_KEY = "audit_pending"
+_COLUMNS = ("entity", "entity_id", "event", "payload", "created_at")
+
+
+def make_row(*, entity: str, entity_id: int, event: str, payload: dict | None = None) -> dict:
+    return {
+        "entity": entity,
+        "entity_id": entity_id,
+        "event": event,
+        "payload": payload,
+        "created_at": datetime.utcnow(),
+    }
+
+
+def write_rows(conn, rows: list[dict]) -> None:
+    """Multi-row insert of audit rows; uses COPY when running on Postgres via psycopg."""
+    if not rows:
+        return
+    if conn.dialect.name == "postgresql" and conn.dialect.driver == "psycopg":
+        cur = conn.connection.driver_connection.cursor()
+        cols = ", ".join(_COLUMNS)
+        with cur.copy(f"COPY {models.EventAudit.__tablename__} ({cols}) FROM STDIN") as copy:
+            for r in rows:
+                payload = json.dumps(r["payload"]) if r["payload"] is not None else None
+                copy.write_row((r["entity"], r["entity_id"], r["event"], payload, r["created_at"]))
+        return
+    conn.execute(insert(models.EventAudit), rows)
+
+
+class AuditSink(BufferedWriter):
+    env_prefix = "AUDIT"
+    thread_name = "audit-sink"
+
+    def configure(self):
+        super().configure()
+        mode = (os.getenv("AUDIT_WRITE_MODE", "buffered") or "buffered").strip().lower()
+        self.mode = mode if mode in AUDIT_MODES else "buffered"
+
+    def write(self, conn, rows: list[dict]) -> None:
+        write_rows(conn, rows)
+
+    def start(self):
+        self.configure()
+        if self.mode == "buffered":
+            super().start()
+
+
+sink = AuditSink()
+
+
+def add_to_session(db: Session, row: dict):
+    db.info.setdefault(_SESSION_KEY, []).append(row)
+
+
+def session_has_pending(db: Session) -> bool:
+    return bool(db.info.get(_SESSION_KEY))
+
+
+def take_session_pending(db: Session) -> list[dict]:
+    return db.info.pop(_SESSION_KEY, None) or []
+
+
+@sa_event.listens_for(Session, "before_commit")
+def _flush_session_pending(session: Session):
+    rows = session.info.pop(_SESSION_KEY, None)
+    if rows:
+        session.execute(insert(models.EventAudit), rows)
+
+
+@sa_event.listens_for(Session, "after_rollback")
+def _drop_session_pending(session: Session):
+    session.info.pop(_SESSION_KEY, None)
@@ -0,0 +1,116 @@
+import logging
+import os
+import threading
+
+log = logging.getLogger(__name__)
+
+
+class BufferedWriter:
+    """Queue rows in memory and write them in bulk every `flush_every` rows or `flush_interval` seconds.
+
+    Subclasses implement `write(conn, rows)`. Settings come from <ENV_PREFIX>_FLUSH_EVERY,
+    <ENV_PREFIX>_FLUSH_MS and <ENV_PREFIX>_MAX_PENDING. Until `start()` runs (scripts, tests
+    without the app) every enqueue is flushed inline.
+
+    Rows are at risk until written: a crash loses up to one flush interval of them, and while
+    writes fail only the newest `max_pending` are kept. Dropped rows are counted in `dropped`
+    and logged once per outage.
+    """
+
+    env_prefix = "BUFFER"
+    thread_name = "buffered-writer"
+
+    def __init__(self):
+        self.flush_every = 100
+        self.flush_interval = 0.2
+        self.max_pending = 10000
+        self._buffer: list[dict] = []
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._running = False
+        self.dropped = 0
+        self._dropping = False
+        self.configure()
+
+    def configure(self):
+        p = self.env_prefix
+        self.flush_every = max(1, int(os.getenv(f"{p}_FLUSH_EVERY", "100") or 100))
+        self.flush_interval = max(1, int(os.getenv(f"{p}_FLUSH_MS", "200") or 200)) / 1000.0
+        self.max_pending = max(self.flush_every, int(os.getenv(f"{p}_MAX_PENDING", "10000") or 10000))
+
+    def write(self, conn, rows: list[dict]) -> None:
+        raise NotImplementedError
+
+    def start(self):
+        self.configure()
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name=self.thread_name, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+
+    def pending(self) -> int:
+        return len(self._buffer)
+
+    def enqueue(self, row: dict):
+        with self._cond:
+            if len(self._buffer) >= self.max_pending:
+                # Drop oldest rather than grow without bound when the DB is unavailable
+                del self._buffer[0]
+                self._dropped(1)
+            self._buffer.append(row)
+            if len(self._buffer) >= self.flush_every:
+                self._cond.notify()
+        if not self._running:
+            self.flush()
+
+    def flush(self) -> int:
+        # Held for the whole write so readers calling flush() observe every row queued before them
+        with self._flush_lock:
+            with self._cond:
+                rows, self._buffer = self._buffer, []
+            if not rows:
+                return 0
+            from ..db import session as db_session
+
+            try:
+                with db_session.engine.begin() as conn:
+                    self.write(conn, rows)
+            except Exception:
+                with self._cond:
+                    merged = rows + self._buffer
+                    self._buffer = merged[-self.max_pending:]
+                    if len(merged) > self.max_pending:
+                        self._dropped(len(merged) - self.max_pending)
+                return 0
+            self._dropping = False
+            return len(rows)
+
+    def _dropped(self, n: int):
+        # Caller holds self._cond
+        self.dropped += n
+        if not self._dropping:
+            self._dropping = True
+            log.warning("%s: queue full (%d rows), dropping oldest rows until writes succeed", self.thread_name, self.max_pending)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._running:
+                    return
+                if len(self._buffer) < self.flush_every:
+                    self._cond.wait(timeout=self.flush_interval)
+            try:
+                self.flush()
+            except Exception:
+                pass
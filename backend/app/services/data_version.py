@@ -0,0 +1,166 @@
+import itertools
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable
+
+from sqlalchemy import event as sa_event
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from ..db import models
+
+# Data versions for the dashboard read models. Every transaction that writes an idea, review or
+# assignment bumps that table's row in data_versions (same transaction, so it is exact across
+# workers; ETags and the /projects/overview cache key on it) and, on commit, a process-wide
+# counter (zero-cost, but blind to writes made by other workers).
+#
+# Writes are only recorded as they happen; the UPDATE runs in before_commit, so the row lock is
+# held for the COMMIT alone rather than for the whole transaction (embeddings, audit COPY, ...).
+# A lock-free source (max(updated_at), a sequence) would not do: stamps are taken before commit,
+# so a transaction committing late could land below a version a reader has already seen.
+
+TRACKED = {models.Idea: "ideas", models.Review: "reviews", models.Assignment: "assignments"}
+_PENDING_KEY = "data_version_pending"
+_BUMPED_KEY = "data_version_bumped"
+_COMMITTING_KEY = "data_version_committing"
+
+_counter = itertools.count(1)
+_version = 0
+_lock = threading.Lock()
+
+
+def current() -> int:
+    return _version
+
+
+def bump() -> int:
+    """Advance the in-process version (invalidates in-memory caches)."""
+    global _version
+    with _lock:
+        _version = next(_counter)
+        return _version
+
+
+def bump_tables(conn, names) -> None:
+    """Bump data_versions rows in `conn`'s transaction; sessions go through mark_written() instead."""
+    t = models.DataVersion.__table__
+    for name in sorted(set(names)):
+        res = conn.execute(update(t).where(t.c.name == name).values(version=t.c.version + 1))
+        if not res.rowcount:
+            conn.execute(t.insert().values(name=name, version=1))
+
+
+def ensure_rows(engine) -> None:
+    """Seed missing data_versions rows at startup so concurrent first writers only ever UPDATE."""
+    t = models.DataVersion.__table__
+    with engine.begin() as conn:
+        existing = set(conn.execute(select(t.c.name)).scalars())
+        missing = [{"name": name, "version": 0} for name in sorted(set(TRACKED.values()) - existing)]
+        if missing:
+            conn.execute(t.insert(), missing)
+
+
+def read(db: Session, names) -> dict[str, int]:
+    t = models.DataVersion.__table__
+    rows = db.execute(select(t.c.name, t.c.version).where(t.c.name.in_(list(names)))).all()
+    found = dict(rows)
+    return {name: found.get(name, 0) for name in names}
+
+
+def mark_written(session: Session, names) -> None:
+    """Record writes to tracked tables in the session's transaction; Core inserts/updates call this directly."""
+    session.info.setdefault(_PENDING_KEY, set()).update(names)
+    if session.info.get(_COMMITTING_KEY):
+        # Written from another before_commit hook: the bump has to happen now
+        _bump_pending(session)
+
+
+def _bump_pending(session: Session) -> None:
+    bumped = session.info.setdefault(_BUMPED_KEY, set())
+    pending = session.info.get(_PENDING_KEY, set()) - bumped
+    if pending:
+        bump_tables(session.connection(), pending)
+        bumped.update(pending)
+
+
+@sa_event.listens_for(Session, "after_flush")
+def _track_writes(session: Session, flush_context):
+    touched = set()
+    for obj in itertools.chain(session.new, session.dirty, session.deleted):
+        name = TRACKED.get(type(obj))
+        if name:
+            touched.add(name)
+    if touched:
+        mark_written(session, touched)
+
+
+@sa_event.listens_for(Session, "before_commit")
+def _bump_before_commit(session: Session):
+    if session.get_nested_transaction() is not None:
+        return  # SAVEPOINT release; the outer COMMIT bumps
+    # Flush first so writes still pending in the identity map are recorded, then take the row locks
+    session.flush()
+    session.info[_COMMITTING_KEY] = True
+    _bump_pending(session)
+
+
+@sa_event.listens_for(Session, "after_commit")
+def _bump_on_commit(session: Session):
+    if session.get_nested_transaction() is not None:
+        return  # fires for SAVEPOINT release too
+    session.info.pop(_BUMPED_KEY, None)
+    session.info.pop(_COMMITTING_KEY, None)
+    if session.info.pop(_PENDING_KEY, None):
+        bump()
+
+
+@sa_event.listens_for(Session, "after_soft_rollback")
+def _clear_on_rollback(session: Session, previous_transaction):
+    # A rolled-back savepoint leaves the record in place (at worst one extra bump)
+    if not session.in_transaction():
+        for key in (_PENDING_KEY, _BUMPED_KEY, _COMMITTING_KEY):
+            session.info.pop(key, None)
+
+
+class VersionedCache:
+    """LRU of values valid for one data version (any hashable); entries also expire after `ttl` seconds."""
+
+    def __init__(self, env_prefix: str, max_size: int = 1000, ttl: int = 30):
+        self.env_prefix = env_prefix
+        self.default_size = max_size
+        self.default_ttl = ttl
+        self._entries: OrderedDict[tuple, tuple[Hashable, float, object]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.configure()
+
+    def configure(self):
+        p = self.env_prefix
+        self.max_size = max(1, int(os.getenv(f"{p}_CACHE_SIZE", str(self.default_size)) or self.default_size))
+        self.ttl = max(0, int(os.getenv(f"{p}_CACHE_TTL", str(self.default_ttl)) or 0))
+
+    def get(self, key: tuple, version: Hashable):
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit is None:
+                return None
+            if hit[0] != version or hit[1] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return hit[2]
+
+    def put(self, key: tuple, version: Hashable, value):
+        if not self.ttl:
+            return
+        with self._lock:
+            self._entries[key] = (version, time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        self.configure()
+        with self._lock:
+            self._entries.clear()
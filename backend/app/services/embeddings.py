@@ -9,6 +9,11 @@ def generate_embedding(text: str, dims: int = 1536) -> list[float]:
     return [random.uniform(-1, 1) for _ in range(dims)]
 
 
+def generate_embeddings(texts: Sequence[str], dims: int = 1536) -> list[list[float]]:
+    # Batch interface (one provider call per batch); the stub embeds one by one
+    return [generate_embedding(t, dims) for t in texts]
+
+
 def cosine_similarity(a: Sequence[float], b: Sequence[float]) -> float:
     import math
     dot = sum(x * y for x, y in zip(a, b))
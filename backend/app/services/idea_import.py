@@ -0,0 +1,213 @@
+import codecs
+import csv
+import json
+import os
+from datetime import datetime
+from typing import AsyncIterator, Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+from ..core.streaming import frame
+from ..crud import embeddings as emb_crud
+from ..crud import ideas as ideas_crud
+from ..db import session as db_session
+from . import audit_sink, data_version
+from .embeddings import generate_embeddings
+
+# Bulk import for POST /ideas/import. The body (CSV with a header row, or NDJSON) is parsed as it
+# arrives; records are grouped into batches of IDEA_IMPORT_BATCH_SIZE, and each batch is one
+# transaction: exact duplicates are dropped (within the import and against existing titles), the
+# rest are embedded in one call, checked against the corpus in one nearest-neighbour query, and
+# written with multi-row inserts for ideas, embeddings and audit rows. A progress frame follows
+# every batch.
+
+FORMATS = {"text/csv": "csv", "application/csv": "csv", "application/x-ndjson": "ndjson", "application/jsonl": "ndjson"}
+MAX_REPORTED_ERRORS = 100
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+def detect_format(content_type: Optional[str]) -> Optional[str]:
+    return FORMATS.get((content_type or "").split(";")[0].strip().lower())
+
+
+def dedup_key(title: str, description: str) -> str:
+    return " ".join(title.lower().split()) + "\n" + " ".join(description.lower().split())
+
+
+def _clean(rec: dict) -> dict:
+    title = (rec.get("title") or "").strip()
+    description = (rec.get("description") or "").strip()
+    if not title or not description:
+        raise ValueError("title and description required")
+    if len(title) > 255:
+        raise ValueError("title longer than 255 characters")
+    created_at = rec.get("created_at") or None
+    if created_at:
+        try:
+            created_at = datetime.fromisoformat(str(created_at))
+        except ValueError:
+            raise ValueError(f"invalid created_at: {created_at}")
+    return {"title": title, "description": description, "author_email": (rec.get("author_email") or "").strip() or None, "created_at": created_at}
+
+
+class RecordParser:
+    """Incremental CSV/NDJSON parser: feed() byte chunks, get back (line, record | None, error | None)."""
+
+    def __init__(self, fmt: str):
+        self.fmt = fmt
+        self.line = 0
+        self._decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        self._tail = ""
+        self._record = ""
+        self._record_line = 0
+        self._header: Optional[list[str]] = None
+
+    def feed(self, chunk: bytes) -> list[tuple]:
+        text = self._tail + self._decoder.decode(chunk)
+        lines = text.split("\n")
+        self._tail = lines.pop()
+        return [out for ln in lines for out in self._line(ln)]
+
+    def close(self) -> list[tuple]:
+        rest = self._tail + self._decoder.decode(b"", final=True)
+        self._tail = ""
+        out = list(self._line(rest)) if rest else []
+        if self._record:
+            out.append((self._record_line, None, "unterminated quoted field"))
+            self._record = ""
+        return out
+
+    def _line(self, ln: str):
+        self.line += 1
+        ln = ln.rstrip("\r")
+        if self.fmt == "ndjson":
+            if not ln.strip():
+                return
+            try:
+                rec = json.loads(ln)
+                if not isinstance(rec, dict):
+                    raise ValueError("expected a JSON object")
+                yield self.line, _clean(rec), None
+            except ValueError as exc:
+                yield self.line, None, str(exc)
+            return
+        # CSV: a quoted field may span lines, so collect until the quotes balance
+        if not self._record:
+            self._record_line = self.line
+            self._record = ln
+        else:
+            self._record += "\n" + ln
+        if self._record.count('"') % 2:
+            return
+        record, self._record = self._record, ""
+        if not record.strip():
+            return
+        values = next(csv.reader([record]))
+        if self._header is None:
+            self._header = [h.strip().lower() for h in values]
+            if "title" not in self._header or "description" not in self._header:
+                raise ImportFormatError("CSV header must include title and description")
+            return
+        try:
+            yield self._record_line, _clean(dict(zip(self._header, values))), None
+        except ValueError as exc:
+            yield self._record_line, None, str(exc)
+
+
+def import_batch(batch: list[tuple[int, dict]], seen: set, *, user_id: int, user_email: str, min_score: float) -> dict:
+    """Write one batch in one transaction; `seen` carries dedup keys across the batches of an import."""
+    result = {"imported": 0, "duplicates": [], "possible_duplicates": []}
+    fresh = []
+    for line, rec in batch:
+        key = dedup_key(rec["title"], rec["description"])
+        if key in seen:
+            result["duplicates"].append({"line": line, "reason": "repeated in import"})
+            continue
+        seen.add(key)
+        fresh.append((line, rec, key))
+    if not fresh:
+        return result
+    db = db_session.SessionLocal()
+    try:
+        candidates = ideas_crud.titles_in_use(db, {ideas_crud.title_key(rec["title"]) for _, rec, _ in fresh})
+        existing = {dedup_key(t, d) for t, d in candidates}
+        rows = []
+        for line, rec, key in fresh:
+            if key in existing:
+                result["duplicates"].append({"line": line, "reason": "already exists"})
+            else:
+                rows.append((line, rec))
+        if not rows:
+            return result
+        vectors = generate_embeddings([f"{rec['title']}\n{rec['description']}" for _, rec in rows])
+        try:
+            similar = emb_crud.nearest_batch(db, vectors=vectors, min_score=min_score)
+        except Exception:
+            db.rollback()
+            similar = {}
+        ids = ideas_crud.bulk_create_ideas(db, [rec for _, rec in rows], created_by_id=user_id)
+        emb_crud.add_embeddings(db, list(zip(ids, vectors)))
+        audit_sink.write_rows(
+            db.connection(),
+            [audit_sink.make_row(entity="idea", entity_id=i, event="imported", payload={"user": user_email}) for i in ids],
+        )
+        db.commit()
+    finally:
+        db.close()
+    data_version.bump()
+    result["imported"] = len(ids)
+    for n, (line, _) in enumerate(rows):
+        for match in similar.get(n, ()):
+            result["possible_duplicates"].append({"line": line, "idea_id": ids[n], "duplicate_of": match["idea_id"], "score": match["score"]})
+    return result
+
+
+async def run_import(chunks: AsyncIterator[bytes], fmt: str, out: str, *, user_id: int, user_email: str) -> AsyncIterator[bytes]:
+    """Stream of progress frames (one per batch), then a done frame with the totals."""
+    batch_size = max(1, int(os.getenv("IDEA_IMPORT_BATCH_SIZE", "500") or 500))
+    min_score = float(os.getenv("IDEA_IMPORT_MIN_SCORE", "0.9") or 0.9)
+    parser = RecordParser(fmt)
+    seen: set = set()
+    totals = {"received": 0, "imported": 0, "duplicates": 0, "possible_duplicates": 0, "errors": 0}
+    batch: list[tuple[int, dict]] = []
+    errors: list[dict] = []
+
+    async def write(pending):
+        res = await run_in_threadpool(import_batch, pending, seen, user_id=user_id, user_email=user_email, min_score=min_score)
+        totals["imported"] += res["imported"]
+        totals["duplicates"] += len(res["duplicates"])
+        totals["possible_duplicates"] += len(res["possible_duplicates"])
+        res["errors"] = errors[:]
+        errors.clear()
+        return frame(out, "progress", {**totals, "batch": res})
+
+    def take(items):
+        for line, rec, err in items:
+            totals["received"] += 1
+            if err is not None:
+                totals["errors"] += 1
+                if totals["errors"] <= MAX_REPORTED_ERRORS:
+                    errors.append({"line": line, "detail": err})
+            else:
+                batch.append((line, rec))
+
+    try:
+        async for chunk in chunks:
+            take(parser.feed(chunk))
+            while len(batch) >= batch_size:
+                pending, batch[:] = batch[:batch_size], batch[batch_size:]
+                yield await write(pending)
+        take(parser.close())
+        if batch or errors:
+            pending, batch[:] = batch[:], []
+            yield await write(pending)
+    except ImportFormatError as exc:
+        yield frame(out, "error", {"detail": str(exc)})
+        return
+    except Exception:
+        yield frame(out, "error", {"detail": "Import failed", **totals})
+        return
+    yield frame(out, "done", totals)
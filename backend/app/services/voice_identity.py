@@ -0,0 +1,132 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+from sqlalchemy import event as sa_event
+
+from ..db import models
+
+# Voice callers repeat constantly: normalized emails/phones are memoized, and the resolved user for a
+# given (external_id, phone, email) is cached until that user row changes. Invalidation comes from
+# mapper events, so it is per process; VOICE_IDENTITY_TTL bounds staleness from other workers.
+
+_NORMALIZE_CACHE_SIZE = max(1, int(os.getenv("VOICE_NORMALIZE_CACHE_SIZE", "4096") or 4096))
+
+
+@lru_cache(maxsize=_NORMALIZE_CACHE_SIZE)
+def normalize_email(email: Optional[str]) -> Optional[str]:
+    if not email:
+        return None
+    try:
+        from email_validator import validate_email
+        v = validate_email(email, check_deliverability=False)
+        return v.normalized
+    except Exception:
+        return email.strip().lower()
+
+
+@lru_cache(maxsize=_NORMALIZE_CACHE_SIZE)
+def normalize_phone(phone: Optional[str]) -> Optional[str]:
+    if not phone:
+        return None
+    try:
+        import phonenumbers
+        num = phonenumbers.parse(phone, None)
+        if phonenumbers.is_valid_number(num):
+            return phonenumbers.format_number(num, phonenumbers.PhoneNumberFormat.E164)
+    except Exception:
+        pass
+    # Fallback: digits only prefixed
+    digits = ''.join(ch for ch in phone if ch.isdigit())
+    if not digits:
+        return None
+    if not digits.startswith('+' ):
+        digits = '+' + digits
+    return digits
+
+
+def warm_parsers():
+    """Import email_validator/phonenumbers and load their data at startup instead of on the first call."""
+    try:
+        from email_validator import validate_email
+        validate_email("warmup@example.com", check_deliverability=False)
+    except Exception:
+        pass
+    try:
+        import phonenumbers
+        phonenumbers.is_valid_number(phonenumbers.parse("+14155550100", None))
+    except Exception:
+        pass
+
+
+class Identity(NamedTuple):
+    user_id: int
+    email: str
+    full_name: Optional[str]
+    role: str
+
+
+class IdentityCache:
+    def __init__(self):
+        self._entries: OrderedDict[tuple, tuple[Identity, float]] = OrderedDict()
+        self._by_user: dict[int, set[tuple]] = {}
+        self._lock = threading.Lock()
+        self.configure()
+
+    def configure(self):
+        self.max_size = max(1, int(os.getenv("VOICE_IDENTITY_CACHE_SIZE", "10000") or 10000))
+        self.ttl = max(1, int(os.getenv("VOICE_IDENTITY_TTL", "300") or 300))
+
+    def get(self, key: tuple) -> Optional[Identity]:
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit is None:
+                return None
+            ident, expires = hit
+            if expires < time.monotonic():
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return ident
+
+    def put(self, key: tuple, user: models.User) -> Identity:
+        ident = Identity(user.id, user.email, user.full_name, user.role)
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = (ident, time.monotonic() + self.ttl)
+            self._by_user.setdefault(ident.user_id, set()).add(key)
+            while len(self._entries) > self.max_size:
+                self._drop(next(iter(self._entries)))
+        return ident
+
+    def _drop(self, key: tuple):
+        hit = self._entries.pop(key, None)
+        if hit is not None:
+            keys = self._by_user.get(hit[0].user_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_user[hit[0].user_id]
+
+    def invalidate_user(self, user_id: int):
+        with self._lock:
+            for key in list(self._by_user.get(user_id, ())):
+                self._drop(key)
+
+    def clear(self):
+        self.configure()
+        with self._lock:
+            self._entries.clear()
+            self._by_user.clear()
+
+
+identity_cache = IdentityCache()
+
+
+@sa_event.listens_for(models.User, "after_update")
+@sa_event.listens_for(models.User, "after_delete")
+def _invalidate_user(mapper, connection, target):
+    identity_cache.invalidate_user(target.id)
@@ -0,0 +1,64 @@
+import hashlib
+import os
+from datetime import datetime
+
+from sqlalchemy import insert
+
+from ..core.limiter import make_backend
+from ..crud import voice_usage as usage_crud
+from ..db import models
+from .buffered_writer import BufferedWriter
+
+# Voice API quotas are enforced from limiter counters (core/limiter.py: memory | shm | redis),
+# so the voice hot path does no DB work; voice_usage rows are still written, in batches, for accounting.
+
+_backend = None
+
+
+def quota_backend():
+    global _backend
+    if _backend is None:
+        _backend = make_backend(os.getenv("VOICE_QUOTA_BACKEND") or None, window=60.0)
+    return _backend
+
+
+def key_id(api_key: str) -> str:
+    # Never put the raw API key into a shared store (limiter counters, voice_usage, rollups)
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:24]
+
+
+def check_quota(api_key: str) -> float:
+    """Count one voice call against the per-minute and per-day quotas; 0 if allowed, else retry-after seconds."""
+    qpm = int(os.getenv("VOICE_QUOTA_PER_MINUTE", "60") or 60)
+    qpd = int(os.getenv("VOICE_QUOTA_PER_DAY", "5000") or 5000)
+    backend = quota_backend()
+    kid = key_id(api_key)
+    retry = backend.hit(f"voice:m:{kid}", qpm, window=60.0)
+    if retry:
+        return retry
+    return backend.hit(f"voice:d:{kid}", qpd, window=86400.0)
+
+
+class VoiceUsageWriter(BufferedWriter):
+    env_prefix = "VOICE_USAGE"
+    thread_name = "voice-usage"
+
+    def write(self, conn, rows: list[dict]) -> None:
+        conn.execute(insert(models.VoiceUsage), rows)
+        # Same transaction: buckets never disagree with the raw rows they summarise
+        usage_crud.upsert_rollups(conn, rows)
+
+
+usage_writer = VoiceUsageWriter()
+
+
+def record_usage(api_key: str):
+    usage_writer.enqueue({"key_id": key_id(api_key), "created_at": datetime.utcnow()})
+
+
+def compaction_pass(engine) -> dict:
+    raw_days = int(os.getenv("VOICE_USAGE_RAW_RETENTION_DAYS", "2") or 2)
+    minute_days = int(os.getenv("VOICE_USAGE_MINUTE_RETENTION_DAYS", "7") or 7)
+    usage_writer.flush()
+    with engine.begin() as conn:
+        return usage_crud.compact(conn, raw_days=raw_days, minute_days=minute_days)
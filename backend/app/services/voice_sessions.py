@@ -0,0 +1,214 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.orm import Session
+
+from ..db import models
+
+# Write-behind cache for voice_sessions. Active dialogs are served from memory; changes are
+# marked dirty and written in one batched UPDATE per flush interval. Responses carry
+# X-Voice-Session so a proxy can keep a dialog on one instance (infra/prod/nginx.conf hashes on it
+# once there is more than one upstream), but correctness does not depend on it: every flush is a
+# compare-and-set on voice_sessions.version. A worker whose cached copy went stale loses the
+# write, drops the entry and re-reads the row on the next request.
+
+ROUTING_HEADER = "X-Voice-Session"
+
+
+def routing_key(session_id: int) -> str:
+    """Stable, opaque key for consistent-hash routing of a session to one backend instance."""
+    return hashlib.blake2b(str(session_id).encode("ascii"), digest_size=6).hexdigest()
+
+
+class CachedSession:
+    __slots__ = ("id", "api_key", "user_email", "context", "last_response", "version", "touched")
+
+    def __init__(
+        self, id: int, api_key: str, user_email: str | None, context: dict | None, last_response: str | None, version: int = 0
+    ):
+        self.id = id
+        self.api_key = api_key
+        self.user_email = user_email
+        self.context = context or {}
+        self.last_response = last_response
+        # Row version this copy is based on (compare-and-set on flush)
+        self.version = version
+        self.touched = time.monotonic()
+
+    @classmethod
+    def from_row(cls, row: models.VoiceSession) -> "CachedSession":
+        return cls(row.id, row.api_key, row.user_email, dict(row.context or {}), row.last_response, row.version or 0)
+
+
+class VoiceSessionStore:
+    def __init__(self):
+        self._cache: OrderedDict[int, CachedSession] = OrderedDict()
+        self._dirty: dict[int, dict] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.configure()
+
+    def configure(self):
+        self.max_size = max(1, int(os.getenv("VOICE_SESSION_CACHE_SIZE", "10000") or 10000))
+        self.ttl = max(1, int(os.getenv("VOICE_SESSION_TTL", "1800") or 1800))
+        self.flush_interval = max(1, int(os.getenv("VOICE_SESSION_FLUSH_MS", "1000") or 1000)) / 1000.0
+
+    def start(self):
+        self.configure()
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="voice-sessions", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.clear()
+
+    def clear(self):
+        self.flush()
+        with self._lock:
+            self._cache.clear()
+
+    def _put(self, sess: CachedSession):
+        cache = self._cache
+        cache[sess.id] = sess
+        cache.move_to_end(sess.id)
+        now = time.monotonic()
+        while cache:
+            oldest = next(iter(cache.values()))
+            if len(cache) > self.max_size or now - oldest.touched > self.ttl:
+                # Dirty state lives in _dirty, so eviction never loses a pending write
+                del cache[oldest.id]
+                continue
+            break
+
+    def get(self, db: Session, session_id: int) -> CachedSession | None:
+        with self._lock:
+            sess = self._cache.get(session_id)
+            if sess is not None:
+                sess.touched = time.monotonic()
+                self._cache.move_to_end(session_id)
+                return sess
+        row = db.get(models.VoiceSession, session_id)
+        if row is None:
+            return None
+        sess = CachedSession.from_row(row)
+        with self._lock:
+            pending = self._dirty.get(session_id)
+            if pending:
+                # Evicted while dirty: the unflushed values are newer than the row we just read
+                sess.context, sess.last_response = dict(pending["context"] or {}), pending["last_response"]
+                sess.version = pending["b_version"]
+            self._put(sess)
+        return sess
+
+    def create(
+        self, db: Session, *, api_key: str, user_email: str | None, context: dict | None = None, commit: bool = True
+    ) -> CachedSession:
+        row = models.VoiceSession(api_key=api_key, user_email=user_email, context=context or {})
+        db.add(row)
+        if not commit:
+            # Inside the caller's transaction: cached by save() once that transaction has committed
+            db.flush()
+            return CachedSession.from_row(row)
+        db.commit()
+        db.refresh(row)
+        sess = CachedSession.from_row(row)
+        with self._lock:
+            self._put(sess)
+        return sess
+
+    def save(self, sess: CachedSession):
+        with self._lock:
+            sess.touched = time.monotonic()
+            self._dirty[sess.id] = {
+                "b_id": sess.id,
+                "b_version": sess.version,
+                "context": dict(sess.context or {}),
+                "last_response": sess.last_response,
+            }
+            self._put(sess)
+
+    def pending(self) -> int:
+        return len(self._dirty)
+
+    def flush(self) -> int:
+        with self._flush_lock:
+            with self._lock:
+                rows, self._dirty = list(self._dirty.values()), {}
+            if not rows:
+                return 0
+            from ..db import session as db_session
+
+            t = models.VoiceSession.__table__
+            stmt = (
+                update(t)
+                .where(t.c.id == bindparam("b_id"), t.c.version == bindparam("b_version"))
+                .values(context=bindparam("context"), last_response=bindparam("last_response"), version=t.c.version + 1)
+            )
+            conflicts = set()
+            try:
+                with db_session.engine.begin() as conn:
+                    if conn.execute(stmt, rows).rowcount != len(rows):
+                        conflicts = self._conflicts(conn, rows)
+            except Exception:
+                with self._lock:
+                    for r in rows:
+                        self._dirty.setdefault(r["b_id"], r)
+                return 0
+            with self._lock:
+                for r in rows:
+                    sid, base = r["b_id"], r["b_version"]
+                    sess = self._cache.get(sid)
+                    pending = self._dirty.get(sid)
+                    if sid in conflicts:
+                        # Another instance wrote the row first: its state wins, re-read on next get
+                        if sess is not None and sess.version == base:
+                            del self._cache[sid]
+                        if pending is not None and pending["b_version"] == base:
+                            del self._dirty[sid]
+                        continue
+                    if sess is not None and sess.version == base:
+                        sess.version = base + 1
+                    if pending is not None and pending["b_version"] == base:
+                        pending["b_version"] = base + 1
+            return len(rows) - len(conflicts)
+
+    @staticmethod
+    def _conflicts(conn, rows: list[dict]) -> set[int]:
+        # Rare path (the batch rowcount came up short): a row is ours if it now holds exactly what we wrote
+        t = models.VoiceSession.__table__
+        current = {
+            r.id: r
+            for r in conn.execute(
+                select(t.c.id, t.c.version, t.c.context, t.c.last_response).where(t.c.id.in_([r["b_id"] for r in rows]))
+            )
+        }
+        out = set()
+        for r in rows:
+            row = current.get(r["b_id"])
+            if row is None:
+                continue
+            if row.version != r["b_version"] + 1 or (row.context or {}) != r["context"] or row.last_response != r["last_response"]:
+                out.add(r["b_id"])
+        return out
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                pass
+
+
+store = VoiceSessionStore()
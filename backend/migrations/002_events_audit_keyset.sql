@@ -0,0 +1,2 @@
+-- Keyset pagination for GET /events: ORDER BY created_at, id with (created_at, id) cursor
+CREATE INDEX IF NOT EXISTS ix_events_audit_created_at_id ON events_audit (created_at, id);
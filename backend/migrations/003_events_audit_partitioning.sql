@@ -0,0 +1,69 @@
+-- Monthly range partitioning for events_audit (Postgres 14+)
+-- * parent is partitioned by created_at; queries with a created_at range prune to the matching months
+-- * indexes are declared on the parent and cascade to every partition:
+--     BRIN (created_at) for time-range scans, B-tree (entity, entity_id, event) for has_event lookups,
+--     B-tree (created_at, id) for keyset pagination (see 002)
+-- * events_audit_ensure_partition(month) creates a month on demand; the app runs it ahead of time
+--   (services/audit_partitions.py), and rows that landed in the DEFAULT partition are moved over
+-- * old months are detached (plain DETACH PARTITION: CONCURRENTLY is not allowed while a DEFAULT
+--   partition exists) by the same maintenance pass
+
+BEGIN;
+
+DROP INDEX IF EXISTS ix_events_audit_created_at_id;
+DROP INDEX IF EXISTS ix_events_audit_entity_lookup;
+ALTER TABLE events_audit RENAME TO events_audit_legacy;
+ALTER SEQUENCE events_audit_id_seq OWNED BY NONE;
+
+CREATE TABLE events_audit (
+  id INT NOT NULL DEFAULT nextval('events_audit_id_seq'),
+  entity VARCHAR(50) NOT NULL,
+  entity_id INT NOT NULL,
+  event VARCHAR(100) NOT NULL,
+  payload JSONB,
+  created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+  PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+CREATE TABLE events_audit_default PARTITION OF events_audit DEFAULT;
+
+CREATE INDEX ix_events_audit_created_at_brin ON events_audit USING brin (created_at);
+CREATE INDEX ix_events_audit_entity_lookup ON events_audit (entity, entity_id, event);
+CREATE INDEX ix_events_audit_created_at_id ON events_audit (created_at, id);
+
+CREATE OR REPLACE FUNCTION events_audit_ensure_partition(month_start DATE) RETURNS TEXT AS $$
+DECLARE
+  start_ts TIMESTAMP := date_trunc('month', month_start);
+  end_ts TIMESTAMP := date_trunc('month', month_start) + INTERVAL '1 month';
+  part TEXT := format('events_audit_y%sm%s', to_char(start_ts, 'YYYY'), to_char(start_ts, 'MM'));
+BEGIN
+  IF to_regclass(part) IS NOT NULL THEN
+    RETURN part;
+  END IF;
+  EXECUTE format('CREATE TABLE %I (LIKE events_audit INCLUDING DEFAULTS)', part);
+  -- Rows that arrived before the month existed sit in the default partition; move them first
+  EXECUTE format(
+    'WITH moved AS (DELETE FROM events_audit_default WHERE created_at >= $1 AND created_at < $2 RETURNING *) '
+    'INSERT INTO %I SELECT * FROM moved', part
+  ) USING start_ts, end_ts;
+  EXECUTE format(
+    'ALTER TABLE events_audit ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)', part, start_ts, end_ts
+  );
+  RETURN part;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT events_audit_ensure_partition(m::date)
+FROM generate_series(
+  date_trunc('month', COALESCE((SELECT min(created_at) FROM events_audit_legacy), NOW())),
+  date_trunc('month', NOW()) + INTERVAL '2 months',
+  INTERVAL '1 month'
+) AS m;
+
+INSERT INTO events_audit (id, entity, entity_id, event, payload, created_at)
+SELECT id, entity, entity_id, event, payload, created_at FROM events_audit_legacy;
+
+DROP TABLE events_audit_legacy;
+ALTER SEQUENCE events_audit_id_seq OWNED BY events_audit.id;
+
+COMMIT;
@@ -0,0 +1,18 @@
+-- Per-key per-minute and per-day voice usage buckets, maintained incrementally by the usage writer
+CREATE TABLE IF NOT EXISTS voice_usage_rollups (
+  id SERIAL PRIMARY KEY,
+  api_key VARCHAR(255) NOT NULL,
+  granularity VARCHAR(10) NOT NULL,
+  bucket_start TIMESTAMP NOT NULL,
+  count INT NOT NULL DEFAULT 0,
+  CONSTRAINT uq_voice_usage_rollups_bucket UNIQUE (api_key, granularity, bucket_start)
+);
+
+-- Backfill from existing raw rows
+INSERT INTO voice_usage_rollups (api_key, granularity, bucket_start, count)
+SELECT api_key, 'minute', date_trunc('minute', created_at), count(*) FROM voice_usage GROUP BY 1, 3
+ON CONFLICT (api_key, granularity, bucket_start) DO NOTHING;
+
+INSERT INTO voice_usage_rollups (api_key, granularity, bucket_start, count)
+SELECT api_key, 'day', date_trunc('day', created_at), count(*) FROM voice_usage GROUP BY 1, 3
+ON CONFLICT (api_key, granularity, bucket_start) DO NOTHING;
@@ -0,0 +1,11 @@
+-- Per-status idea counters, adjusted transactionally by create_idea/set_idea_status and
+-- reconciled hourly against ideas (crud/idea_counts.reconcile)
+CREATE TABLE IF NOT EXISTS idea_status_counts (
+  status VARCHAR(50) PRIMARY KEY,
+  count INT NOT NULL DEFAULT 0
+);
+
+-- Backfill
+INSERT INTO idea_status_counts (status, count)
+SELECT status, count(*) FROM ideas GROUP BY status
+ON CONFLICT (status) DO UPDATE SET count = EXCLUDED.count;
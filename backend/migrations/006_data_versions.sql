@@ -0,0 +1,8 @@
+-- Per-table write counters for ETags: bumped in the same transaction as idea/review/assignment writes
+CREATE TABLE IF NOT EXISTS data_versions (
+  name VARCHAR(50) PRIMARY KEY,
+  version INT NOT NULL DEFAULT 0
+);
+
+INSERT INTO data_versions (name, version) VALUES ('ideas', 0), ('reviews', 0), ('assignments', 0)
+ON CONFLICT (name) DO NOTHING;
@@ -0,0 +1,4 @@
+-- Keyset pagination and filters for GET /ideas: ORDER BY (created_at, id) with optional status/author
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_ideas_created_at_id ON ideas (created_at, id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_ideas_status_created_at_id ON ideas (status, created_at, id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_ideas_author_created_at_id ON ideas (author_email, created_at, id);
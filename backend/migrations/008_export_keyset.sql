@@ -0,0 +1,4 @@
+-- Oldest-first queue listings of reviews and assignments: ORDER BY (created_at, id)
+-- (GET /export orders by (updated_at, id) since migrations/010, which has its own indexes)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_reviews_created_at_id ON reviews (created_at, id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_assignments_created_at_id ON assignments (created_at, id);
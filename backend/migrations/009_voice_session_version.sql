@@ -0,0 +1,4 @@
+-- Compare-and-set for the voice_sessions write-behind cache (services/voice_sessions.py):
+-- each flush updates WHERE version = <version the cached copy was read at> and bumps it, so a
+-- worker holding a stale copy cannot overwrite a newer dialog state written by another worker.
+ALTER TABLE voice_sessions ADD COLUMN IF NOT EXISTS version INT NOT NULL DEFAULT 0;
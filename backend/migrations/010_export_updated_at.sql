@@ -0,0 +1,17 @@
+-- GET /export/{entity} incremental pulls follow updated_at (set on every insert and update by the app),
+-- so edits and backdated inserts are picked up by the next `since`, not only newly created rows
+ALTER TABLE ideas ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP;
+ALTER TABLE reviews ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP;
+ALTER TABLE assignments ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP;
+
+UPDATE ideas SET updated_at = created_at WHERE updated_at IS NULL;
+UPDATE reviews SET updated_at = created_at WHERE updated_at IS NULL;
+UPDATE assignments SET updated_at = created_at WHERE updated_at IS NULL;
+
+ALTER TABLE ideas ALTER COLUMN updated_at SET DEFAULT NOW();
+ALTER TABLE reviews ALTER COLUMN updated_at SET DEFAULT NOW();
+ALTER TABLE assignments ALTER COLUMN updated_at SET DEFAULT NOW();
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_ideas_updated_at_id ON ideas (updated_at, id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_reviews_updated_at_id ON reviews (updated_at, id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_assignments_updated_at_id ON assignments (updated_at, id);
@@ -0,0 +1,7 @@
+-- POST /ideas/import looks up existing ideas by normalised title (crud/ideas.py title_key).
+-- The key folds Unicode case and drops all Unicode whitespace, which lower()/replace() in SQL
+-- do not reproduce, so the app fills it: on insert, and for existing rows via
+-- crud.ideas.backfill_title_keys (run by the hourly maintenance worker, batched).
+ALTER TABLE ideas ADD COLUMN IF NOT EXISTS title_key TEXT;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_ideas_title_key ON ideas (title_key);
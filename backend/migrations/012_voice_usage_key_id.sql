@@ -0,0 +1,23 @@
+-- voice_usage and voice_usage_rollups keep voice_quota.key_id(api_key) — the first 24 hex digits
+-- of sha256 over the UTF-8 key — instead of the raw API key; GET /voice/usage-report hashes
+-- its ?api_key= filter the same way. Existing rows are hashed in place, once (Postgres 11+).
+-- Run with the new app version: rows written by an old worker after this would stay raw.
+BEGIN;
+
+DO $$
+BEGIN
+  IF EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name = 'voice_usage' AND column_name = 'api_key') THEN
+    ALTER TABLE voice_usage RENAME COLUMN api_key TO key_id;
+    UPDATE voice_usage SET key_id = left(encode(sha256(convert_to(key_id, 'UTF8')), 'hex'), 24);
+  END IF;
+  IF EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name = 'voice_usage_rollups' AND column_name = 'api_key') THEN
+    ALTER TABLE voice_usage_rollups RENAME COLUMN api_key TO key_id;
+    UPDATE voice_usage_rollups SET key_id = left(encode(sha256(convert_to(key_id, 'UTF8')), 'hex'), 24);
+  END IF;
+END
+$$;
+
+ALTER INDEX IF EXISTS ix_voice_usage_api_key RENAME TO ix_voice_usage_key_id;
+CREATE INDEX IF NOT EXISTS ix_voice_usage_key_id ON voice_usage (key_id);
+
+COMMIT;
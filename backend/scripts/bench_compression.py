@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+"""Bytes on the wire vs added server latency for CompressionMiddleware, per encoding and level.
+
+Payloads are captured once from the real app (GET /ideas?limit=200, /events?limit=200,
+/projects/overview over a seeded sqlite DB), then replayed through the middleware alone so only
+compression cost is measured. "transfer" is the time the body takes on a LINK_MBIT link.
+Run from backend/.
+"""
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+_tmp = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp}/bench.db"
+os.environ.setdefault("RATE_LIMIT_PER_MINUTE", "1000000")
+os.environ["AUDIT_WRITE_MODE"] = "sync"
+
+from sqlalchemy import insert  # noqa: E402
+from starlette.applications import Starlette  # noqa: E402
+from starlette.responses import Response  # noqa: E402
+from starlette.routing import Route  # noqa: E402
+
+from app.core import compression  # noqa: E402
+from app.core.compression import CompressionMiddleware  # noqa: E402
+
+REPEAT = 200
+LINK_MBIT = 10
+WORDS = "improve onboarding flow reduce manual review time for finance approvals using the shared queue".split()
+
+
+def capture() -> dict[str, bytes]:
+    from fastapi.testclient import TestClient
+
+    from app.db import models
+    from app.db.session import engine
+    from app.main import app
+
+    with TestClient(app) as client:
+        token = client.post("/auth/register", json={"email": "bench@example.com", "password": "password8"}).json()["access_token"]
+        auth = {"Authorization": f"Bearer {token}", "Accept-Encoding": "identity"}
+        with engine.begin() as conn:
+            conn.execute(
+                insert(models.Idea),
+                [
+                    {"title": f"Idea {n}: " + " ".join(WORDS[n % 7:n % 7 + 4]), "description": " ".join(WORDS[(n + k) % len(WORDS)] for k in range(60)),
+                     "author_email": f"user{n % 40}@example.com", "status": "submitted"}
+                    for n in range(500)
+                ],
+            )
+            conn.execute(
+                insert(models.EventAudit),
+                [{"entity": "idea", "entity_id": n, "event": "created", "payload": {"user": f"user{n % 40}@example.com"}} for n in range(500)],
+            )
+        return {
+            "ideas": client.get("/ideas/", params={"limit": 200}, headers=auth).content,
+            "events": client.get("/events/", params={"limit": 200}, headers=auth).content,
+            "overview": client.get("/projects/overview", headers=auth).content,
+        }
+
+
+def build(payloads: dict[str, bytes], coding: str | None, level: int):
+    routes = [Route(f"/{name}", (lambda body: lambda r: Response(body, media_type="application/json"))(body)) for name, body in payloads.items()]
+    app = Starlette(routes=routes)
+    if coding == "gzip":
+        app.add_middleware(CompressionMiddleware, min_size=1024, gzip_level=level)
+    elif coding == "br":
+        app.add_middleware(CompressionMiddleware, min_size=1024, br_quality=level)
+    return app
+
+
+async def hit(app, path: str, accept: str) -> tuple[float, int]:
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http", "method": "GET", "path": path, "raw_path": path.encode(), "query_string": b"", "root_path": "",
+        "headers": [(b"accept-encoding", accept.encode())], "scheme": "http", "server": ("bench", 80), "client": ("c", 1),
+        "http_version": "1.1",
+    }
+    start = time.perf_counter()
+    await app(scope, receive, send)
+    return time.perf_counter() - start, sum(len(m.get("body", b"")) for m in sent if m["type"] == "http.response.body")
+
+
+def main():
+    payloads = capture()
+    configs = [(None, 0), ("gzip", 1), ("gzip", 6), ("gzip", 9)]
+    if compression.brotli is not None:
+        configs += [("br", 1), ("br", 4), ("br", 11)]
+    else:
+        print("(brotli not installed: br rows skipped)")
+    for name in payloads:
+        print(f"{name}: {len(payloads[name]) / 1024:.1f} KiB identity")
+        for coding, level in configs:
+            app = build(payloads, coding, level)
+            accept = coding or "identity"
+            lat, size = [], 0
+            for _ in range(REPEAT):
+                t, size = asyncio.run(hit(app, f"/{name}", accept))
+                lat.append(t)
+            server_ms = statistics.median(lat) * 1000
+            transfer_ms = size * 8 / (LINK_MBIT * 1e6) * 1000
+            label = f"{coding or 'identity'}-{level}" if coding else "identity"
+            print(
+                f"  {label:10s} {size / 1024:8.1f} KiB  ratio {len(payloads[name]) / size:5.1f}x"
+                f"  server {server_ms:6.2f} ms  transfer@{LINK_MBIT}Mbit {transfer_ms:7.1f} ms  total {server_ms + transfer_ms:7.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+"""Export throughput and peak memory vs table size.
+
+"before" is what BI did without an export: load every idea and dump one JSON document; "after" drains
+app.services.export.iter_export (NDJSON, and NDJSON + gzip level 1). Peak memory should stay flat
+for "after" as the table grows. Uses a throwaway sqlite file. Run from backend/.
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+_tmp = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp}/bench.db"
+
+import json  # noqa: E402
+
+from sqlalchemy import insert, select  # noqa: E402
+
+from app.db import models  # noqa: E402
+from app.db.session import engine  # noqa: E402
+from app.services import export as export_service  # noqa: E402
+
+SIZES = (10_000, 50_000)
+DESCRIPTION = "Legacy idea imported for the benchmark. " * 10
+
+
+def before() -> int:
+    with engine.connect() as conn:
+        rows = [dict(r._mapping) for r in conn.execute(select(models.Idea.__table__))]
+    return len(json.dumps(rows, default=str).encode())
+
+
+def after(gzip_level):
+    def run() -> int:
+        names = export_service.columns("ideas")
+        return sum(len(c) for c in export_service.iter_export("ideas", names, "ndjson", gzip_level=gzip_level))
+    return run
+
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    size = fn()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, size, peak
+
+
+def main():
+    models.Base.metadata.create_all(bind=engine)
+    have = 0
+    for total in SIZES:
+        with engine.begin() as conn:
+            conn.execute(
+                insert(models.Idea),
+                [{"title": f"Idea {n}", "description": DESCRIPTION, "status": "submitted"} for n in range(have, total)],
+            )
+        have = total
+        for label, fn in (("before", before), ("after", after(None)), ("after gzip", after(1))):
+            elapsed, size, peak = measure(fn)
+            print(
+                f"{label:10s} {total:6d} rows: {total / elapsed:9.0f} rows/s  {size / elapsed / 1e6:6.1f} MB/s out"
+                f"  {size / 1e6:6.1f} MB  peak {peak / 1e6:6.1f} MB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+"""Ideas per second: one POST /ideas/ per idea ("before") vs a streamed POST /ideas/import ("after").
+
+Runs the full app in-process against a throwaway sqlite file. Run from backend/.
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+_tmp = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp}/bench.db"
+os.environ.setdefault("RATE_LIMIT_PER_MINUTE", "1000000")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.main import app  # noqa: E402
+
+SINGLE = 200
+BULK = int(os.getenv("BENCH_BULK", "5000"))
+
+
+def main():
+    with TestClient(app) as client:
+        token = client.post("/auth/register", json={"email": "bench@example.com", "password": "password8"}).json()["access_token"]
+        auth = {"Authorization": f"Bearer {token}"}
+
+        start = time.perf_counter()
+        for n in range(SINGLE):
+            client.post("/ideas/", headers=auth, json={"title": f"Single {n}", "description": f"Legacy idea number {n}"})
+        before = SINGLE / (time.perf_counter() - start)
+
+        def body():
+            for n in range(BULK):
+                yield (json.dumps({"title": f"Bulk {n}", "description": f"Legacy idea number {n}"}) + "\n").encode()
+
+        start = time.perf_counter()
+        r = client.post("/ideas/import", headers={**auth, "Content-Type": "application/x-ndjson"}, content=body())
+        after = BULK / (time.perf_counter() - start)
+        done = json.loads(r.text.splitlines()[-1])
+        assert done["imported"] == BULK, done
+
+    print(f"before  {SINGLE:5d} x POST /ideas/       {before:8.0f} ideas/s")
+    print(f"after   {BULK:5d} via POST /ideas/import {after:8.0f} ideas/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+"""Per-row cost of serializing a GET /ideas page.
+
+"before" loads Idea entities and copies them into the pydantic model, as list_ideas used to; "after"
+is the projected read path (Core rows -> app.core.projection.rows_response), once with every column
+and once with ?fields=id,title,status. Uses a throwaway sqlite file. Run from backend/.
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+_tmp = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp}/bench.db"
+
+from typing import List  # noqa: E402
+
+from pydantic import TypeAdapter  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from app.api.ideas import IDEA_FIELDS, Idea  # noqa: E402
+from app.core.projection import rows_response  # noqa: E402
+from app.crud import ideas as ideas_crud  # noqa: E402
+from app.db import models  # noqa: E402
+from app.db.session import SessionLocal, engine  # noqa: E402
+
+ROWS = 200
+REPEAT = 200
+DESCRIPTION = "Lorem ipsum dolor sit amet. " * 80
+
+
+def before(db):
+    rows = ideas_crud.list_ideas_page(db, limit=ROWS)
+    out = [Idea(id=r.id, title=r.title, description=r.description, author_email=r.author_email, status=r.status, created_at=r.created_at) for r in rows]
+    db.expunge_all()
+    return TypeAdapter(List[Idea]).dump_json(out)
+
+
+def after(names):
+    def run(db):
+        return rows_response(names, ideas_crud.list_ideas_page(db, limit=ROWS, columns=names)).body
+    return run
+
+
+def measure(fn) -> tuple[float, int]:
+    db = SessionLocal()
+    try:
+        fn(db)
+        start = time.perf_counter()
+        for _ in range(REPEAT):
+            fn(db)
+        per_row_us = (time.perf_counter() - start) / (REPEAT * ROWS) * 1e6
+        tracemalloc.start()
+        fn(db)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return per_row_us, peak
+    finally:
+        db.close()
+
+
+def main():
+    models.Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(models.Idea),
+            [{"title": f"Idea {n}", "description": DESCRIPTION, "author_email": f"a{n % 50}@example.com", "status": "submitted"} for n in range(ROWS)],
+        )
+    for label, fn in (("before", before), ("after", after(IDEA_FIELDS)), ("after fields", after(("id", "title", "status")))):
+        per_row, peak = measure(fn)
+        print(f"{label:13s} {ROWS} rows: {per_row:7.2f} us/row  peak {peak / 1024:8.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+"""Latency of a plain (threadpool) route while a burst of logins hashes passwords.
+
+"before" verifies bcrypt inside a sync route, i.e. on Starlette's request threadpool; "after" awaits
+app.core.passwords.hasher, the bounded bcrypt pool used by /auth/login. Run from backend/.
+"""
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import httpx  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+
+from app.core.passwords import hash_password, hasher, verify_password  # noqa: E402
+
+LOGINS = 120
+PINGS = 100
+ROUNDS = 12
+
+
+def build(mode: str, stored: str) -> FastAPI:
+    app = FastAPI()
+
+    if mode == "before":
+        @app.post("/login")
+        def login():
+            return {"ok": verify_password("password8", stored)}
+    else:
+        @app.post("/login")
+        async def login():
+            return {"ok": await hasher.verify("password8", stored)}
+
+    @app.get("/ping")
+    def ping():
+        return {"ok": True}
+
+    return app
+
+
+async def run(app: FastAPI) -> list[float]:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        storm = [asyncio.create_task(client.post("/login")) for _ in range(LOGINS)]
+        await asyncio.sleep(0.05)
+        lat = []
+        for _ in range(PINGS):
+            start = time.perf_counter()
+            await client.get("/ping")
+            lat.append((time.perf_counter() - start) * 1000)
+            await asyncio.sleep(0.01)
+        await asyncio.gather(*storm, return_exceptions=True)
+    return lat
+
+
+def main():
+    stored = hash_password("password8", rounds=ROUNDS)
+    hasher.start()
+    try:
+        for mode in ("before", "after"):
+            lat = sorted(asyncio.run(run(build(mode, stored))))
+            p99 = lat[int(len(lat) * 0.99) - 1]
+            print(f"{mode:7s} /ping during {LOGINS} logins: p50 {statistics.median(lat):8.2f} ms  p99 {p99:8.2f} ms")
+    finally:
+        hasher.stop()
+
+
+if __name__ == "__main__":
+    main()
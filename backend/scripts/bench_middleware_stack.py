@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+"""Per-request overhead of the middleware stack on a tiny response (/healthz-like).
+
+"before" re-creates the previous BaseHTTPMiddleware implementations of the security headers and
+rate limiter; "after" uses the pure ASGI ones from app.core. Both stacks include CORSMiddleware
+exactly as app.main configures it.
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from starlette.applications import Starlette  # noqa: E402
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+from starlette.middleware.cors import CORSMiddleware  # noqa: E402
+from starlette.responses import JSONResponse  # noqa: E402
+from starlette.routing import Route  # noqa: E402
+
+from app.core.rate_limit import RateLimitMiddleware  # noqa: E402
+from app.core.security_headers import SecurityHeadersMiddleware  # noqa: E402
+
+N = 20_000
+
+
+class LegacySecurityHeaders(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        response = await call_next(request)
+        response.headers.setdefault("X-Content-Type-Options", "nosniff")
+        response.headers.setdefault("X-Frame-Options", "DENY")
+        response.headers.setdefault("Referrer-Policy", "no-referrer")
+        csp = "default-src 'self'; connect-src 'self' http: https:; img-src 'self' data:; style-src 'self' 'unsafe-inline'; script-src 'self' 'unsafe-inline' 'unsafe-eval'"
+        response.headers.setdefault("Content-Security-Policy", csp)
+        return response
+
+
+class LegacyRateLimit(BaseHTTPMiddleware):
+    def __init__(self, app, limit_per_minute=120):
+        super().__init__(app)
+        self.limit = limit_per_minute
+        self.store = {}
+
+    async def dispatch(self, request, call_next):
+        now = time.time()
+        key = f"{request.client.host}:{request.url.path.split('/')[1]}"
+        hits = [t for t in self.store.get(key, []) if t > now - 60]
+        if len(hits) >= self.limit:
+            return JSONResponse({"detail": "Too Many Requests"}, status_code=429)
+        hits.append(now)
+        self.store[key] = hits
+        return await call_next(request)
+
+
+def healthz(request):
+    return JSONResponse({"status": "ok"})
+
+
+def build(security_cls, rate_cls, **rate_kwargs):
+    app = Starlette(routes=[Route("/healthz", healthz)])
+    app.add_middleware(CORSMiddleware, allow_origins=["http://localhost:5173"], allow_credentials=True, allow_methods=["*"], allow_headers=["*"])
+    if security_cls:
+        app.add_middleware(security_cls)
+    if rate_cls:
+        app.add_middleware(rate_cls, **rate_kwargs)
+    return app
+
+
+async def run(app, n: int) -> float:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": "/healthz", "raw_path": b"/healthz", "root_path": "", "query_string": b"",
+        "headers": [(b"host", b"localhost")], "client": ("127.0.0.1", 1234), "server": ("localhost", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    for _ in range(200):
+        await app(dict(scope), receive, send)
+    start = time.perf_counter()
+    for _ in range(n):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def main():
+    big = 10**9
+    stacks = {
+        "cors only": build(None, None),
+        "before (BaseHTTPMiddleware x2)": build(LegacySecurityHeaders, LegacyRateLimit, limit_per_minute=big),
+        "after (pure ASGI x2)": build(SecurityHeadersMiddleware, RateLimitMiddleware, limit_per_minute=big),
+    }
+    loop = asyncio.new_event_loop()
+    try:
+        results = {name: loop.run_until_complete(run(app, N)) for name, app in stacks.items()}
+    finally:
+        loop.close()
+    base = results["cors only"]
+    for name, us in results.items():
+        print(f"{name:32s} {us:8.2f} us/request  (+{us - base:.2f} us over CORS only)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+"""Per-request overhead of RateLimitMiddleware, measured on raw ASGI calls (no HTTP server)."""
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.rate_limit import RateLimitMiddleware  # noqa: E402
+
+N = 200_000
+
+
+async def bare_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/plain")]})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def send(message):
+    pass
+
+
+def make_scope(ip: str, path: str = "/healthz") -> dict:
+    return {"type": "http", "method": "GET", "path": path, "headers": [], "client": (ip, 1234)}
+
+
+async def run(app, scopes) -> float:
+    start = time.perf_counter()
+    for scope in scopes:
+        await app(scope, receive, send)
+    return (time.perf_counter() - start) / len(scopes) * 1e6
+
+
+def main():
+    # Distinct client IPs so nothing is rejected and the LRU sees churn
+    scopes = [make_scope(f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}") for i in range(N)]
+    limited = RateLimitMiddleware(bare_app, limit_per_minute=120, max_keys=50_000)
+    loop = asyncio.new_event_loop()
+    try:
+        base = loop.run_until_complete(run(bare_app, scopes))
+        with_rl = loop.run_until_complete(run(limited, scopes))
+        hot = [make_scope("10.0.0.1")] * 1000
+        hot_rl = RateLimitMiddleware(bare_app, limit_per_minute=10**9)
+        hot_us = loop.run_until_complete(run(hot_rl, hot * 100))
+    finally:
+        loop.close()
+    print(f"requests:                 {N}")
+    print(f"bare app:                 {base:.2f} us/request")
+    print(f"with rate limit (churn):  {with_rl:.2f} us/request  (+{with_rl - base:.2f} us)")
+    print(f"with rate limit (1 key):  {hot_us:.2f} us/request  (+{hot_us - base:.2f} us)")
+    print(f"keys kept (max 50000):    {len(limited.limiter.store)}")
+
+
+if __name__ == "__main__":
+    main()
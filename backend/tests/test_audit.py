@@ -0,0 +1,274 @@
+import os
+import uuid
+from pathlib import Path
+
+import pytest
+
+from app.db import models
+
+# Read at import, before the client fixture points DATABASE_URL at sqlite
+_PG_URL = os.getenv('DATABASE_URL', '')
+
+
+def _admin(client):
+    tok = client.post('/auth/register', json={'email':'adm@audit','password':'password8'}).json()['access_token']
+    return {'Authorization': f'Bearer {tok}'}
+
+
+def test_buffered_events_visible_to_audit_listing(client):
+    from app.services.audit_sink import sink
+    assert sink.mode == 'buffered'
+    H = _admin(client)
+    idea_id = client.post('/ideas/', headers=H, json={'title':'a','description':'b'}).json()['idea']['id']
+    r = client.get(f'/events?entity=idea&entity_id={idea_id}', headers=H)
+    assert r.status_code == 200
+    assert [e['event'] for e in r.json()] == ['created']
+
+
+def test_buffered_sink_writes_in_bulk(client):
+    from app.crud import events as events_crud
+    from app.db.session import SessionLocal
+    from app.services.audit_sink import sink
+    db = SessionLocal()
+    try:
+        sink.flush()
+        for i in range(10):
+            events_crud.record_event(db, entity='bulk', entity_id=i, event='e', payload={'i': i})
+        assert sink.pending() <= 10
+        assert events_crud.has_event(db, entity='bulk', entity_id=9, event='e')
+        assert sink.pending() == 0
+        assert db.query(models.EventAudit).filter(models.EventAudit.entity == 'bulk').count() == 10
+    finally:
+        db.close()
+
+
+def test_durable_mode_writes_with_session_commit(client, monkeypatch):
+    from app.crud import events as events_crud
+    from app.db.session import SessionLocal
+    from app.services.audit_sink import sink
+    monkeypatch.setattr(sink, 'mode', 'durable')
+    db = SessionLocal()
+    try:
+        events_crud.record_event(db, entity='durable', entity_id=1, event='kept')
+        db.commit()
+        events_crud.record_event(db, entity='durable', entity_id=2, event='dropped')
+        db.rollback()
+        rows = db.query(models.EventAudit).filter(models.EventAudit.entity == 'durable').all()
+        assert [r.event for r in rows] == ['kept']
+    finally:
+        db.close()
+
+
+
+def test_has_event_does_not_commit_the_callers_transaction(client, monkeypatch):
+    from app.crud import events as events_crud
+    from app.db.session import SessionLocal
+    from app.services.audit_sink import sink
+    monkeypatch.setattr(sink, 'mode', 'durable')
+    db = SessionLocal()
+    try:
+        db.add(models.Idea(title='uncommitted', description='d', status='submitted'))
+        events_crud.record_event(db, entity='txn', entity_id=1, event='e', commit=False)
+        assert events_crud.has_event(db, entity='txn', entity_id=1, event='e')
+        db.rollback()
+        assert not events_crud.has_event(db, entity='txn', entity_id=1, event='e')
+        assert db.query(models.Idea).filter(models.Idea.title == 'uncommitted').count() == 0
+    finally:
+        db.close()
+
+
+def test_buffered_writer_counts_dropped_rows(client, caplog):
+    from app.services.audit_sink import AuditSink
+    w = AuditSink()
+    w.max_pending = 3
+    w._running = True  # queue only; no background thread
+    for i in range(5):
+        w.enqueue({'i': i})
+    assert [r['i'] for r in w._buffer] == [2, 3, 4]
+    assert w.dropped == 2
+    assert len([r for r in caplog.records if 'dropping oldest' in r.getMessage()]) == 1
+
+def test_export_streams_csv_and_gzip(client):
+    import gzip
+    H = _admin(client)
+    for t in ('x', 'y'):
+        client.post('/ideas/', headers=H, json={'title':t,'description':'d'})
+    r = client.get('/events/export?entity=idea&order=asc', headers=H)
+    assert r.status_code == 200
+    assert r.headers['content-type'].startswith('text/csv')
+    lines = r.text.strip().splitlines()
+    assert lines[0] == 'id,entity,entity_id,event,created_at,payload'
+    assert len(lines) == 3
+    r = client.get('/events/export?entity=idea&order=asc&gzip=true', headers=H)
+    assert r.status_code == 200
+    assert gzip.decompress(r.content).decode().strip().splitlines() == lines
+
+
+def test_events_keyset_pagination(client):
+    from app.crud import events as events_crud
+    from app.db.session import SessionLocal
+    H = _admin(client)
+    db = SessionLocal()
+    try:
+        for i in range(7):
+            events_crud.record_event(db, entity='page', entity_id=i, event='e')
+    finally:
+        db.close()
+    seen = []
+    cursor = None
+    for _ in range(5):
+        url = '/events?entity=page&limit=3' + (f'&cursor={cursor}' if cursor else '')
+        r = client.get(url, headers=H)
+        assert r.status_code == 200
+        seen.extend(e['entity_id'] for e in r.json())
+        cursor = r.headers.get('x-next-cursor')
+        if not cursor:
+            break
+    assert sorted(seen) == list(range(7))
+    assert len(seen) == 7
+    assert client.get('/events?cursor=garbage', headers=H).status_code == 400
+
+
+def test_partition_maintenance_is_noop_without_partitioning(client):
+    from datetime import date
+    from app.db.session import engine
+    from app.services import audit_partitions
+    assert audit_partitions.month_of('events_audit_y2024m02') == date(2024, 2, 1)
+    assert audit_partitions.month_of('events_audit_default') is None
+    assert audit_partitions._add_months(date(2024, 11, 1), 3) == date(2025, 2, 1)
+    assert audit_partitions.maintenance_pass(engine) == {'created': [], 'detached': []}
+
+
+def test_archive_moves_old_months_and_listing_reads_them(client, tmp_path, monkeypatch):
+    import gzip
+    from datetime import datetime
+    from app.crud import events as events_crud
+    from app.db.session import SessionLocal
+    from app.services import audit_archive
+    monkeypatch.setenv('AUDIT_ARCHIVE_DIR', str(tmp_path))
+    H = _admin(client)
+    db = SessionLocal()
+    try:
+        for i in range(4):
+            events_crud.record_event(db, entity='arch', entity_id=i, event='e')
+        events_crud.flush_pending(db)
+        old = db.query(models.EventAudit).filter(models.EventAudit.entity == 'arch', models.EventAudit.entity_id < 3).all()
+        for row, month in zip(old, (1, 1, 2)):
+            row.created_at = datetime(2020, month, 15)
+        db.commit()
+    finally:
+        db.close()
+
+    r = client.post('/events/archive?before=2021-01-01', headers=H)
+    assert r.status_code == 200
+    assert r.json()['archived'] == {'2020-01': 2, '2020-02': 1}
+    manifest = audit_archive.load_manifest(str(tmp_path))
+    assert [f['file'] for f in manifest['files']] == ['events_2020-01.ndjson.gz', 'events_2020-02.ndjson.gz']
+    db = SessionLocal()
+    try:
+        assert db.query(models.EventAudit).filter(models.EventAudit.entity == 'arch').count() == 1
+    finally:
+        db.close()
+
+    # Pages walk the hot row first, then the archived months newest-first
+    seen, cursor = [], None
+    while True:
+        r = client.get('/events?entity=arch&limit=2' + (f'&cursor={cursor}' if cursor else ''), headers=H)
+        seen.extend(e['entity_id'] for e in r.json())
+        cursor = r.headers.get('x-next-cursor')
+        if not cursor:
+            break
+    assert seen == [3, 2, 1, 0]
+    r = client.get('/events?entity=arch&limit=2&offset=2', headers=H)
+    assert [e['entity_id'] for e in r.json()] == [1, 0]
+    r = client.get('/events?entity=arch&date_to=2020-01-31T00:00:00', headers=H)
+    assert [e['entity_id'] for e in r.json()] == [1, 0]
+
+    r = client.get('/events/export?entity=arch&order=asc&gzip=true', headers=H)
+    lines = gzip.decompress(r.content).decode().strip().splitlines()
+    assert [ln.split(',')[2] for ln in lines[1:]] == ['0', '1', '2', '3']
+
+
+
+def test_archive_is_written_in_seekable_chunks_and_merges_reruns(client, tmp_path, monkeypatch):
+    import gzip
+    from datetime import date, datetime
+    from app.db.session import engine
+    from app.services import audit_archive
+    monkeypatch.setattr(audit_archive, 'CHUNK_ROWS', 2)
+
+    def add(ids):
+        with engine.begin() as conn:
+            conn.execute(
+                models.EventAudit.__table__.insert(),
+                [{'id': i, 'entity': 'chunk', 'entity_id': i, 'event': 'e', 'created_at': datetime(2020, 3, 1 + i)} for i in ids],
+            )
+
+    add(range(1, 6))
+    assert audit_archive.archive_month(engine, date(2020, 3, 1), str(tmp_path)) == 5
+    meta = audit_archive.load_manifest(str(tmp_path))['files'][0]
+    assert [c['rows'] for c in meta['chunks']] == [2, 2, 1]
+    path = tmp_path / meta['file']
+    # Concatenated gzip members: still one ordinary .gz file
+    with gzip.open(path, 'rt') as fh:
+        assert len(fh.read().splitlines()) == 5
+
+    def ids(**f):
+        return [r['id'] for r in audit_archive.scan(f, str(tmp_path))]
+
+    assert ids(order='asc') == [1, 2, 3, 4, 5]
+    assert ids(order='desc') == [5, 4, 3, 2, 1]
+    assert ids(order='desc', after=(datetime(2020, 3, 5), 4)) == [3, 2, 1]
+    assert ids(order='asc', after=(datetime(2020, 3, 4), 3)) == [4, 5]
+
+    # A rerun merges late rows into the month; a row left behind by an interrupted run (3) is kept once
+    add([3, 6])
+    assert audit_archive.archive_month(engine, date(2020, 3, 1), str(tmp_path)) == 6
+    assert ids(order='asc') == [1, 2, 3, 4, 5, 6]
+
+
+@pytest.mark.skipif(not _PG_URL.startswith('postgresql'), reason='Requires Postgres')
+def test_detach_expired_with_default_partition_pg():
+    from datetime import date
+    from sqlalchemy import create_engine, text
+    from app.services import audit_partitions
+    schema = f'audit_detach_{uuid.uuid4().hex[:8]}'
+    admin = create_engine(_PG_URL)
+    with admin.begin() as conn:
+        conn.exec_driver_sql(f'CREATE SCHEMA {schema}')
+    engine = create_engine(_PG_URL, connect_args={'options': f'-c search_path={schema}'})
+    try:
+        with engine.begin() as conn:
+            conn.exec_driver_sql(
+                'CREATE TABLE events_audit (id SERIAL PRIMARY KEY, entity VARCHAR(50) NOT NULL, entity_id INT NOT NULL, '
+                'event VARCHAR(100) NOT NULL, payload JSONB, created_at TIMESTAMP NOT NULL DEFAULT NOW())'
+            )
+        # The migration has '%' in format() strings, so bypass driver parameter handling
+        raw = engine.raw_connection()
+        try:
+            raw.cursor().execute((Path(__file__).resolve().parents[1] / 'migrations' / '003_events_audit_partitioning.sql').read_text())
+            raw.commit()
+        finally:
+            raw.close()
+        assert audit_partitions.is_partitioned(engine)
+        audit_partitions.ensure_partitions(engine, months_ahead=3, today=date(2024, 1, 1))
+        with engine.begin() as conn:
+            conn.execute(text("INSERT INTO events_audit (entity, entity_id, event, created_at) VALUES ('idea', 1, 'created', '2024-01-15')"))
+
+        detached = audit_partitions.detach_expired(engine, retention_months=2, today=date(2024, 4, 10))
+        assert detached == ['events_audit_y2024m01']
+        names = [name for name, _ in audit_partitions.list_partitions(engine)]
+        assert 'events_audit_y2024m01' not in names
+        assert {'events_audit_y2024m02', 'events_audit_y2024m03', 'events_audit_y2024m04'} <= set(names)
+        with engine.connect() as conn:
+            parts = conn.execute(
+                text("SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid WHERE i.inhparent = to_regclass('events_audit')")
+            ).scalars().all()
+            assert 'events_audit_default' in parts
+            # Detached, not dropped: the month is still there for the archiver
+            assert conn.execute(text('SELECT count(*) FROM events_audit_y2024m01')).scalar() == 1
+    finally:
+        engine.dispose()
+        with admin.begin() as conn:
+            conn.exec_driver_sql(f'DROP SCHEMA {schema} CASCADE')
+        admin.dispose()
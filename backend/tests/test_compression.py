@@ -0,0 +1,88 @@
+import gzip
+import json
+import zlib
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.core.compression import CompressionMiddleware, negotiate
+from app.core.rate_limit import parse_route_map
+
+BIG = [{'id': n, 'title': f'Idea {n}', 'description': 'compressible ' * 20} for n in range(50)]
+
+
+def _app(**kw):
+    async def ndjson(request):
+        def rows():
+            for row in BIG[:3]:
+                yield (json.dumps(row) + '\n').encode()
+        return StreamingResponse(rows(), media_type='application/x-ndjson')
+
+    routes = [
+        Route('/ideas', lambda r: JSONResponse(BIG)),
+        Route('/small', lambda r: JSONResponse({'ok': True})),
+        Route('/export/raw', lambda r: Response(gzip.compress(b'x' * 5000), media_type='application/x-ndjson', headers={'Content-Encoding': 'gzip'})),
+        Route('/png', lambda r: Response(b'\x89PNG' + b'0' * 5000, media_type='image/png')),
+        Route('/stream', ndjson),
+    ]
+    app = Starlette(routes=routes)
+    app.add_middleware(CompressionMiddleware, **kw)
+    return TestClient(app)
+
+
+def test_negotiate_honours_q_values_and_brotli_availability():
+    assert negotiate('gzip, deflate', brotli_available=False) == 'gzip'
+    assert negotiate('gzip, br', brotli_available=True) == 'br'
+    assert negotiate('gzip, br', brotli_available=False) == 'gzip'
+    assert negotiate('br;q=0.5, gzip;q=0.8', brotli_available=True) == 'gzip'
+    assert negotiate('gzip;q=0, identity', brotli_available=True) is None
+    assert negotiate('*', brotli_available=False) == 'gzip'
+
+
+def test_compresses_large_json_and_skips_small_or_encoded():
+    client = _app(min_size=500)
+    with client.stream('GET', '/ideas', headers={'Accept-Encoding': 'gzip'}) as r:
+        raw = b''.join(r.iter_raw())
+        assert r.headers['content-encoding'] == 'gzip' and 'accept-encoding' in r.headers['vary'].lower()
+        assert int(r.headers['content-length']) == len(raw)
+    assert json.loads(gzip.decompress(raw)) == BIG
+    assert len(raw) < len(json.dumps(BIG)) / 5
+
+    assert 'content-encoding' not in client.get('/ideas', headers={'Accept-Encoding': 'identity'}).headers
+    assert 'content-encoding' not in client.get('/small', headers={'Accept-Encoding': 'gzip'}).headers
+    assert 'content-encoding' not in client.get('/png', headers={'Accept-Encoding': 'gzip'}).headers
+    with client.stream('GET', '/export/raw', headers={'Accept-Encoding': 'gzip'}) as r:
+        assert gzip.decompress(b''.join(r.iter_raw())) == b'x' * 5000
+
+
+def test_streams_with_a_flush_per_chunk():
+    import asyncio
+    app = _app(min_size=10_000).app
+    sent = []
+
+    async def receive():
+        # Nothing to read and no disconnect: block until the response is done and cancels us
+        await asyncio.Event().wait()
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {'type': 'http', 'method': 'GET', 'path': '/stream', 'raw_path': b'/stream', 'query_string': b'', 'root_path': '',
+             'headers': [(b'accept-encoding', b'gzip')], 'scheme': 'http', 'server': ('t', 80), 'client': ('c', 1), 'http_version': '1.1'}
+    asyncio.run(app(scope, receive, send))
+    headers = dict(sent[0]['headers'])
+    assert headers[b'content-encoding'] == b'gzip' and b'content-length' not in headers
+    bodies = [m['body'] for m in sent[1:]]
+    # Each yielded line is decodable as soon as its chunk arrives
+    d = zlib.decompressobj(31)
+    lines = [d.decompress(b) for b in bodies[:3]]
+    assert [json.loads(ln) for ln in lines] == BIG[:3]
+    assert d.decompress(bodies[-1]) == b'' and d.eof
+
+
+def test_per_route_level_zero_disables():
+    client = _app(min_size=10, gzip_routes=parse_route_map('ideas=0,stream=1'))
+    assert 'content-encoding' not in client.get('/ideas', headers={'Accept-Encoding': 'gzip'}).headers
+    assert client.get('/stream', headers={'Accept-Encoding': 'gzip'}).headers['content-encoding'] == 'gzip'
@@ -0,0 +1,147 @@
+def test_list_ideas_keyset_pages_and_filters(client):
+    adm = client.post('/auth/register', json={'email':'pager@x','password':'password8'}).json()['access_token']
+    HA = {'Authorization': f'Bearer {adm}'}
+    ids = [client.post('/ideas/', headers=HA, json={'title':f'p{n}','description':'d'}).json()['idea']['id'] for n in range(7)]
+    client.post('/reviews/request', headers=HA, json={'idea_id': ids[0], 'stage': 'analyst'})
+
+    seen, cursor = [], None
+    while True:
+        r = client.get('/ideas/', params={'limit': 3, **({'cursor': cursor} if cursor else {})})
+        assert r.status_code == 200
+        seen.extend(i['id'] for i in r.json())
+        cursor = r.headers.get('x-next-cursor')
+        if not cursor:
+            break
+    assert seen == sorted(ids, reverse=True)
+
+    r = client.get('/ideas/', params={'order': 'asc', 'limit': 2})
+    assert [i['id'] for i in r.json()] == ids[:2]
+
+    r = client.get('/ideas/', params={'status': 'analyst_pending'})
+    assert [i['id'] for i in r.json()] == [ids[0]]
+    assert 'x-next-cursor' not in r.headers
+    assert len(client.get('/ideas/', params={'author': 'nobody@x'}).json()) == 0
+    assert client.get('/ideas/', params={'date_from': '2999-01-01T00:00:00'}).json() == []
+
+    assert client.get('/ideas/', params={'cursor': 'not-a-cursor'}).status_code == 400
+
+
+def test_list_ideas_page_size_is_capped(client, monkeypatch):
+    from app.api import ideas as ideas_api
+    monkeypatch.setattr(ideas_api, 'MAX_PAGE_SIZE', 2)
+    adm = client.post('/auth/register', json={'email':'cap@x','password':'password8'}).json()['access_token']
+    HA = {'Authorization': f'Bearer {adm}'}
+    for n in range(3):
+        client.post('/ideas/', headers=HA, json={'title':f'c{n}','description':'d'})
+    r = client.get('/ideas/', params={'limit': 1000})
+    assert len(r.json()) == 2 and r.headers['x-next-cursor']
+
+
+def test_list_endpoints_sparse_fieldsets(client):
+    adm = client.post('/auth/register', json={'email':'fields@x','password':'password8'}).json()['access_token']
+    HA = {'Authorization': f'Bearer {adm}'}
+    ids = [client.post('/ideas/', headers=HA, json={'title':f'f{n}','description':'long text'}).json()['idea']['id'] for n in range(3)]
+    client.post('/reviews/request', headers=HA, json={'idea_id': ids[0], 'stage': 'analyst'})
+
+    full = client.get('/ideas/', headers=HA).json()
+    assert set(full[0]) == {'id', 'title', 'description', 'author_email', 'status', 'created_at'}
+    assert full[0]['created_at'].startswith('20')
+
+    r = client.get('/ideas/', headers=HA, params={'fields': 'id,title', 'limit': 2})
+    assert r.status_code == 200 and r.headers['content-type'] == 'application/json'
+    assert r.headers['etag'] and r.headers['x-next-cursor']
+    assert r.json() == [{'id': ids[2], 'title': 'f2'}, {'id': ids[1], 'title': 'f1'}]
+    rest = client.get('/ideas/', headers=HA, params={'fields': 'id', 'limit': 2, 'cursor': r.headers['x-next-cursor']}).json()
+    assert rest == [{'id': ids[0]}]
+
+    mine = client.get('/ideas/mine', headers=HA, params={'fields': 'title'}).json()
+    assert sorted(i['title'] for i in mine) == ['f0', 'f1', 'f2'] and all(set(i) == {'title'} for i in mine)
+    assert client.get('/ideas/', params={'fields': 'id,password'}).status_code == 400
+
+    pend = client.get('/reviews/pending', params={'stage': 'analyst'}).json()
+    assert set(pend[0]) == {'id', 'idea_id', 'stage', 'created_at'}
+    assert client.get('/reviews/pending', params={'stage': 'analyst', 'fields': 'idea_id,decision'}).json() == [{'idea_id': ids[0], 'decision': None}]
+
+
+def test_title_key_backfill_for_rows_without_it(client):
+    from sqlalchemy import insert, select
+    from app.crud import ideas as ideas_crud
+    from app.db import models
+    from app.db import session as db_session
+
+    t = models.Idea.__table__
+    with db_session.engine.begin() as conn:
+        # As left by migrations/011 on existing rows
+        conn.execute(insert(t), [{'title': f'Old\u00a0Идея {n}', 'description': 'd', 'status': 'submitted'} for n in range(5)])
+    # The startup maintenance pass may be filling the same rows concurrently
+    assert ideas_crud.backfill_title_keys(db_session.engine, batch=2) <= 5
+    assert ideas_crud.backfill_title_keys(db_session.engine) == 0
+    with db_session.engine.connect() as conn:
+        assert sorted(conn.execute(select(t.c.title_key)).scalars()) == [f'oldидея{n}' for n in range(5)]
+
+
+def test_bulk_import_streams_progress_and_dedups(client, monkeypatch):
+    import json
+    monkeypatch.setenv('IDEA_IMPORT_BATCH_SIZE', '2')
+    adm = client.post('/auth/register', json={'email':'importer@x','password':'password8'}).json()['access_token']
+    HA = {'Authorization': f'Bearer {adm}'}
+    client.post('/ideas/', headers=HA, json={'title':'Existing idea','description':'Already here'})
+    etag = client.get('/ideas/').headers['etag']
+
+    lines = [
+        {'title': 'Legacy 1', 'description': 'one', 'author_email': 'old@x', 'created_at': '2020-01-02T03:04:05'},
+        {'title': 'Legacy 2', 'description': 'two'},
+        {'title': '  legacy 1 ', 'description': 'ONE'},
+        {'title': 'existing IDEA', 'description': 'already  here'},
+        {'title': 'No description'},
+        {'title': 'Legacy 3', 'description': 'three'},
+    ]
+    body = '\n'.join(json.dumps(x) for x in lines) + '\nnot json\n'
+    r = client.post('/ideas/import', headers={**HA, 'Content-Type': 'application/x-ndjson'}, content=body.encode())
+    assert r.status_code == 200 and r.headers['content-type'].startswith('application/x-ndjson')
+    frames = [json.loads(ln) for ln in r.text.splitlines()]
+    assert [f['event'] for f in frames][-1] == 'done'
+    assert any(f['event'] == 'progress' for f in frames[:-1])
+    assert frames[-1] == {'event': 'done', 'received': 7, 'imported': 3, 'duplicates': 2, 'possible_duplicates': 0, 'errors': 2}
+    reasons = sorted(d['reason'] for f in frames[:-1] for d in f['batch']['duplicates'])
+    assert reasons == ['already exists', 'repeated in import']
+    assert sorted(e['line'] for f in frames[:-1] for e in f['batch']['errors']) == [5, 7]
+
+    ideas = client.get('/ideas/', headers={'If-None-Match': etag})
+    assert ideas.status_code == 200
+    by_title = {i['title']: i for i in ideas.json()}
+    assert set(by_title) == {'Existing idea', 'Legacy 1', 'Legacy 2', 'Legacy 3'}
+    assert by_title['Legacy 1']['created_at'].startswith('2020-01-02T03:04:05') and by_title['Legacy 1']['author_email'] == 'old@x'
+    counts = {c['status']: c['count'] for c in client.get('/projects/overview', headers=HA).json()['status_counts']}
+    assert counts == {'submitted': 4}
+
+    csv_body = '﻿title,description\r\nCSV idea,"multi\r\nline, quoted"\r\nLegacy 2,two\r\n'.encode()
+    r = client.post('/ideas/import?format=csv', headers=HA, content=csv_body)
+    done = json.loads(r.text.splitlines()[-1])
+    assert done['imported'] == 1 and done['duplicates'] == 1 and done['errors'] == 0
+    assert any(i['description'] == 'multi\r\nline, quoted' or i['description'] == 'multi\nline, quoted' for i in client.get('/ideas/').json())
+
+    # Whitespace inside the title is normalised the same way on both sides of the existing-idea check
+    client.post('/ideas/', headers=HA, json={'title':'Spaced  out   title','description':'d'})
+    body = json.dumps({'title': 'spaced out title', 'description': 'd'}) + '\n' + json.dumps({'title': 'Legacy\t2', 'description': 'two'}) + '\n'
+    r = client.post('/ideas/import', headers={**HA, 'Content-Type': 'application/x-ndjson'}, content=body.encode())
+    done = json.loads(r.text.splitlines()[-1])
+    assert done['imported'] == 0 and done['duplicates'] == 2
+    # ... including non-ASCII case and whitespace (NBSP, U+2003), which SQL lower()/replace() would miss
+    client.post('/ideas/', headers=HA, json={'title':'Legacy\u00a0idea','description':'nb'})
+    client.post('/ideas/', headers=HA, json={'title':'Идея','description':'ru'})
+    body = ''.join(json.dumps(rec) + '\n' for rec in (
+        {'title': 'Legacy\u00a0idea', 'description': 'nb'},
+        {'title': 'legacy\u2003idea', 'description': 'nb'},
+        {'title': 'ИДЕЯ', 'description': 'ru'},
+    ))
+    r = client.post('/ideas/import', headers={**HA, 'Content-Type': 'application/x-ndjson'}, content=body.encode())
+    done = json.loads(r.text.splitlines()[-1])
+    assert done['imported'] == 0 and done['duplicates'] == 3
+
+    bad = client.post('/ideas/import', headers={**HA, 'Content-Type': 'text/csv'}, content=b'name,text\nx,y\n')
+    assert [json.loads(ln) for ln in bad.text.splitlines()] == [{'event': 'error', 'detail': 'CSV header must include title and description'}]
+    assert client.post('/ideas/import', headers={**HA, 'Content-Type': 'text/plain'}, content=b'x').status_code == 415
+
+    dev = client.post('/auth/register', json={'email':'dev-import@x','password':'password8'}).json()['access_token']
+    assert client.post('/ideas/import', headers={'Authorization': f'Bearer {dev}', 'Content-Type': 'text/csv'}, content=b'').status_code == 403
@@ -0,0 +1,147 @@
+def _count_queries(engine):
+    from sqlalchemy import event
+    seen = []
+
+    def listener(conn, cursor, statement, *a):
+        # Buffered writers (audit sink) flush from their own thread; only count request reads
+        if statement.lstrip().upper().startswith('SELECT'):
+            seen.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', listener)
+    return seen, lambda: event.remove(engine, 'before_cursor_execute', listener)
+
+
+def test_overview_cached_until_data_version_changes(client):
+    from app.db import session as db_session
+
+    adm = client.post('/auth/register', json={'email':'boss@x','password':'password8'}).json()['access_token']
+    HA = {'Authorization': f'Bearer {adm}'}
+    idea_id = client.post('/ideas/', headers=HA, json={'title':'First','description':'d'}).json()['idea']['id']
+    client.post('/reviews/request', headers=HA, json={'idea_id': idea_id, 'stage': 'analyst'})
+
+    seen, stop = _count_queries(db_session.engine)
+    try:
+        body = client.get('/projects/overview', headers=HA).json()
+    finally:
+        stop()
+    assert body['role'] == 'admin'
+    assert [p['id'] for p in body['my_projects']] == [idea_id]
+    assert body['company_projects'][0]['owner_email'] == 'boss@x'
+    assert body['analyst_queue'][0]['idea_title'] == 'First'
+    assert len(seen) <= 6
+
+    seen, stop = _count_queries(db_session.engine)
+    try:
+        assert client.get('/projects/overview', headers=HA).json() == body
+    finally:
+        stop()
+    # Only the ETag's data_versions read; the overview itself comes from memory
+    assert len(seen) == 1 and 'data_versions' in seen[0]
+
+    # An idea write bumps the data version, so the next overview is rebuilt
+    client.post('/ideas/', headers=HA, json={'title':'Second','description':'d'})
+    body = client.get('/projects/overview', headers=HA).json()
+    assert [p['title'] for p in body['my_projects']] == ['Second', 'First']
+    assert sum(c['count'] for c in body['status_counts']) == 2
+
+    # A write committed by another worker never touches this process's counter, only data_versions
+    from sqlalchemy import insert
+    from app.db import models
+    from app.services import data_version
+    with db_session.engine.begin() as conn:
+        conn.execute(insert(models.Idea).values(title='Elsewhere', description='d', status='submitted'))
+        data_version.bump_tables(conn, ['ideas'])
+    body = client.get('/projects/overview', headers=HA).json()
+    assert body['company_projects'][0]['title'] == 'Elsewhere'
+
+
+def test_data_versions_row_locked_only_at_commit(client):
+    from sqlalchemy import event
+    from app.crud import ideas as ideas_crud
+    from app.db import session as db_session
+    from app.services import data_version
+
+    db = db_session.SessionLocal()
+    try:
+        before = data_version.read(db, ['ideas'])['ideas']
+        db.rollback()
+        ideas_crud.create_idea(db, title='Slow', description='d', commit=False)
+        conn = db.connection()
+        writes = []
+
+        def listener(c, cursor, statement, *a):
+            if c is conn and 'data_versions' in statement:
+                writes.append(statement)
+
+        event.listen(db_session.engine, 'before_cursor_execute', listener)
+        try:
+            # The rest of a long transaction (embeddings, audit, ...) runs without the row lock
+            with db.begin_nested():
+                ideas_crud.bulk_create_ideas(db, [{'title': 'Bulk', 'description': 'd'}])
+            assert writes == []
+            db.commit()
+        finally:
+            event.remove(db_session.engine, 'before_cursor_execute', listener)
+        assert len(writes) == 1 and writes[0].lstrip().upper().startswith('UPDATE')
+        assert data_version.read(db, ['ideas'])['ideas'] == before + 1
+    finally:
+        db.close()
+
+
+def test_idea_status_counts_maintained_and_reconciled(client):
+    from sqlalchemy import update
+    from app.crud import idea_counts
+    from app.db import models
+    from app.db import session as db_session
+
+    adm = client.post('/auth/register', json={'email':'cnt@x','password':'password8'}).json()['access_token']
+    HA = {'Authorization': f'Bearer {adm}'}
+    ids = [client.post('/ideas/', headers=HA, json={'title':f'i{n}','description':'d'}).json()['idea']['id'] for n in range(3)]
+    client.post('/reviews/request', headers=HA, json={'idea_id': ids[0], 'stage': 'analyst'})
+
+    db = db_session.SessionLocal()
+    try:
+        assert dict(idea_counts.status_counts(db)) == {'submitted': 2, 'analyst_pending': 1}
+        # Simulate drift, e.g. a manual write that bypassed crud
+        db.execute(update(models.Idea).where(models.Idea.id == ids[1]).values(status='approved'))
+        db.commit()
+    finally:
+        db.close()
+
+    etag = client.get('/projects/overview', headers=HA).headers['etag']
+    assert idea_counts.reconcile_pass(db_session.engine) == {'submitted': -1, 'approved': 1}
+    with db_session.engine.begin() as conn:
+        assert idea_counts.reconcile(conn) == {}
+    # The correction bumped the ideas data version: a cached copy (ETag or in-memory) is not reused
+    r = client.get('/projects/overview', headers={**HA, 'If-None-Match': etag})
+    assert r.status_code == 200
+    counts = {c['status']: c['count'] for c in r.json()['status_counts']}
+    assert counts == {'submitted': 1, 'analyst_pending': 1, 'approved': 1}
+
+
+def test_conditional_get_returns_304_until_data_changes(client):
+    from app.db import session as db_session
+
+    adm = client.post('/auth/register', json={'email':'etag@x','password':'password8'}).json()['access_token']
+    HA = {'Authorization': f'Bearer {adm}'}
+    client.post('/ideas/', headers=HA, json={'title':'Tagged','description':'d'})
+
+    for url in ('/ideas/', '/ideas/mine', '/reviews/pending?stage=analyst', '/assignments/pending', '/projects/overview'):
+        r = client.get(url, headers=HA)
+        assert r.status_code == 200
+        etag = r.headers['etag']
+        assert etag.startswith('W/"')
+        seen, stop = _count_queries(db_session.engine)
+        try:
+            r = client.get(url, headers={**HA, 'If-None-Match': etag})
+        finally:
+            stop()
+        assert r.status_code == 304 and r.content == b''
+        assert r.headers['etag'] == etag
+        assert len(seen) == 1 and 'data_versions' in seen[0]
+
+    etag = client.get('/ideas/', headers=HA).headers['etag']
+    assert client.get('/reviews/pending?stage=finance', headers={**HA, 'If-None-Match': etag}).status_code == 200
+    client.post('/ideas/', headers=HA, json={'title':'Another','description':'d'})
+    r = client.get('/ideas/', headers={**HA, 'If-None-Match': etag})
+    assert r.status_code == 200 and len(r.json()) == 2
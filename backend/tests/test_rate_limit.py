@@ -0,0 +1,151 @@
+import os
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.core.rate_limit import GCRALimiter, RateLimitMiddleware, parse_route_map
+
+
+def test_gcra_allows_limit_then_rejects_until_drained():
+    rl = GCRALimiter(window=60)
+    assert all(rl.hit('k', 3, now=100.0) == 0 for _ in range(3))
+    retry = rl.hit('k', 3, now=100.0)
+    assert 19 < retry <= 20
+    assert rl.hit('k', 3, now=120.0) == 0
+
+
+def test_gcra_cost_and_lru_bound():
+    rl = GCRALimiter(window=60, max_keys=2)
+    assert rl.hit('a', 10, cost=10, now=0.0) == 0
+    assert rl.hit('a', 10, now=0.0) > 0
+    for key in ('b', 'c', 'd'):
+        rl.hit(key, 10, now=0.0)
+    assert len(rl.store) == 2
+    assert 'a' not in rl.store
+
+
+def test_middleware_per_route_limits():
+    app = Starlette(routes=[Route('/voice/x', lambda r: PlainTextResponse('ok')), Route('/ideas', lambda r: PlainTextResponse('ok'))])
+    app.add_middleware(RateLimitMiddleware, limit_per_minute=100, route_limits=parse_route_map('voice=2'))
+    client = TestClient(app)
+    assert [client.get('/voice/x').status_code for _ in range(3)] == [200, 200, 429]
+    assert client.get('/voice/x', headers={'X-Forwarded-For': '1.2.3.4'}).status_code == 200
+    assert client.get('/ideas').status_code == 200
+    r = client.get('/voice/x')
+    assert r.status_code == 429 and int(r.headers['retry-after']) >= 1
+
+
+def test_parse_route_map():
+    assert parse_route_map(' voice=60, /auth=5,bad,x=y') == {'voice': 60, 'auth': 5}
+
+
+def test_shared_memory_backend_is_shared_between_workers(tmp_path):
+    from app.core.limiter import SharedMemoryLimiter
+    path = str(tmp_path / 'rl')
+    w1 = SharedMemoryLimiter(path=path, slots=64)
+    w2 = SharedMemoryLimiter(path=path, slots=64)
+    assert w1.hit('ip:voice', 4, now=1000.0) == 0
+    assert w2.hit('ip:voice', 4, now=1000.0) == 0
+    assert w1.hit('ip:voice', 4, cost=2, now=1000.0) == 0
+    assert w2.hit('ip:voice', 4, now=1000.0) > 0
+    assert w2.hit('ip:other', 4, now=1000.0) == 0
+
+
+def test_shared_memory_backend_evicts_when_probes_full(tmp_path):
+    from app.core.limiter import SharedMemoryLimiter
+    rl = SharedMemoryLimiter(path=str(tmp_path / 'rl'), slots=4)
+    for i in range(50):
+        assert rl.hit(f'k{i}', 10, now=0.0) == 0
+
+
+def test_shared_memory_backend_finds_key_past_a_drained_slot(tmp_path):
+    from app.core.limiter import SharedMemoryLimiter
+    rl = SharedMemoryLimiter(path=str(tmp_path / 'rl'), slots=4)
+    # Two keys starting their probe chain at the same slot
+    first = 'a0'
+    start = rl._hash(first) % 4
+    other = next(f'b{i}' for i in range(1000) if rl._hash(f'b{i}') % 4 == start)
+    assert rl.hit(first, 1000, window=10, now=0.0) == 0       # takes the chain's first slot, drains almost at once
+    assert rl.hit(other, 2, window=10, now=0.0) == 0           # next slot along the chain
+    assert rl.hit(other, 2, window=10, now=0.0) == 0           # budget used: TAT = 10
+    # At t=7 the first slot is drained; `other` must still find its own TAT, so exactly one more hit fits
+    assert [rl.hit(other, 2, window=10, now=7.0) == 0 for _ in range(3)] == [True, False, False]
+
+
+@pytest.mark.skipif(not os.getenv('RATE_LIMIT_REDIS_URL'), reason='Requires Redis (RATE_LIMIT_REDIS_URL)')
+def test_redis_backend_shared_between_clients():
+    import uuid
+    from app.core.limiter import RedisLimiter
+    url = os.environ['RATE_LIMIT_REDIS_URL']
+    key = f'test:{uuid.uuid4().hex}'
+    a, b = RedisLimiter(url), RedisLimiter(url)
+    assert a.hit(key, 2) == 0
+    assert b.hit(key, 2) == 0
+    assert a.hit(key, 2) > 0
+
+
+def test_redis_backend_fails_open_when_unreachable():
+    from app.core.limiter import RedisLimiter
+    assert RedisLimiter('redis://127.0.0.1:1/0').hit('k', 1) == 0
+    assert RedisLimiter('redis://127.0.0.1:1/0').hit('k', 1) == 0
+
+
+def test_redis_backend_breaker_skips_redis_while_open():
+    from app.core.limiter import RedisLimiter
+    rl = RedisLimiter('redis://127.0.0.1:1/0', backoff=60.0)
+    attempts = []
+    real_connect = rl._connect
+
+    def connect():
+        attempts.append(1)
+        real_connect()
+
+    rl._connect = connect
+    assert rl.hit('k', 1) == 0
+    assert len(attempts) == 2                 # first check: connect + one retry
+    assert [rl.hit('k', 1) for _ in range(5)] == [0] * 5
+    assert len(attempts) == 2                 # breaker open: no more timeouts paid
+    rl._open_until = 0.0                      # cooled down: one probe, fails, backoff doubles
+    assert rl.hit('k', 1) == 0
+    assert len(attempts) == 4 and rl._failures == 2
+
+
+def test_middleware_runs_blocking_backend_off_the_event_loop():
+    import threading
+    from starlette.applications import Starlette
+    from starlette.responses import PlainTextResponse
+    from starlette.routing import Route
+    from starlette.testclient import TestClient
+    from app.core.limiter import GCRALimiter
+    from app.core.rate_limit import RateLimitMiddleware
+
+    class Blocking(GCRALimiter):
+        blocking = True
+
+        def hit(self, *args, **kwargs):
+            threads.append(threading.get_ident())
+            return super().hit(*args, **kwargs)
+
+    threads, loop_threads = [], []
+
+    async def home(request):
+        loop_threads.append(threading.get_ident())
+        return PlainTextResponse('ok')
+
+    app = Starlette(routes=[Route('/x', home)])
+    app.add_middleware(RateLimitMiddleware, limit_per_minute=1, backend=Blocking(window=60))
+    with TestClient(app) as c:
+        assert c.get('/x').status_code == 200
+        assert c.get('/x').status_code == 429
+    assert len(threads) == 2 and loop_threads[0] not in threads
+
+
+def test_make_backend_selection(tmp_path, monkeypatch):
+    from app.core.limiter import GCRALimiter, RedisLimiter, SharedMemoryLimiter, make_backend
+    monkeypatch.setenv('RATE_LIMIT_SHM_PATH', str(tmp_path / 'rl'))
+    assert isinstance(make_backend('memory'), GCRALimiter)
+    assert isinstance(make_backend('shm'), SharedMemoryLimiter)
+    assert isinstance(make_backend('redis'), RedisLimiter)
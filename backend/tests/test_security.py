@@ -34,3 +34,118 @@ def test_rbac_analyst_only_decision(client):
     r = client.post('/reviews/analyst/decision', headers=HD, json={'idea_id':idea_id,'decision':'approved'})
     assert r.status_code == 403
 
+
+
+def test_security_headers_present(client):
+    r = client.get('/healthz')
+    assert r.headers['x-content-type-options'] == 'nosniff'
+    assert r.headers['x-frame-options'] == 'DENY'
+    assert r.headers['referrer-policy'] == 'no-referrer'
+    assert r.headers['content-security-policy'].startswith("default-src 'self'")
+
+
+def test_security_headers_do_not_override_endpoint():
+    from starlette.applications import Starlette
+    from starlette.responses import PlainTextResponse
+    from starlette.routing import Route
+    from starlette.testclient import TestClient
+    from app.core.security_headers import SecurityHeadersMiddleware
+    app = Starlette(routes=[Route('/', lambda r: PlainTextResponse('ok', headers={'X-Frame-Options': 'SAMEORIGIN'}))])
+    app.add_middleware(SecurityHeadersMiddleware)
+    r = TestClient(app).get('/')
+    assert r.headers.get_list('x-frame-options') == ['SAMEORIGIN']
+    assert r.headers['x-content-type-options'] == 'nosniff'
+
+
+def test_principal_cache_and_role_invalidation(client):
+    from sqlalchemy import event
+    from app.db import session as db_session
+
+    adm = client.post('/auth/register', json={'email':'root@x','password':'password8'}).json()['access_token']
+    HA = {'Authorization': f'Bearer {adm}'}
+    tok = client.post('/auth/register', json={'email':'u@x','password':'password8'}).json()['access_token']
+    HU = {'Authorization': f'Bearer {tok}'}
+    assert client.get('/users/me', headers=HU).json()['role'] == 'user'
+
+    user_queries = []
+    listener = lambda conn, cursor, statement, *a: user_queries.append(statement) if 'FROM users' in statement else None
+    event.listen(db_session.engine, 'before_cursor_execute', listener)
+    try:
+        assert client.get('/users/me', headers=HU).status_code == 200
+        assert client.get('/auth/me', headers=HU).status_code == 200
+    finally:
+        event.remove(db_session.engine, 'before_cursor_execute', listener)
+    assert user_queries == []
+
+    # assign-role drops the cached principal; the same token now carries the new role server-side
+    client.post('/users/assign-role', headers=HA, json={'email':'u@x','role':'analyst'})
+    assert client.get('/users/me', headers=HU).json()['role'] == 'analyst'
+
+
+def test_trusted_token_role_on_read_only_routes(client, monkeypatch):
+    from app.core.security import principals
+
+    tok = client.post('/auth/register', json={'email':'t@x','password':'password8'}).json()['access_token']
+    H = {'Authorization': f'Bearer {tok}'}
+    monkeypatch.setenv('AUTH_TRUST_TOKEN_ROLE', '1')
+    principals.clear()
+    try:
+        # Claims are trusted as issued, even if the row disappeared meanwhile
+        from app.db import models
+        from app.db import session as db_session
+        db = db_session.SessionLocal()
+        db.query(models.User).filter(models.User.email == 't@x').delete()
+        db.commit()
+        db.close()
+        r = client.get('/auth/me', headers=H)
+        assert r.status_code == 200 and r.json() == {'email': 't@x', 'role': 'admin'}
+        # ...but never on routes that use get_current_user
+        assert client.get('/users/me', headers=H).status_code == 401
+    finally:
+        monkeypatch.delenv('AUTH_TRUST_TOKEN_ROLE')
+        principals.clear()
+
+
+def test_login_rehashes_when_cost_changes(client, monkeypatch):
+    from app.db import models
+    from app.db import session as db_session
+
+    monkeypatch.setenv('BCRYPT_ROUNDS', '4')
+    assert client.post('/auth/register', json={'email':'r@x','password':'password8'}).status_code == 200
+
+    def stored():
+        db = db_session.SessionLocal()
+        try:
+            return db.query(models.User).filter(models.User.email == 'r@x').first().password_hash
+        finally:
+            db.close()
+
+    assert stored().startswith('$2b$04$')
+    monkeypatch.setenv('BCRYPT_ROUNDS', '5')
+    r = client.post('/auth/login', json={'email':'r@x','password':'password8'})
+    assert r.status_code == 200
+    assert stored().startswith('$2b$05$')
+    assert client.post('/auth/login', json={'email':'r@x','password':'password8'}).status_code == 200
+    assert client.post('/auth/login', json={'email':'r@x','password':'wrong-pass'}).status_code == 401
+
+
+def test_password_hasher_rejects_when_queue_times_out(monkeypatch):
+    import asyncio
+    import time
+    from app.core.passwords import HasherBusy, PasswordHasher
+
+    monkeypatch.setenv('PASSWORD_HASH_WORKERS', '1')
+    monkeypatch.setenv('PASSWORD_HASH_QUEUE_TIMEOUT_MS', '50')
+    h = PasswordHasher()
+    h.start()
+
+    async def burst():
+        return await asyncio.gather(h._submit(time.sleep, 0.3), h._submit(time.sleep, 0), return_exceptions=True)
+
+    try:
+        first, second = asyncio.run(burst())
+    finally:
+        h.stop()
+    assert first is None
+    assert isinstance(second, HasherBusy)
+    assert h._in_flight == 0
@@ -74,3 +74,32 @@ def test_assignment_sla_escalation(client):
         assert n >= 1
     finally:
         db.close()
+
+
+def test_review_sla_not_repeated_after_escalation_is_archived(client, tmp_path, monkeypatch):
+    monkeypatch.setenv('AUDIT_ARCHIVE_DIR', str(tmp_path))
+    _tok = client.post('/auth/register', json={'email':'adm@sla3','password':'password8'}).json()['access_token']
+    H = {'Authorization': f'Bearer {_tok}'}
+    idea_id = client.post('/ideas/', headers=H, json={'title':'sla3','description':'check3'}).json()['idea']['id']
+    review_id = client.post('/reviews/request', headers=H, json={'idea_id':idea_id,'stage':'analyst'}).json()['id']
+
+    from datetime import date
+    from app.crud import events as events_crud
+    from app.db.session import SessionLocal, engine
+    from app.db import models
+    from app.services import audit_archive
+    from app.services.sla import review_sla_pass
+    db = SessionLocal()
+    try:
+        r = db.query(models.Review).filter(models.Review.id==review_id).first()
+        r.created_at = datetime.utcnow() - timedelta(days=6)
+        db.commit()
+        assert review_sla_pass(db, days=5) == 1
+        events_crud.flush_pending(db)
+        db.query(models.EventAudit).filter(models.EventAudit.event == 'sla_escalated').update({'created_at': datetime(2020, 5, 1)})
+        db.commit()
+        assert audit_archive.archive_before(engine, date(2021, 1, 1)) == {'2020-05': 1}
+        assert events_crud.has_event(db, entity='review', entity_id=review_id, event='sla_escalated')
+        assert review_sla_pass(db, days=5) == 0
+    finally:
+        db.close()
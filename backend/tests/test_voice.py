@@ -29,3 +29,223 @@ def test_voice_unauthorized(client):
     r = client.post('/voice/identify', json={'email':'x@y'})
     assert r.status_code in (401, 500)
 
+
+
+def test_voice_quota_enforced_without_db_and_usage_recorded(client, monkeypatch):
+    monkeypatch.setenv('VOICE_API_KEY', 'quota-key')
+    monkeypatch.setenv('VOICE_QUOTA_PER_MINUTE', '3')
+    H = {'X-VOICE-API-KEY': 'quota-key'}
+    codes = [client.post('/voice/get-status', headers=H, json={'email':'q@test.local'}).status_code for _ in range(4)]
+    assert codes == [200, 200, 200, 429]
+
+    from app.db import models
+    from app.db.session import SessionLocal
+    from app.services.voice_quota import key_id, usage_writer
+    usage_writer.flush()
+    db = SessionLocal()
+    try:
+        # Stored under the hashed key id only
+        assert db.query(models.VoiceUsage).filter(models.VoiceUsage.key_id == key_id('quota-key')).count() == 3
+        assert db.query(models.VoiceUsage).filter(models.VoiceUsage.key_id == 'quota-key').count() == 0
+    finally:
+        db.close()
+
+
+def test_voice_usage_rollups_compaction_and_report(client, monkeypatch):
+    from datetime import datetime, timedelta
+    from app.crud import voice_usage as usage_crud
+    from app.db import models
+    from app.db.session import SessionLocal, engine
+    from app.services.voice_quota import compaction_pass, key_id, usage_writer
+
+    now = datetime.utcnow()
+    old = now - timedelta(days=10)
+    kid = key_id('roll-key')
+    for ts in (old, old, now):
+        usage_writer.enqueue({'key_id': kid, 'created_at': ts})
+    usage_writer.flush()
+
+    db = SessionLocal()
+    try:
+        day = {r.bucket_start.date(): r.count for r in usage_crud.usage_report(db, granularity='day', key_id=kid)}
+        assert day == {old.date(): 2, now.date(): 1}
+        assert usage_crud.recent_counts(db, key_id=kid)[1] >= 1
+    finally:
+        db.close()
+
+    res = compaction_pass(engine)
+    assert res['raw_deleted'] == 2
+    assert res['minute_buckets_deleted'] == 1
+    db = SessionLocal()
+    try:
+        assert db.query(models.VoiceUsage).filter(models.VoiceUsage.key_id == kid).count() == 1
+    finally:
+        db.close()
+
+    tok = client.post('/auth/register', json={'email':'adm@voice','password':'password8'}).json()['access_token']
+    r = client.get('/voice/usage-report?api_key=roll-key', headers={'Authorization': f'Bearer {tok}'})
+    assert r.status_code == 200
+    assert sum(b['count'] for b in r.json()['buckets']) == 3
+    # The raw key is only a filter: buckets report its key id
+    assert {b['key_id'] for b in r.json()['buckets']} == {kid} and 'roll-key' not in r.text
+
+
+def test_voice_session_write_behind(client, monkeypatch):
+    monkeypatch.setenv('VOICE_API_KEY', 'sess-key')
+    H = {'X-VOICE-API-KEY': 'sess-key'}
+    from app.db import models
+    from app.db.session import SessionLocal
+    from app.services.voice_sessions import store
+
+    r = client.post('/voice/create-idea', headers=H, json={'email':'s@test.local', 'title':'Title only'})
+    assert r.status_code == 200
+    sid = r.json()['session_id']
+    assert r.headers['x-voice-session']
+    assert store.pending() == 1
+
+    # Served from the cache before any flush
+    r = client.post('/voice/repeat', headers=H, json={'session_id': sid})
+    assert r.json()['response'] == 'Need: description'
+    assert r.headers['x-voice-session'] == client.post('/voice/repeat', headers=H, json={'session_id': sid}).headers['x-voice-session']
+
+    assert store.flush() == 1
+    db = SessionLocal()
+    try:
+        row = db.get(models.VoiceSession, sid)
+        assert row.last_response == 'Need: description'
+        assert row.context['pending']['title'] == 'Title only'
+    finally:
+        db.close()
+
+
+def test_voice_create_idea_single_commit(client, monkeypatch):
+    monkeypatch.setenv('VOICE_API_KEY', 'uow-key')
+    H = {'X-VOICE-API-KEY': 'uow-key'}
+    from sqlalchemy import event, select
+    from app.db import models
+    from app.db import session as db_session
+    from app.crud import events as events_crud
+
+    commits = []
+
+    def listener(s):
+        # Savepoint releases fire the hook too; count real transaction commits only
+        if not s.in_nested_transaction():
+            commits.append(s)
+
+    event.listen(db_session.SessionLocal, 'before_commit', listener)
+    try:
+        r = client.post('/voice/create-idea', headers=H, json={'email':'uow@test.local', 'title':'One tx', 'description':'All writes at once'})
+    finally:
+        event.remove(db_session.SessionLocal, 'before_commit', listener)
+    assert r.status_code == 200
+    idea_id = r.json()['idea_id']
+    assert len(commits) == 1
+
+    db = db_session.SessionLocal()
+    try:
+        assert db.execute(select(models.User).where(models.User.email == 'uow@test.local')).scalars().first()
+        assert db.get(models.Idea, idea_id).author_email == 'uow@test.local'
+        assert db.execute(select(models.Embedding).where(models.Embedding.idea_id == idea_id)).scalars().first()
+        assert db.get(models.VoiceSession, r.json()['session_id']) is not None
+        assert events_crud.has_event(db, entity='idea', entity_id=idea_id, event='created_voice')
+    finally:
+        db.close()
+
+
+def test_voice_streaming_responses(client, monkeypatch):
+    import json
+    monkeypatch.setenv('VOICE_API_KEY', 'stream-key')
+    H = {'X-VOICE-API-KEY': 'stream-key'}
+
+    r = client.post('/voice/create-idea', headers={**H, 'Accept': 'application/x-ndjson'},
+                    json={'email':'st@test.local', 'title':'Streamed', 'description':'Progressive'})
+    assert r.status_code == 200
+    assert r.headers['content-type'].startswith('application/x-ndjson')
+    frames = [json.loads(ln) for ln in r.text.splitlines() if ln]
+    assert [f['event'] for f in frames] == ['ack', 'idea', 'done']
+    idea_id = frames[1]['idea_id']
+    assert idea_id > 0
+    assert frames[2]['idea_id'] == idea_id and frames[2]['response'].startswith(f'Idea #{idea_id} created')
+
+    r = client.post('/voice/get-status', headers={**H, 'Accept': 'text/event-stream'}, json={'email':'st@test.local'})
+    assert r.status_code == 200
+    assert r.headers['content-type'].startswith('text/event-stream')
+    events = [ln.split(': ', 1)[1] for ln in r.text.splitlines() if ln.startswith('event: ')]
+    assert events == ['ack', 'idea', 'done']
+    assert f'"idea_id": {idea_id}' in r.text
+
+    r = client.post('/voice/get-status', headers={**H, 'Accept': 'application/x-ndjson'}, json={'email':'other@test.local', 'idea_id': idea_id})
+    frames = [json.loads(ln) for ln in r.text.splitlines() if ln]
+    assert frames[-1] == {'event': 'error', 'status_code': 403, 'detail': 'Forbidden'}
+
+
+def test_voice_identify_cache(client, monkeypatch):
+    monkeypatch.setenv('VOICE_API_KEY', 'id-key')
+    H = {'X-VOICE-API-KEY': 'id-key'}
+    from sqlalchemy import event
+    from app.db import models
+    from app.db import session as db_session
+    from app.services import voice_identity
+
+    body = {'email': ' Caller@Test.Local ', 'full_name': 'Caller'}
+    r = client.post('/voice/identify', headers=H, json=body)
+    assert r.status_code == 200 and r.json()['role'] == 'user'
+
+    user_queries = []
+    listener = lambda conn, cursor, statement, *a: user_queries.append(statement) if 'FROM users' in statement else None
+    event.listen(db_session.engine, 'before_cursor_execute', listener)
+    hits = voice_identity.normalize_email.cache_info().hits
+    try:
+        r = client.post('/voice/identify', headers=H, json=body)
+    finally:
+        event.remove(db_session.engine, 'before_cursor_execute', listener)
+    assert r.status_code == 200
+    assert user_queries == []
+    assert voice_identity.normalize_email.cache_info().hits == hits
+
+    # A change to the user row drops the cached identity
+    db = db_session.SessionLocal()
+    try:
+        u = db.query(models.User).filter(models.User.email == r.json()['email']).first()
+        u.role = 'analyst'
+        db.commit()
+    finally:
+        db.close()
+    r = client.post('/voice/identify', headers=H, json=body)
+    assert r.json()['role'] == 'analyst'
+
+
+def test_voice_session_flush_is_compare_and_set(client, monkeypatch):
+    monkeypatch.setenv('VOICE_API_KEY', 'cas-key')
+    H = {'X-VOICE-API-KEY': 'cas-key'}
+    from app.db import models
+    from app.db.session import SessionLocal
+    from app.services.voice_sessions import VoiceSessionStore, store
+
+    sid = client.post('/voice/create-idea', headers=H, json={'email':'cas@test.local', 'title':'Title only'}).json()['session_id']
+    assert store.flush() == 1
+    # A second worker with its own cache, holding a copy read at the same version
+    other = VoiceSessionStore()
+    db = SessionLocal()
+    try:
+        theirs = other.get(db, sid)
+        ours = store.get(db, sid)
+        assert theirs.version == ours.version == 1
+        theirs.last_response = 'from the other worker'
+        other.save(theirs)
+        assert other.flush() == 1
+        ours.last_response = 'stale write'
+        store.save(ours)
+        assert store.flush() == 0          # lost the compare-and-set
+        assert store.pending() == 0
+        db.expire_all()
+        assert db.get(models.VoiceSession, sid).last_response == 'from the other worker'
+        # The stale copy was dropped: the next read sees the winner's state and can write again
+        fresh = store.get(db, sid)
+        assert fresh.last_response == 'from the other worker' and fresh.version == 2
+        fresh.last_response = 'next turn'
+        store.save(fresh)
+        assert store.flush() == 1
+    finally:
+        db.close()
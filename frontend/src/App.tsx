@@ -1,4 +1,4 @@
-import { useCallback, useEffect, useMemo, useState } from 'react'
+import { useCallback, useEffect, useMemo, useRef, useState } from 'react'
 import type { FormEvent, MouseEvent, ReactNode } from 'react'
 
 type Idea = {
@@ -47,6 +47,8 @@ type AuditEvent = {
 export default function App() {
   const [ideas, setIdeas] = useState<Idea[]>([])
   const [statusFilter, setStatusFilter] = useState<string>('')
+  const [ideasCursor, setIdeasCursor] = useState<string | null>(null)
+  const ideasRequest = useRef(0)
   const [title, setTitle] = useState('')
   const [description, setDescription] = useState('')
   const [email, setEmail] = useState('')
@@ -80,15 +82,47 @@ export default function App() {
     [me]
   )
 
-  const loadIdeas = async () => {
-    const res = await fetch('/ideas/')
-    const data = await res.json()
-    setIdeas(data)
+  // GET /ideas/ is paged (50 per page by default) and filtered by status on the server:
+  // show the first page, fetch the next one from X-Next-Cursor on "Load more"
+  const fetchIdeasPage = useCallback(
+    async (cursor: string | null) => {
+      const params = new URLSearchParams()
+      if (statusFilter) params.set('status', statusFilter)
+      if (cursor) params.set('cursor', cursor)
+      const res = await fetch(`/ideas/?${params.toString()}`)
+      if (!res.ok) return null
+      return { items: (await res.json()) as Idea[], next: res.headers.get('X-Next-Cursor') }
+    },
+    [statusFilter]
+  )
+
+  const loadIdeas = useCallback(async () => {
+    const request = ++ideasRequest.current
+    const page = await fetchIdeasPage(null)
+    // A newer load (e.g. the filter changed meanwhile) wins
+    if (!page || request !== ideasRequest.current) return
+    setIdeas(page.items)
+    setIdeasCursor(page.next)
+  }, [fetchIdeasPage])
+
+  const loadMoreIdeas = async () => {
+    const cursor = ideasCursor
+    if (!cursor) return
+    const request = ideasRequest.current
+    setIdeasCursor(null) // hides the button until this page arrives
+    const page = await fetchIdeasPage(cursor)
+    if (request !== ideasRequest.current) return
+    if (!page) {
+      setIdeasCursor(cursor)
+      return
+    }
+    setIdeas(prev => [...prev, ...page.items])
+    setIdeasCursor(page.next)
   }
 
   useEffect(() => {
     loadIdeas()
-  }, [])
+  }, [loadIdeas])
 
   const refreshMe = useCallback(async (t: string) => {
     const res = await fetch('/auth/me', {
@@ -454,33 +488,36 @@ export default function App() {
             </label>
           </div>
           <ul className="lk-ideas__list">
-            {ideas
-              .filter(i => !statusFilter || i.status === statusFilter)
-              .map(i => (
-                <li key={i.id} className="lk-ideas__item">
-                  <strong>{i.title}</strong>
-                  <div>{i.description}</div>
-                  {i.status && <div className="lk-ideas__status">Status: {i.status}</div>}
-                  {(me?.role === 'admin' || me?.role === 'manager') && (
-                    <button type="button" onClick={() => requestAnalystReview(i.id)}>
-                      Request analyst review
+            {ideas.map(i => (
+              <li key={i.id} className="lk-ideas__item">
+                <strong>{i.title}</strong>
+                <div>{i.description}</div>
+                {i.status && <div className="lk-ideas__status">Status: {i.status}</div>}
+                {(me?.role === 'admin' || me?.role === 'manager') && (
+                  <button type="button" onClick={() => requestAnalystReview(i.id)}>
+                    Request analyst review
+                  </button>
+                )}
+                {(me?.role === 'admin' || me?.role === 'manager') && (
+                  <div className="lk-ideas__assign">
+                    <input
+                      placeholder="Developer email (optional)"
+                      value={assignEmail}
+                      onChange={e => setAssignEmail(e.target.value)}
+                    />
+                    <button type="button" onClick={() => inviteDev(i.id)}>
+                      Invite developer
                     </button>
-                  )}
-                  {(me?.role === 'admin' || me?.role === 'manager') && (
-                    <div className="lk-ideas__assign">
-                      <input
-                        placeholder="Developer email (optional)"
-                        value={assignEmail}
-                        onChange={e => setAssignEmail(e.target.value)}
-                      />
-                      <button type="button" onClick={() => inviteDev(i.id)}>
-                        Invite developer
-                      </button>
-                    </div>
-                  )}
-                </li>
-              ))}
+                  </div>
+                )}
+              </li>
+            ))}
           </ul>
+          {ideasCursor && (
+            <button type="button" className="lk-ideas__more" onClick={loadMoreIdeas}>
+              Load more
+            </button>
+          )}
         </section>
 
         <section id="admin" className="lk-section">